@@ -0,0 +1,122 @@
+"""Learned JD boilerplate: lines that recur across unrelated postings.
+
+Every cleaned JD records the keys of its longer lines together with the
+SimHash of the JD. A line counts as boilerplate once it was seen in
+min_postings postings that are not near duplicates of each other, so
+reposts of one posting never teach the store their own content.
+"""
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from adapters.jd_fingerprints import near_duplicate_distance
+
+_STORES: Dict[str, "BoilerplateStore"] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def _key_hash(key: str) -> str:
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class BoilerplateStore:
+    """SQLite-backed corpus of JD lines and the postings they were seen in."""
+
+    def __init__(self, path: str, min_postings: int = 3, min_words: int = 8, max_distance: int = 3):
+        """
+        Open (or create) the corpus.
+
+        Args:
+            path: Path to the SQLite file
+            min_postings: Unrelated postings a line must appear in to count as boilerplate
+            min_words: Shorter lines (headings, skill names) are never learned
+            max_distance: Postings whose fingerprints differ in at most this many bits count once
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.min_postings = min_postings
+        self.min_words = min_words
+        self.max_distance = max_distance
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS lines (
+                key_hash TEXT,
+                simhash TEXT,
+                text TEXT,
+                PRIMARY KEY (key_hash, simhash)
+            )"""
+        )
+        self._conn.commit()
+
+    def _distinct_postings(self, fingerprints: List[int]) -> int:
+        """Number of postings among fingerprints, near duplicates counted once (stops at min_postings)."""
+        distinct: List[int] = []
+        for fingerprint in fingerprints:
+            if all((fingerprint ^ other).bit_count() > self.max_distance for other in distinct):
+                distinct.append(fingerprint)
+                if len(distinct) >= self.min_postings:
+                    break
+        return len(distinct)
+
+    def is_boilerplate(self, key: str) -> bool:
+        """
+        Whether a line recurs across enough unrelated postings.
+
+        Args:
+            key: Line key from utils.jd_boilerplate.line_key()
+
+        Returns:
+            True if the line should be dropped
+        """
+        if len(key.split()) < self.min_words:
+            return False
+        # looked up on disk (primary key prefix), so memory stays flat as the corpus grows
+        with self._lock:
+            rows = self._conn.execute("SELECT simhash FROM lines WHERE key_hash = ?", (_key_hash(key),)).fetchall()
+        return self._distinct_postings([int(fingerprint, 16) for fingerprint, in rows]) >= self.min_postings
+
+    def learn(self, fingerprint: int, keys: Iterable[str]) -> None:
+        """
+        Record the lines of a posting.
+
+        Args:
+            fingerprint: SimHash of the posting (adapters.jd_fingerprints.simhash)
+            keys: Line keys of the posting
+        """
+        rows = [
+            (_key_hash(key), f"{fingerprint:016x}", key)
+            for key in set(keys) if len(key.split()) >= self.min_words
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR IGNORE INTO lines VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+
+def get_boilerplate_store(config: Dict[str, Any]) -> Optional[BoilerplateStore]:
+    """
+    Return the process-wide boilerplate corpus described by config["jd_cleaner"]["learn"].
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Shared BoilerplateStore, or None if learning is disabled
+    """
+    learn_config = (config.get("jd_cleaner") or {}).get("learn") or {}
+    if not learn_config.get("enabled", False):
+        return None
+
+    path = learn_config.get("path", ".cache/jd_boilerplate.sqlite")
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = BoilerplateStore(path)
+            _STORES[path] = store
+        store.min_postings = learn_config.get("min_postings", 3)
+        store.min_words = learn_config.get("min_words", 8)
+        store.max_distance = near_duplicate_distance(config)
+    return store
@@ -0,0 +1,412 @@
+"""Durable LangGraph checkpoints in SQLite, so a failed run resumes from its last completed node.
+
+Checkpoints are keyed by run id (the LangGraph thread id). Channel values
+and pending writes are stored content-addressed and compressed: a node
+that returns the whole state only adds rows pointing at the values it left
+unchanged (bank, profile, config, ...), so each checkpoint costs about the
+size of what its node actually produced.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from infra.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+_STORES: Dict[str, "SQLiteCheckpointSaver"] = {}
+_STORES_LOCK = threading.Lock()
+
+# Internal channels of LangGraph, not nodes of our graphs
+_INTERNAL = ("__input__", "__start__", "__pregel_tasks")
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[int]):
+    """Checkpoint saver on one SQLite file, plus the status of each run for listing and resuming."""
+
+    def __init__(self, path: str, keep_completed: bool = False):
+        """
+        Open (or create) the checkpoint database.
+
+        Args:
+            path: Path to the SQLite file
+            keep_completed: Keep the checkpoints of runs that finished successfully
+        """
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.keep_completed = keep_completed
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # a checkpoint per node: skip the fsync per commit, WAL still survives a crashed process
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT,
+                checkpoint_ns TEXT,
+                checkpoint_id TEXT,
+                parent_id TEXT,
+                checkpoint TEXT,
+                metadata TEXT,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE IF NOT EXISTS channel_values (
+                thread_id TEXT,
+                checkpoint_ns TEXT,
+                channel TEXT,
+                version TEXT,
+                hash TEXT,
+                PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+            );
+            CREATE TABLE IF NOT EXISTS writes (
+                thread_id TEXT,
+                checkpoint_ns TEXT,
+                checkpoint_id TEXT,
+                task_id TEXT,
+                idx INTEGER,
+                channel TEXT,
+                hash TEXT,
+                task_path TEXT,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                type TEXT,
+                data BLOB
+            );
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                graph TEXT,
+                status TEXT,
+                error TEXT,
+                created REAL,
+                updated REAL
+            );"""
+        )
+        self._conn.commit()
+
+    # Serialized values, stored once per distinct content
+
+    def _put_blob(self, typed: Tuple[str, bytes]) -> str:
+        # callers hold self._lock and commit
+        kind, data = typed
+        key = hashlib.sha256(kind.encode("utf-8") + b"\0" + data).hexdigest()
+        self._conn.execute(
+            "INSERT OR IGNORE INTO blobs VALUES (?, ?, ?)", (key, kind, zlib.compress(data))
+        )
+        return key
+
+    def _get_blob(self, key: str) -> Tuple[str, bytes]:
+        kind, data = self._conn.execute("SELECT type, data FROM blobs WHERE hash = ?", (key,)).fetchone()
+        return kind, zlib.decompress(data)
+
+    def _load(self, key: str) -> Any:
+        return self.serde.loads_typed(self._get_blob(key))
+
+    def _collect_garbage(self) -> None:
+        # callers hold self._lock and commit
+        self._conn.execute(
+            "DELETE FROM blobs WHERE hash NOT IN (SELECT hash FROM channel_values UNION SELECT hash FROM writes "
+            "UNION SELECT checkpoint FROM checkpoints UNION SELECT metadata FROM checkpoints)"
+        )
+
+    # BaseCheckpointSaver
+
+    def _tuple(self, thread_id: str, checkpoint_ns: str, row: Tuple[str, Optional[str], str, str]) -> CheckpointTuple:
+        # callers hold self._lock
+        checkpoint_id, parent_id, checkpoint_hash, metadata_hash = row
+        checkpoint = self._load(checkpoint_hash)
+        channel_values = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            found = self._conn.execute(
+                "SELECT hash FROM channel_values WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if found is not None:
+                kind, data = self._get_blob(found[0])
+                if kind != "empty":
+                    channel_values[channel] = self.serde.loads_typed((kind, data))
+        writes = self._conn.execute(
+            "SELECT task_id, channel, hash FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+            "ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self._load(metadata_hash),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+            pending_writes=[(task_id, channel, self._load(key)) for task_id, channel, key in writes],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """The checkpoint selected by config, or the latest one of its thread."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = "SELECT checkpoint_id, parent_id, checkpoint, metadata FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+        params: Tuple[Any, ...] = (thread_id, checkpoint_ns)
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id:
+            query += " AND checkpoint_id = ?"
+            params += (checkpoint_id,)
+        with self._lock:
+            row = self._conn.execute(query + " ORDER BY checkpoint_id DESC LIMIT 1", params).fetchone()
+            return self._tuple(thread_id, checkpoint_ns, row) if row is not None else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """Checkpoints matching config, newest first."""
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, checkpoint, metadata FROM checkpoints WHERE 1 = 1"
+        params: Tuple[Any, ...] = ()
+        if config:
+            query += " AND thread_id = ?"
+            params += (config["configurable"]["thread_id"],)
+            if config["configurable"].get("checkpoint_ns") is not None:
+                query += " AND checkpoint_ns = ?"
+                params += (config["configurable"]["checkpoint_ns"],)
+            if get_checkpoint_id(config):
+                query += " AND checkpoint_id = ?"
+                params += (get_checkpoint_id(config),)
+        if before and get_checkpoint_id(before):
+            query += " AND checkpoint_id < ?"
+            params += (get_checkpoint_id(before),)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY checkpoint_id DESC", params).fetchall()
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                return
+            with self._lock:
+                if filter and not all(self._load(row[3]).get(key) == value for key, value in filter.items()):
+                    continue
+                found = self._tuple(thread_id, checkpoint_ns, tuple(row))
+            if limit is not None:
+                limit -= 1
+            yield found
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Store a checkpoint and the channel values that changed since the previous one."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        stored = checkpoint.copy()
+        values = stored.pop("channel_values")
+        with self._lock:
+            for channel, version in new_versions.items():
+                key = self._put_blob(self.serde.dumps_typed(values[channel]) if channel in values else ("empty", b""))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO channel_values VALUES (?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, channel, str(version), key),
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                    self._put_blob(self.serde.dumps_typed(stored)),
+                    self._put_blob(self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))),
+                ),
+            )
+            self._conn.commit()
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Store the writes of a task that finished (or failed) before the next checkpoint."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        with self._lock:
+            for idx, (channel, value) in enumerate(writes):
+                idx = WRITES_IDX_MAP.get(channel, idx)
+                # special writes (errors, interrupts) replace earlier ones; regular writes are stored once
+                verb = "INSERT OR REPLACE" if idx < 0 else "INSERT OR IGNORE"
+                self._conn.execute(
+                    f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel,
+                     self._put_blob(self.serde.dumps_typed(value)), task_path),
+                )
+            self._conn.commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete the checkpoints and writes of a thread."""
+        with self._lock:
+            for table in ("checkpoints", "channel_values", "writes"):
+                self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            self._collect_garbage()
+            self._conn.commit()
+
+    # sqlite calls are short and local, so the async variants run inline like InMemorySaver's
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for found in self.list(config, filter=filter, before=before, limit=limit):
+            yield found
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+    # Runs
+
+    def _set_run(self, run_id: str, graph: str, status: str, error: Optional[str] = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(run_id) DO UPDATE SET "
+                "graph = excluded.graph, status = excluded.status, error = excluded.error, updated = excluded.updated",
+                (run_id, graph, status, error, now, now),
+            )
+            self._conn.commit()
+
+    @contextmanager
+    def track(self, run_id: str, graph: str) -> Iterator[None]:
+        """
+        Record a run of a graph as running, then as failed or done.
+
+        A run that finishes successfully is forgotten (checkpoints included)
+        unless keep_completed is set; a failed or interrupted run stays
+        listed by incomplete_runs() until it is resumed to completion.
+
+        Args:
+            run_id: Run id (the thread id the graph is invoked with)
+            graph: Name of the compiled graph, used to rebuild it on resume
+        """
+        self._set_run(run_id, graph, "running")
+        try:
+            yield
+        except BaseException as error:
+            self._set_run(run_id, graph, "failed", f"{type(error).__name__}: {error}")
+            raise
+        if self.keep_completed:
+            self._set_run(run_id, graph, "done")
+        else:
+            self.delete_thread(run_id)
+            with self._lock:
+                self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+                self._conn.commit()
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a run, or None if it is unknown (or finished and forgotten)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id, graph, status, error, created, updated FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return None if row is None else dict(zip(("run_id", "graph", "status", "error", "created", "updated"), row))
+
+    def incomplete_runs(self) -> List[Dict[str, Any]]:
+        """
+        Runs that failed, were interrupted or are still running, most recent first.
+
+        Returns:
+            Run status dicts, each with the nodes completed so far ("completed")
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id, graph, status, error, created, updated FROM runs WHERE status != 'done' ORDER BY updated DESC"
+            ).fetchall()
+        runs = []
+        for row in rows:
+            run = dict(zip(("run_id", "graph", "status", "error", "created", "updated"), row))
+            with self._lock:
+                latest = self._conn.execute(
+                    "SELECT checkpoint_id, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = '' "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (run["run_id"],),
+                ).fetchone()
+                checkpoint = self._load(latest[1]) if latest is not None else {}
+                # parallel nodes that finished in the step that failed; their task path ends with the node name
+                pending = self._conn.execute(
+                    "SELECT DISTINCT task_path FROM writes WHERE thread_id = ? AND checkpoint_ns = '' AND checkpoint_id = ? AND idx >= 0",
+                    (run["run_id"], latest[0] if latest is not None else None),
+                ).fetchall()
+            # a node has completed once it has seen its input channels
+            completed = [node for node in checkpoint.get("versions_seen", {}) if node not in _INTERNAL]
+            completed += [path.rsplit(", ", 1)[-1] for path, in pending if path]
+            run["completed"] = completed
+            runs.append(run)
+        return runs
+
+
+def get_checkpointer(config: Dict[str, Any]) -> Optional[SQLiteCheckpointSaver]:
+    """
+    Return the process-wide checkpoint saver described by config["checkpoint"].
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Shared SQLiteCheckpointSaver, or None if checkpointing is disabled
+    """
+    checkpoint_config = config.get("checkpoint") or {}
+    if not checkpoint_config.get("enabled", False):
+        return None
+
+    path = checkpoint_config.get("path", ".cache/checkpoints.sqlite")
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = SQLiteCheckpointSaver(path)
+            _STORES[path] = store
+        store.keep_completed = checkpoint_config.get("keep_completed", False)
+    return store
@@ -0,0 +1,236 @@
+"""Near-duplicate JD detection: SimHash fingerprints of parsed JDs and their summaries.
+
+Reposts of a posting (other job boards, tracking footers, small edits)
+produce nearly the same 64-bit SimHash of the normalized text. Fingerprints
+are split into max_distance + 1 blocks and indexed per block: two
+fingerprints within max_distance bits agree on at least one whole block
+(pigeonhole), so a lookup only compares the few fingerprints that share a
+block with the query instead of scanning the store.
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from infra.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+BITS = 64
+SHINGLE = 3
+
+_URL = re.compile(r"https?://\S+|www\.\S+")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+_STORES: Dict[str, "FingerprintStore"] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def normalize(text: str) -> List[str]:
+    """Lowercase word tokens of a JD without URLs (tracking links differ between reposts)."""
+    return _WORD.findall(_URL.sub(" ", text.lower()))
+
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash of the word 3-shingles of a normalized JD.
+
+    Args:
+        text: Raw JD text
+
+    Returns:
+        Fingerprint as an unsigned 64-bit integer
+    """
+    tokens = normalize(text)
+    shingles = {" ".join(tokens[i:i + SHINGLE]) for i in range(max(len(tokens) - SHINGLE + 1, 1))}
+    counts = [0] * BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(BITS):
+            counts[bit] += 1 if (value >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(BITS) if counts[bit] > 0)
+
+
+def _blocks(fingerprint: int, n_blocks: int) -> List[Tuple[int, int]]:
+    """(block number, block value) pairs of a fingerprint split into n_blocks bit ranges."""
+    bounds = [round(BITS * i / n_blocks) for i in range(n_blocks + 1)]
+    return [
+        (i, (fingerprint >> bounds[i]) & ((1 << (bounds[i + 1] - bounds[i])) - 1))
+        for i in range(n_blocks)
+    ]
+
+
+class FingerprintStore:
+    """SQLite-backed store of JD fingerprints and summaries with an in-memory block index."""
+
+    def __init__(self, path: str, max_distance: int = 3, refresh: bool = False):
+        """
+        Open (or create) the store and index its fingerprints.
+
+        Args:
+            path: Path to the SQLite file
+            max_distance: Largest Hamming distance (in bits) that counts as a near duplicate
+            refresh: If True, every lookup misses but new fingerprints are still stored
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_distance = max_distance
+        self.refresh = refresh
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS fingerprints (
+                id INTEGER PRIMARY KEY,
+                simhash TEXT,
+                jd_hash TEXT,
+                source TEXT,
+                summary TEXT,
+                created REAL
+            )"""
+        )
+        self._conn.commit()
+        self._fingerprints: Dict[int, int] = {}
+        self._index: Dict[Tuple[int, int], List[int]] = {}
+        for row_id, fingerprint in self._conn.execute("SELECT id, simhash FROM fingerprints"):
+            self._add(row_id, int(fingerprint, 16))
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def _add(self, row_id: int, fingerprint: int) -> None:
+        self._fingerprints[row_id] = fingerprint
+        for block in _blocks(fingerprint, self.max_distance + 1):
+            self._index.setdefault(block, []).append(row_id)
+
+    def nearest(self, fingerprint: int) -> Optional[Tuple[int, int]]:
+        """
+        Closest stored fingerprint within max_distance bits.
+
+        Args:
+            fingerprint: Query fingerprint from simhash()
+
+        Returns:
+            (row id, Hamming distance), or None if there is no near duplicate
+        """
+        if self.refresh:
+            return None
+        best = None
+        with self._lock:
+            for block in _blocks(fingerprint, self.max_distance + 1):
+                for row_id in self._index.get(block, ()):
+                    distance = (self._fingerprints[row_id] ^ fingerprint).bit_count()
+                    if distance <= self.max_distance and (best is None or distance < best[1]):
+                        best = (row_id, distance)
+        return best
+
+    def record(self, row_id: int) -> Dict[str, Any]:
+        """Stored row (jd_hash, source, summary, created) of a fingerprint."""
+        with self._lock:
+            jd_hash, source, summary, created = self._conn.execute(
+                "SELECT jd_hash, source, summary, created FROM fingerprints WHERE id = ?", (row_id,)
+            ).fetchone()
+        return {"id": row_id, "jd_hash": jd_hash, "source": source, "summary": json.loads(summary), "created": created}
+
+    def put(self, fingerprint: int, jd_text: str, source: str, summary: Dict[str, Any]) -> None:
+        """
+        Store the fingerprint of a parsed JD with its summary.
+
+        Args:
+            fingerprint: Fingerprint from simhash()
+            jd_text: JD text (only its sha256 is stored)
+            source: Where the JD was processed (e.g. its output directory)
+            summary: Parsed JD summary
+        """
+        jd_hash = hashlib.sha256(jd_text.encode("utf-8")).hexdigest()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO fingerprints (simhash, jd_hash, source, summary, created) VALUES (?, ?, ?, ?, ?)",
+                (f"{fingerprint:016x}", jd_hash, source, json.dumps(summary, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+            self._add(cursor.lastrowid, fingerprint)
+
+
+def near_duplicate_distance(config: Dict[str, Any]) -> int:
+    """Bits that may differ between near duplicates (from jd_dedup.min_similarity)."""
+    return int((1 - (config.get("jd_dedup") or {}).get("min_similarity", 0.95)) * BITS)
+
+
+def get_fingerprint_store(config: Dict[str, Any]) -> Optional[FingerprintStore]:
+    """
+    Return the process-wide fingerprint store described by config["jd_dedup"].
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Shared FingerprintStore, or None if near-duplicate detection is disabled
+    """
+    dedup_config = config.get("jd_dedup") or {}
+    if not dedup_config.get("enabled", False):
+        return None
+
+    path = dedup_config.get("path", ".cache/jd_fingerprints.sqlite")
+    max_distance = near_duplicate_distance(config)
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None or store.max_distance != max_distance:
+            store = FingerprintStore(path, max_distance)
+            _STORES[path] = store
+        store.refresh = dedup_config.get("refresh", False)
+    return store
+
+
+def reuse_summary(state: Dict[str, Any], config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Look up a stored summary of a near-duplicate of the state's JD.
+
+    The matched JD is recorded in state["meta"]["jd_match"] for the audit.
+
+    Args:
+        state: Pipeline state with jd_clean
+        config: Configuration (uses the "jd_dedup" section)
+
+    Returns:
+        Stored JD summary, or None if no near duplicate is stored
+    """
+    store = get_fingerprint_store(config)
+    if store is None:
+        return None
+    fingerprint = simhash(state["jd_clean"])
+    state.setdefault("meta", {})["jd_fingerprint"] = f"{fingerprint:016x}"
+    started = time.perf_counter()
+    match = store.nearest(fingerprint)
+    if match is None:
+        return None
+    row_id, distance = match
+    record = store.record(row_id)
+    state["meta"]["jd_match"] = {
+        "id": row_id,
+        "source": record["source"],
+        "jd_hash": record["jd_hash"][:16],
+        "distance": distance,
+        "similarity": round(1 - distance / BITS, 4),
+        "created": record["created"],
+    }
+    logger.info(
+        f"JD is a near duplicate of {record['source']} ({distance} of {BITS} bits differ, "
+        f"lookup {1000 * (time.perf_counter() - started):.2f}ms); reusing its summary"
+    )
+    return record["summary"]
+
+
+def remember_summary(state: Dict[str, Any], config: Dict[str, Any]) -> None:
+    """Store the fingerprint and parsed summary of the state's JD (no-op if disabled or already matched)."""
+    store = get_fingerprint_store(config)
+    if store is None or state.get("meta", {}).get("jd_match") or not state.get("jd_summary"):
+        return
+    fingerprint = state["meta"].get("jd_fingerprint")
+    fingerprint = int(fingerprint, 16) if fingerprint else simhash(state["jd_clean"])
+    source = str((config.get("paths") or {}).get("out_dir", ""))
+    store.put(fingerprint, state["jd_clean"], source, dict(state["jd_summary"]))
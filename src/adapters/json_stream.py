@@ -0,0 +1,141 @@
+"""Incremental parser for streamed JSON object replies."""
+import json
+from typing import Any, List, Optional, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONParser:
+    """
+    Parse a streamed top-level JSON object and emit each member as soon as
+    its value is complete.
+
+    Example:
+        parser = IncrementalJSONParser()
+        for chunk in chunks:
+            for key, value in parser.feed(chunk):
+                ...
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"  # start, key, colon, value, comma, done
+        self._key: Optional[str] = None
+        self._value_start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def done(self) -> bool:
+        """True once the closing brace of the top-level object was read."""
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Consume a chunk of streamed text.
+
+        Args:
+            chunk: Next piece of the model reply
+
+        Returns:
+            (key, value) pairs for members completed by this chunk
+        """
+        self._buffer += chunk
+        completed = []
+        buf = self._buffer
+
+        while self._pos < len(buf) and self._state != "done":
+            char = buf[self._pos]
+
+            if self._state == "start":
+                if char == "{":
+                    self._state = "key"
+                self._pos += 1
+
+            elif self._state == "key":
+                if char in _WHITESPACE or char == ",":
+                    self._pos += 1
+                elif char == "}":
+                    self._state = "done"
+                    self._pos += 1
+                elif char == '"':
+                    end = self._string_end(buf, self._pos)
+                    if end is None:
+                        break
+                    self._key = json.loads(buf[self._pos:end])
+                    self._state = "colon"
+                    self._pos = end
+                else:
+                    raise ValueError(f"Unexpected character {char!r} at offset {self._pos}")
+
+            elif self._state == "colon":
+                if char == ":":
+                    self._state = "value"
+                    self._value_start = -1
+                self._pos += 1
+
+            elif self._state == "value":
+                if self._value_start < 0:
+                    if char in _WHITESPACE:
+                        self._pos += 1
+                        continue
+                    self._value_start = self._pos
+                    self._depth = 0
+                    self._in_string = False
+                    self._escape = False
+
+                value_end = self._scan_value(buf)
+                if value_end is None:
+                    break
+                raw = buf[self._value_start:value_end].strip()
+                completed.append((self._key, json.loads(raw)))
+                self._state = "key"
+
+        return completed
+
+    def _scan_value(self, buf: str) -> Optional[int]:
+        """Advance through the current value; return its end offset once complete."""
+        while self._pos < len(buf):
+            char = buf[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 0:
+                        self._pos += 1
+                        return self._pos
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0:
+                    # closing brace of the top-level object ends a scalar value
+                    return self._pos
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pos += 1
+                    return self._pos
+            elif char == "," and self._depth == 0:
+                return self._pos
+            self._pos += 1
+        return None
+
+    @staticmethod
+    def _string_end(buf: str, start: int) -> Optional[int]:
+        """Return the offset just past the string literal starting at start."""
+        escape = False
+        for index in range(start + 1, len(buf)):
+            char = buf[index]
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                return index + 1
+        return None
@@ -0,0 +1,229 @@
+"""Pluggable chat completion backends: live OpenAI, cassette recording and replay."""
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Any, Iterator, AsyncIterator, Optional
+from adapters.llm_cache import request_key
+from infra.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+BACKEND_MODES = ("live", "record", "replay")
+
+_CASSETTES: Dict[str, "Cassette"] = {}
+_CASSETTES_LOCK = threading.Lock()
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def _kwargs_key(kwargs: Dict[str, Any]) -> str:
+    """Cassette key for chat completion kwargs (same hashing as the response cache)."""
+    return request_key(
+        kwargs["model"],
+        kwargs.get("temperature"),
+        kwargs.get("response_format"),
+        kwargs["messages"],
+    )
+
+
+def _usage_to_dict(usage: Any) -> Optional[Dict[str, int]]:
+    """Convert an API usage object into a plain dict."""
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+    }
+
+
+def _usage_from_dict(usage: Optional[Dict[str, int]]) -> Any:
+    """Rebuild a usage object shaped like the API's from a recorded dict."""
+    if usage is None:
+        return None
+    return SimpleNamespace(
+        prompt_tokens=usage.get("prompt_tokens", 0),
+        completion_tokens=usage.get("completion_tokens", 0),
+        total_tokens=usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0),
+        prompt_tokens_details=SimpleNamespace(cached_tokens=usage.get("cached_tokens", 0)),
+    )
+
+
+class Cassette:
+    """Append-only JSONL file of recorded request/response pairs."""
+
+    def __init__(self, path: str):
+        """
+        Load the cassette if it exists.
+
+        Args:
+            path: Path to the cassette JSONL file
+        """
+        self.path = Path(path)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+            logger.info(f"Loaded {len(self._entries)} recorded LLM calls from {self.path}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return the recorded entry for a request.
+
+        Raises:
+            CassetteMiss: If the request is not on the cassette
+        """
+        entry = self._entries.get(_kwargs_key(kwargs))
+        if entry is None:
+            raise CassetteMiss(
+                f"No recorded response for this {kwargs['model']} request in {self.path}. "
+                "Re-record the cassette with the 'record' backend."
+            )
+        return entry
+
+    def record(self, kwargs: Dict[str, Any], content: str, usage: Any) -> None:
+        """Append a request/response pair to the cassette."""
+        entry = {
+            "key": _kwargs_key(kwargs),
+            "model": kwargs["model"],
+            "messages": kwargs["messages"],
+            "content": content,
+            "usage": _usage_to_dict(usage),
+        }
+        with self._lock:
+            self._entries[entry["key"]] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def get_cassette(path: str) -> Cassette:
+    """Return the process-wide Cassette for path."""
+    with _CASSETTES_LOCK:
+        cassette = _CASSETTES.get(path)
+        if cassette is None:
+            cassette = Cassette(path)
+            _CASSETTES[path] = cassette
+    return cassette
+
+
+class LiveBackend:
+    """Sends requests to the OpenAI API."""
+
+    def __init__(self, client: Any = None, async_client: Any = None):
+        """
+        Args:
+            client: openai.OpenAI instance for sync calls
+            async_client: openai.AsyncOpenAI instance for async calls
+        """
+        self.client = client
+        self.async_client = async_client
+
+    def create(self, **kwargs: Any) -> Any:
+        return self.client.chat.completions.create(**kwargs)
+
+    async def acreate(self, **kwargs: Any) -> Any:
+        return await self.async_client.chat.completions.create(**kwargs)
+
+
+class RecordingBackend:
+    """Forwards requests to another backend and writes every reply to a cassette."""
+
+    def __init__(self, inner: Any, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+
+    def create(self, **kwargs: Any) -> Any:
+        response = self.inner.create(**kwargs)
+        if kwargs.get("stream"):
+            return self._record_stream(kwargs, response)
+        self.cassette.record(kwargs, response.choices[0].message.content, response.usage)
+        return response
+
+    async def acreate(self, **kwargs: Any) -> Any:
+        response = await self.inner.acreate(**kwargs)
+        if kwargs.get("stream"):
+            return self._arecord_stream(kwargs, response)
+        self.cassette.record(kwargs, response.choices[0].message.content, response.usage)
+        return response
+
+    def _record_stream(self, kwargs: Dict[str, Any], stream: Any) -> Iterator[Any]:
+        parts, usage = [], None
+        for chunk in stream:
+            usage = chunk.usage or usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+            yield chunk
+        self.cassette.record(kwargs, "".join(parts), usage)
+
+    async def _arecord_stream(self, kwargs: Dict[str, Any], stream: Any) -> AsyncIterator[Any]:
+        parts, usage = [], None
+        async for chunk in stream:
+            usage = chunk.usage or usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+            yield chunk
+        self.cassette.record(kwargs, "".join(parts), usage)
+
+
+class ReplayBackend:
+    """Serves recorded replies from a cassette without any network access."""
+
+    def __init__(self, cassette: Cassette, latency_ms: float = 0):
+        """
+        Args:
+            cassette: Cassette to replay
+            latency_ms: Artificial latency added to every call
+        """
+        self.cassette = cassette
+        self.latency = latency_ms / 1000
+
+    def create(self, **kwargs: Any) -> Any:
+        entry = self.cassette.lookup(kwargs)
+        if self.latency:
+            time.sleep(self.latency)
+        if kwargs.get("stream"):
+            return iter(self._chunks(entry))
+        return self._response(entry)
+
+    async def acreate(self, **kwargs: Any) -> Any:
+        entry = self.cassette.lookup(kwargs)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if kwargs.get("stream"):
+            return self._achunks(entry)
+        return self._response(entry)
+
+    @staticmethod
+    def _response(entry: Dict[str, Any]) -> Any:
+        message = SimpleNamespace(content=entry["content"])
+        return SimpleNamespace(
+            model=entry["model"],
+            choices=[SimpleNamespace(message=message, finish_reason="stop")],
+            usage=_usage_from_dict(entry.get("usage")),
+        )
+
+    @staticmethod
+    def _chunks(entry: Dict[str, Any]) -> list:
+        delta = SimpleNamespace(content=entry["content"])
+        return [
+            SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason="stop")], usage=None),
+            SimpleNamespace(choices=[], usage=_usage_from_dict(entry.get("usage"))),
+        ]
+
+    async def _achunks(self, entry: Dict[str, Any]) -> AsyncIterator[Any]:
+        for chunk in self._chunks(entry):
+            yield chunk
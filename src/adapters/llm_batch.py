@@ -0,0 +1,242 @@
+"""Batch execution of chat completion requests (OpenAI Batch API or a local stand-in)."""
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Any, Optional, Tuple
+from infra.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+TERMINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+
+class BatchResult:
+    """Outcome of one request in a batch."""
+
+    def __init__(self, content: Optional[str], usage: Any = None, error: Optional[str] = None):
+        self.content = content
+        self.usage = usage
+        self.error = error
+
+
+def _usage(usage: Optional[Dict[str, Any]]) -> Any:
+    """Usage object shaped like the API's from a batch output body."""
+    if not usage:
+        return None
+    details = usage.get("prompt_tokens_details") or {}
+    return SimpleNamespace(
+        prompt_tokens=usage.get("prompt_tokens", 0),
+        completion_tokens=usage.get("completion_tokens", 0),
+        total_tokens=usage.get("total_tokens", 0),
+        prompt_tokens_details=SimpleNamespace(cached_tokens=details.get("cached_tokens", 0)),
+    )
+
+
+def parse_output_line(line: str) -> Tuple[str, BatchResult]:
+    """Parse one line of a batch output file into (custom_id, BatchResult)."""
+    record = json.loads(line)
+    custom_id = record["custom_id"]
+    response = record.get("response") or {}
+    if record.get("error") or response.get("status_code", 200) != 200:
+        return custom_id, BatchResult(None, error=json.dumps(record.get("error") or response.get("body")))
+    body = response["body"]
+    return custom_id, BatchResult(body["choices"][0]["message"]["content"], _usage(body.get("usage")))
+
+
+class BatchProvider(ABC):
+    """Interface for batch providers: submit a JSONL job, poll it, fetch its results."""
+
+    @abstractmethod
+    def submit(self, input_path: Path) -> str:
+        """Submit the JSONL request file and return the batch id."""
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """Return the batch status (one of TERMINAL_STATES once finished)."""
+
+    @abstractmethod
+    def results(self, batch_id: str) -> Dict[str, BatchResult]:
+        """Return the results a finished batch has written (possibly partial) keyed by custom_id."""
+
+    @abstractmethod
+    def cancel(self, batch_id: str) -> None:
+        """Stop a batch that is still running."""
+
+
+class OpenAIBatchProvider(BatchProvider):
+    """Runs jobs through the OpenAI Batch API (/v1/chat/completions, 24h window)."""
+
+    def __init__(self, client: Any):
+        """
+        Args:
+            client: openai.OpenAI instance
+        """
+        self.client = client
+
+    def submit(self, input_path: Path) -> str:
+        with open(input_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def cancel(self, batch_id: str) -> None:
+        self.client.batches.cancel(batch_id)
+
+    def results(self, batch_id: str) -> Dict[str, BatchResult]:
+        batch = self.client.batches.retrieve(batch_id)
+        results = {}
+        # expired and cancelled batches keep the output of the requests that did finish
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    custom_id, result = parse_output_line(line)
+                    results[custom_id] = result
+        return results
+
+
+class LocalBatchProvider(BatchProvider):
+    """
+    File-based stand-in for the Batch API.
+
+    Each job gets a directory under work_dir with input.jsonl and output.jsonl
+    in the Batch API formats. Requests are executed through a chat completion
+    backend (e.g. a replay backend for offline testing) when the job is polled.
+    """
+
+    def __init__(self, work_dir: str, backend: Any):
+        """
+        Args:
+            work_dir: Directory holding one sub-directory per batch job
+            backend: Backend executing the requests (see adapters.llm_backends)
+        """
+        self.work_dir = Path(work_dir)
+        self.backend = backend
+
+    def submit(self, input_path: Path) -> str:
+        batch_id = f"local_batch_{uuid.uuid4().hex[:12]}"
+        job_dir = self.work_dir / batch_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        (job_dir / "input.jsonl").write_text(Path(input_path).read_text())
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        job_dir = self.work_dir / batch_id
+        if not (job_dir / "output.jsonl").exists():
+            self._execute(job_dir)
+        return "completed"
+
+    def cancel(self, batch_id: str) -> None:
+        # jobs execute synchronously when polled, so there is never one in flight
+        pass
+
+    def results(self, batch_id: str) -> Dict[str, BatchResult]:
+        results = {}
+        output_path = self.work_dir / batch_id / "output.jsonl"
+        if not output_path.exists():
+            return results
+        with open(output_path, "r") as f:
+            for line in f:
+                if line.strip():
+                    custom_id, result = parse_output_line(line)
+                    results[custom_id] = result
+        return results
+
+    def _execute(self, job_dir: Path) -> None:
+        lines = []
+        with open(job_dir / "input.jsonl", "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                record = {"id": uuid.uuid4().hex, "custom_id": request["custom_id"], "error": None}
+                try:
+                    response = self.backend.create(**request["body"])
+                    usage = response.usage
+                    details = getattr(usage, "prompt_tokens_details", None)
+                    record["response"] = {
+                        "status_code": 200,
+                        "body": {
+                            "choices": [{"message": {"content": response.choices[0].message.content}}],
+                            "usage": {
+                                "prompt_tokens": getattr(usage, "prompt_tokens", 0),
+                                "completion_tokens": getattr(usage, "completion_tokens", 0),
+                                "total_tokens": getattr(usage, "total_tokens", 0),
+                                "prompt_tokens_details": {"cached_tokens": getattr(details, "cached_tokens", 0)},
+                            },
+                        },
+                    }
+                except Exception as error:
+                    record["response"] = None
+                    record["error"] = {"message": str(error)}
+                lines.append(json.dumps(record, ensure_ascii=False))
+        (job_dir / "output.jsonl").write_text("\n".join(lines) + "\n")
+
+
+def run_batch(
+    provider: BatchProvider,
+    requests: Dict[str, Dict[str, Any]],
+    work_dir: str,
+    poll_interval_s: float = 30,
+    timeout_s: float = 24 * 3600,
+) -> Dict[str, BatchResult]:
+    """
+    Write requests to a JSONL job, submit it and wait for the results.
+
+    Args:
+        provider: Batch provider
+        requests: Chat completion kwargs keyed by custom_id
+        work_dir: Directory for the job input file
+        poll_interval_s: Seconds between status polls
+        timeout_s: Give up after this many seconds
+
+    Returns:
+        BatchResult per custom_id (failed or missing requests carry an error)
+
+    Raises:
+        TimeoutError: If the batch is still running after timeout_s; it is cancelled first
+    """
+    if not requests:
+        return {}
+
+    work_path = Path(work_dir)
+    work_path.mkdir(parents=True, exist_ok=True)
+    input_path = work_path / f"requests_{uuid.uuid4().hex[:12]}.jsonl"
+    with open(input_path, "w") as f:
+        for custom_id, body in requests.items():
+            line = {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body}
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    batch_id = provider.submit(input_path)
+    logger.info(f"Submitted batch {batch_id} with {len(requests)} requests")
+
+    deadline = time.monotonic() + timeout_s
+    status = provider.status(batch_id)
+    while status not in TERMINAL_STATES:
+        if time.monotonic() > deadline:
+            try:
+                provider.cancel(batch_id)
+            except Exception as error:
+                logger.warning(f"Could not cancel batch {batch_id}: {type(error).__name__}: {error}")
+            raise TimeoutError(f"Batch {batch_id} did not finish within {timeout_s}s (status: {status}); cancelled it")
+        time.sleep(poll_interval_s)
+        status = provider.status(batch_id)
+
+    logger.info(f"Batch {batch_id} finished with status: {status}")
+    # an expired, failed or cancelled batch may still hold results for part of its requests
+    results = provider.results(batch_id)
+    for custom_id in requests:
+        if custom_id not in results:
+            results[custom_id] = BatchResult(None, error=f"no result (batch status: {status})")
+    return results
@@ -0,0 +1,211 @@
+"""Persistent, content-addressed cache for LLM responses."""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from infra.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+_CACHES: Dict[str, "ResponseCache"] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def request_key(
+    model: str,
+    temperature: float,
+    response_format: Optional[Dict[str, Any]],
+    messages: List[Dict[str, str]],
+) -> str:
+    """
+    Build the cache key for a chat completion request.
+
+    Args:
+        model: Model name
+        temperature: Sampling temperature
+        response_format: Response format passed to the API (or None)
+        messages: Chat messages sent to the API
+
+    Returns:
+        Hex digest identifying the request
+    """
+    prompt_hash = hashlib.sha256(
+        json.dumps(messages, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+    payload = json.dumps(
+        {
+            "model": model,
+            "temperature": temperature,
+            "response_format": response_format,
+            "prompt": prompt_hash,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed LRU cache with size and age based eviction."""
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 5000,
+        max_mb: float = 200,
+        max_age_days: float = 30,
+        refresh: bool = False,
+    ):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Path to the SQLite file
+            max_entries: Maximum number of cached responses
+            max_mb: Maximum total size of cached responses in megabytes
+            max_age_days: Entries older than this are treated as misses and evicted
+            refresh: If True, every lookup misses but new responses are still stored
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_age = max_age_days * 86400
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT,
+                size INTEGER,
+                created REAL,
+                accessed REAL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses (accessed)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key from request_key()
+
+        Returns:
+            Cached response content, or None on a miss
+        """
+        if self.refresh:
+            self.misses += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """
+        Store a response and evict old entries if the cache is over budget.
+
+        Args:
+            key: Key from request_key()
+            model: Model name (kept for inspection only)
+            response: Response content
+        """
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def discard(self, key: str) -> None:
+        """
+        Remove a stored response, e.g. one that failed validation.
+
+        Args:
+            key: Key from request_key()
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones until within budget."""
+        self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.max_age,))
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed ASC").fetchall()
+        stale = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            stale.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+        logger.info(f"Evicted {len(stale)} cached LLM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current cache size."""
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": count, "bytes": total}
+
+
+def get_response_cache(config: Dict[str, Any]) -> Optional[ResponseCache]:
+    """
+    Return the process-wide response cache described by config["cache"].
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Shared ResponseCache, or None if caching is disabled
+    """
+    cache_config = config.get("cache") or {}
+    if not cache_config.get("enabled", False):
+        return None
+
+    path = cache_config.get("path", ".cache/llm_responses.sqlite")
+    with _CACHES_LOCK:
+        cache = _CACHES.get(path)
+        if cache is None:
+            cache = ResponseCache(
+                path,
+                max_entries=cache_config.get("max_entries", 5000),
+                max_mb=cache_config.get("max_mb", 200),
+                max_age_days=cache_config.get("max_age_days", 30),
+            )
+            _CACHES[path] = cache
+        cache.refresh = cache_config.get("refresh", False)
+    return cache
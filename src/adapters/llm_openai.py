@@ -1,84 +1,797 @@
 """OpenAI LLM adapter with JSON-only helpers."""
+import asyncio
 import json
 import os
-from typing import Dict, Any, Optional
-from openai import OpenAI
-from dotenv import load_dotenv
-load_dotenv(dotenv_path=".apikey")
+import threading
+import time
+import weakref
+from typing import Dict, Any, Optional, Tuple, Type, Iterator, AsyncIterator
+from pydantic import BaseModel
+from adapters.llm_cache import ResponseCache, request_key, get_response_cache
+from adapters.json_stream import IncrementalJSONParser
+from adapters.llm_backends import BACKEND_MODES, LiveBackend, RecordingBackend, ReplayBackend, get_cassette
+from adapters.llm_scheduler import ScheduledBackend, consume_call_stats
+from adapters.llm_batch import BatchProvider, OpenAIBatchProvider, LocalBatchProvider
+from adapters.structured_output import SchemaValidationError, correction_prompt, parse_reply, response_format
+from infra.logging import setup_logger
+from infra.metering import UsageMeter
 
+logger = setup_logger(__name__)
 
-class OpenAIClient:
+# Shared backends and clients, see get_client() / get_async_client()
+BackendKey = Tuple[Optional[str], str, str]
+ClientKey = Tuple[str, float, BackendKey, Optional[ResponseCache], int]
+_BACKENDS: Dict[BackendKey, Any] = {}
+_CLIENTS: Dict[ClientKey, "OpenAIClient"] = {}
+# Async HTTP pools are bound to the event loop that created them
+_ASYNC_BACKENDS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[BackendKey, Any]]" = weakref.WeakKeyDictionary()
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[ClientKey, AsyncOpenAIClient]]" = weakref.WeakKeyDictionary()
+_REGISTRY_LOCK = threading.Lock()
+# The openai SDK, httpx and dotenv are imported when the first live client is built,
+# so replaying cassettes, serving from the cache and the CLI's startup never load them
+_DOTENV_LOADED = False
+
+
+def _require_api_key() -> str:
+    """Return the OpenAI API key or raise if it is not configured."""
+    global _DOTENV_LOADED
+    if not _DOTENV_LOADED:
+        from dotenv import load_dotenv
+        load_dotenv(dotenv_path=".apikey")
+        _DOTENV_LOADED = True
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set")
+    return api_key
+
+
+class _ChatClientBase:
+    """Request building and response caching shared by the sync and async clients."""
+
+    def __init__(
+        self,
+        model_name: str,
+        temperature: float,
+        cache: Optional[ResponseCache],
+    ):
+        self.model_name = model_name
+        self.temperature = temperature
+        self.cache = cache
+        # re-requests of a call whose reply fails schema validation after local repair
+        self.schema_retries = 1
+
+    def _build_request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response_format: Optional[Dict[str, Any]],
+    ) -> Tuple[Dict[str, Any], Optional[str], Optional[str]]:
+        """
+        Build the API kwargs and look the request up in the cache.
+
+        Returns:
+            Tuple of (kwargs, cache key, cached content)
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+        kwargs = {
+            "model": self.model_name,
+            "messages": messages,
+            "temperature": self.temperature,
+        }
+
+        if response_format:
+            kwargs["response_format"] = response_format
+
+        key = None
+        cached = None
+        if self.cache is not None:
+            key = request_key(self.model_name, self.temperature, response_format, messages)
+            cached = self.cache.get(key)
+        return kwargs, key, cached
+
+    def _store(self, key: Optional[str], content: Optional[str]) -> None:
+        """Store a fresh response in the cache."""
+        if key is not None and content:
+            self.cache.put(key, self.model_name, content)
+
+    def _discard(self, system_prompt: str, user_prompt: str, response_format: Dict[str, Any]) -> None:
+        """Drop a cached response that failed validation so it is not served again."""
+        if self.cache is not None:
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ]
+            self.cache.discard(request_key(self.model_name, self.temperature, response_format, messages))
+
+    def _validate(
+        self,
+        content: str,
+        schema: Type[BaseModel],
+        system_prompt: str,
+        user_prompt: str,
+        attempt: int,
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Validate a structured reply.
+
+        Returns:
+            Tuple of (validated reply, None) or (None, user prompt for the re-request)
+
+        Raises:
+            SchemaValidationError: If the reply is invalid and no re-requests are left
+        """
+        try:
+            return parse_reply(content, schema), None
+        except SchemaValidationError as error:
+            self._discard(system_prompt, user_prompt, response_format(schema))
+            if attempt >= self.schema_retries:
+                raise
+            logger.warning(f"{self.model_name} reply failed validation ({error}), re-requesting this call")
+            return None, correction_prompt(user_prompt, error)
+
+    def _record(
+        self,
+        meter: Optional[UsageMeter],
+        started: float,
+        usage: Any = None,
+        cache_hit: bool = False,
+        **extra: Any,
+    ) -> None:
+        """Record wall time and token usage of a call on the meter, if any."""
+        if meter is not None:
+            meter.record(self.model_name, time.perf_counter() - started, usage, cache_hit, **extra)
+
+    def prepare_batch_request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        schema: Optional[Type[BaseModel]] = None,
+    ) -> Tuple[Dict[str, Any], Optional[str], Optional[str]]:
+        """
+        Build a JSON request for batch submission.
+
+        The kwargs and cache key are the same as for chat_completion_json(), so
+        batch and interactive runs share cached responses and cassettes.
+
+        Returns:
+            Tuple of (kwargs, cache key, cached content)
+        """
+        reply_format = response_format(schema) if schema else {"type": "json_object"}
+        return self._build_request(system_prompt, user_prompt, reply_format)
+
+    def finish_batch_request(
+        self,
+        key: Optional[str],
+        content: str,
+        meter: Optional[UsageMeter],
+        started: float,
+        usage: Any = None,
+        cache_hit: bool = False,
+        price_factor: float = 1.0,
+        schema: Optional[Type[BaseModel]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Record, validate and cache a batch result prepared by prepare_batch_request().
+
+        Args:
+            key: Cache key returned by prepare_batch_request()
+            content: Response content
+            meter: Optional meter recording the call
+            started: perf_counter() value when the request was prepared
+            usage: The result's usage object
+            cache_hit: True if served from the local response cache
+            price_factor: Multiplier on the cost estimate (batch discount)
+            schema: Reply schema passed to prepare_batch_request()
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            SchemaValidationError: If the reply does not match the schema after
+                local repair; re-request it with chat_completion_json()
+        """
+        if cache_hit:
+            self._record(meter, started, cache_hit=True)
+        else:
+            self._record(meter, started, usage, price_factor=price_factor, batch=True)
+        if schema is None:
+            result = json.loads(content)
+        else:
+            try:
+                result = parse_reply(content, schema)
+            except SchemaValidationError:
+                if cache_hit and key is not None:
+                    self.cache.discard(key)
+                raise
+        if not cache_hit:
+            self._store(key, content)
+        return result
+
+
+class OpenAIClient(_ChatClientBase):
     """Thin wrapper for OpenAI chat completion."""
-    
-    def __init__(self, model_name: str = "gpt-4o-mini", temperature: float = 0.1):
+
+    def __init__(
+        self,
+        model_name: str = "gpt-4o-mini",
+        temperature: float = 0.1,
+        cache: Optional[ResponseCache] = None,
+        backend: Any = None,
+    ):
         """
         Initialize OpenAI client.
-        
+
         Args:
             model_name: Model name (e.g., "gpt-4o-mini")
             temperature: Temperature for sampling (0-0.2 recommended)
+            cache: Optional response cache shared across clients
+            backend: Optional backend serving the requests (see adapters.llm_backends);
+                defaults to a live OpenAI backend
         """
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY environment variable not set")
-        
-        self.client = OpenAI(api_key=api_key)
-        self.model_name = model_name
-        self.temperature = temperature
-    
+        super().__init__(model_name, temperature, cache)
+        if backend is None:
+            from openai import OpenAI
+            backend = LiveBackend(client=OpenAI(api_key=_require_api_key()))
+        self.backend = backend
+
     def chat_completion(
         self,
         system_prompt: str,
         user_prompt: str,
         response_format: Optional[Dict[str, Any]] = None,
+        meter: Optional[UsageMeter] = None,
     ) -> str:
         """
         Make a chat completion request.
-        
+
         Args:
             system_prompt: System prompt
             user_prompt: User prompt
             response_format: Optional response format (e.g., {"type": "json_object"})
-            
+            meter: Optional meter recording latency, tokens and cost of the call
+
         Returns:
             Response content as string
         """
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-        
-        kwargs = {
-            "model": self.model_name,
-            "messages": messages,
-            "temperature": self.temperature,
-        }
-        
-        if response_format:
-            kwargs["response_format"] = response_format
-        
-        response = self.client.chat.completions.create(**kwargs)
-        return response.choices[0].message.content
-    
+        started = time.perf_counter()
+        kwargs, key, cached = self._build_request(system_prompt, user_prompt, response_format)
+        if cached is not None:
+            self._record(meter, started, cache_hit=True)
+            return cached
+
+        response = self.backend.create(**kwargs)
+        content = response.choices[0].message.content
+        self._record(meter, started, response.usage, **consume_call_stats())
+        self._store(key, content)
+        return content
+
     def chat_completion_json(
         self,
         system_prompt: str,
         user_prompt: str,
+        meter: Optional[UsageMeter] = None,
+        schema: Optional[Type[BaseModel]] = None,
     ) -> Dict[str, Any]:
         """
         Make a chat completion request with JSON response.
-        
+
+        With a schema, the request uses a strict json_schema response format
+        and the reply is validated, repaired locally if needed, and re-requested
+        (this call only) if it still does not match.
+
         Args:
             system_prompt: System prompt
             user_prompt: User prompt (should mention JSON output)
-            
+            meter: Optional meter recording latency, tokens and cost of the call
+            schema: Optional reply schema (see domain.schemas)
+
         Returns:
             Parsed JSON response
+
+        Raises:
+            SchemaValidationError: If the reply stays invalid after the re-requests
         """
+        if schema is not None:
+            prompt = user_prompt
+            for attempt in range(self.schema_retries + 1):
+                content = self.chat_completion(system_prompt, prompt, response_format(schema), meter)
+                result, prompt = self._validate(content, schema, system_prompt, prompt, attempt)
+                if result is not None:
+                    return result
+
         response = self.chat_completion(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             response_format={"type": "json_object"},
+            meter=meter,
+        )
+        return json.loads(response)
+
+    def chat_completion_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response_format: Optional[Dict[str, Any]] = None,
+        meter: Optional[UsageMeter] = None,
+    ) -> Iterator[str]:
+        """
+        Make a streaming chat completion request.
+
+        A cached response is yielded as a single chunk.
+
+        Args:
+            system_prompt: System prompt
+            user_prompt: User prompt
+            response_format: Optional response format (e.g., {"type": "json_object"})
+            meter: Optional meter recording latency, tokens and cost of the call
+
+        Yields:
+            Content deltas as they arrive
+        """
+        started = time.perf_counter()
+        kwargs, key, cached = self._build_request(system_prompt, user_prompt, response_format)
+        if cached is not None:
+            self._record(meter, started, cache_hit=True)
+            yield cached
+            return
+
+        parts = []
+        usage = None
+        first_token = None
+        stream = self.backend.create(
+            stream=True, stream_options={"include_usage": True}, **kwargs
+        )
+        call_stats = consume_call_stats()
+        for chunk in stream:
+            usage = chunk.usage or usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                parts.append(delta)
+                yield delta
+        self._record(meter, started, usage, time_to_first_token_s=round(first_token or 0.0, 4), **call_stats)
+        self._store(key, "".join(parts))
+
+    def chat_completion_json_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        meter: Optional[UsageMeter] = None,
+        schema: Optional[Type[BaseModel]] = None,
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Stream a JSON object response, yielding each top-level member once complete.
+
+        Members are not validated; callers validate the collected object
+        against the schema once the stream ends.
+
+        Args:
+            system_prompt: System prompt
+            user_prompt: User prompt (should mention JSON output)
+            meter: Optional meter recording latency, tokens and cost of the call
+            schema: Optional reply schema sent as a json_schema response format
+
+        Yields:
+            (key, value) pairs in the order the model writes them
+        """
+        parser = IncrementalJSONParser()
+        stream = self.chat_completion_stream(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            response_format=response_format(schema) if schema else {"type": "json_object"},
+            meter=meter,
+        )
+        for delta in stream:
+            yield from parser.feed(delta)
+
+
+class AsyncOpenAIClient(_ChatClientBase):
+    """Async twin of OpenAIClient built on AsyncOpenAI."""
+
+    def __init__(
+        self,
+        model_name: str = "gpt-4o-mini",
+        temperature: float = 0.1,
+        cache: Optional[ResponseCache] = None,
+        backend: Any = None,
+    ):
+        """
+        Initialize async OpenAI client.
+
+        Args:
+            model_name: Model name (e.g., "gpt-4o-mini")
+            temperature: Temperature for sampling (0-0.2 recommended)
+            cache: Optional response cache shared across clients
+            backend: Optional backend serving the requests (see adapters.llm_backends);
+                defaults to a live AsyncOpenAI backend
+        """
+        super().__init__(model_name, temperature, cache)
+        if backend is None:
+            from openai import AsyncOpenAI
+            backend = LiveBackend(async_client=AsyncOpenAI(api_key=_require_api_key()))
+        self.backend = backend
+
+    async def chat_completion(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response_format: Optional[Dict[str, Any]] = None,
+        meter: Optional[UsageMeter] = None,
+    ) -> str:
+        """
+        Make a chat completion request without blocking the event loop.
+
+        Args:
+            system_prompt: System prompt
+            user_prompt: User prompt
+            response_format: Optional response format (e.g., {"type": "json_object"})
+            meter: Optional meter recording latency, tokens and cost of the call
+
+        Returns:
+            Response content as string
+        """
+        started = time.perf_counter()
+        kwargs, key, cached = self._build_request(system_prompt, user_prompt, response_format)
+        if cached is not None:
+            self._record(meter, started, cache_hit=True)
+            return cached
+
+        response = await self.backend.acreate(**kwargs)
+        content = response.choices[0].message.content
+        self._record(meter, started, response.usage, **consume_call_stats())
+        self._store(key, content)
+        return content
+
+    async def chat_completion_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        meter: Optional[UsageMeter] = None,
+        schema: Optional[Type[BaseModel]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Make an async chat completion request with JSON response.
+
+        Args:
+            system_prompt: System prompt
+            user_prompt: User prompt (should mention JSON output)
+            meter: Optional meter recording latency, tokens and cost of the call
+            schema: Optional reply schema, see OpenAIClient.chat_completion_json()
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            SchemaValidationError: If the reply stays invalid after the re-requests
+        """
+        if schema is not None:
+            prompt = user_prompt
+            for attempt in range(self.schema_retries + 1):
+                content = await self.chat_completion(system_prompt, prompt, response_format(schema), meter)
+                result, prompt = self._validate(content, schema, system_prompt, prompt, attempt)
+                if result is not None:
+                    return result
+
+        response = await self.chat_completion(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            response_format={"type": "json_object"},
+            meter=meter,
         )
         return json.loads(response)
 
+    async def chat_completion_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response_format: Optional[Dict[str, Any]] = None,
+        meter: Optional[UsageMeter] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Make an async streaming chat completion request.
+
+        Args:
+            system_prompt: System prompt
+            user_prompt: User prompt
+            response_format: Optional response format (e.g., {"type": "json_object"})
+            meter: Optional meter recording latency, tokens and cost of the call
+
+        Yields:
+            Content deltas as they arrive
+        """
+        started = time.perf_counter()
+        kwargs, key, cached = self._build_request(system_prompt, user_prompt, response_format)
+        if cached is not None:
+            self._record(meter, started, cache_hit=True)
+            yield cached
+            return
+
+        parts = []
+        usage = None
+        first_token = None
+        stream = await self.backend.acreate(
+            stream=True, stream_options={"include_usage": True}, **kwargs
+        )
+        call_stats = consume_call_stats()
+        async for chunk in stream:
+            usage = chunk.usage or usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                parts.append(delta)
+                yield delta
+        self._record(meter, started, usage, time_to_first_token_s=round(first_token or 0.0, 4), **call_stats)
+        self._store(key, "".join(parts))
+
+    async def chat_completion_json_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        meter: Optional[UsageMeter] = None,
+        schema: Optional[Type[BaseModel]] = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Async variant of OpenAIClient.chat_completion_json_stream().
+
+        Args:
+            system_prompt: System prompt
+            user_prompt: User prompt (should mention JSON output)
+            meter: Optional meter recording latency, tokens and cost of the call
+            schema: Optional reply schema sent as a json_schema response format
+
+        Yields:
+            (key, value) pairs in the order the model writes them
+        """
+        parser = IncrementalJSONParser()
+        stream = self.chat_completion_stream(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            response_format=response_format(schema) if schema else {"type": "json_object"},
+            meter=meter,
+        )
+        async for delta in stream:
+            for field in parser.feed(delta):
+                yield field
+
+
+def _http_options(llm_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Connection pool limits and timeouts from config["llm"]."""
+    import httpx
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=llm_config.get("max_connections", 20),
+            max_keepalive_connections=llm_config.get("max_keepalive_connections", 10),
+            keepalive_expiry=llm_config.get("keepalive_expiry", 30),
+        ),
+        "timeout": httpx.Timeout(
+            llm_config.get("timeout", 120),
+            connect=llm_config.get("connect_timeout", 10),
+        ),
+    }
+
+
+def _backend_settings(config: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Backend mode ("live", "record" or "replay") and the llm config section."""
+    llm_config = config.get("llm") or {}
+    mode = llm_config.get("backend") or "live"
+    if mode not in BACKEND_MODES:
+        raise ValueError(f"Unknown LLM backend '{mode}', expected one of {BACKEND_MODES}")
+    return mode, llm_config
+
+
+# config["llm"] settings a backend is built with (scheduler, HTTP pool, cassette)
+_BACKEND_SETTINGS = (
+    "rate_limits", "max_retries", "backoff_base_s", "backoff_max_s", "expected_completion_tokens",
+    "max_connections", "max_keepalive_connections", "keepalive_expiry", "timeout", "connect_timeout",
+    "cassette", "replay_latency_ms",
+)
+
+
+def _backend_key(base_url: Optional[str], config: Dict[str, Any]) -> BackendKey:
+    """
+    Registry key (base_url, backend mode, settings snapshot) of a backend.
+
+    The snapshot covers every llm setting the backend bakes in, so a config
+    with other rate limits, retries, pool limits or cassette gets its own backend.
+    """
+    mode, llm_config = _backend_settings(config)
+    settings = json.dumps({name: llm_config.get(name) for name in _BACKEND_SETTINGS}, sort_keys=True, default=str)
+    return base_url, mode, settings
+
+
+def _wrap_backend(live: Any, mode: str, llm_config: Dict[str, Any]) -> Any:
+    """
+    Build the backend for a mode from a live backend factory.
+
+    Live calls always go through the rate-limiting scheduler; the factory is
+    only invoked for live and record mode.
+    """
+    if mode == "record":
+        return RecordingBackend(
+            ScheduledBackend(live(), llm_config),
+            get_cassette(llm_config.get("cassette", "cassettes/default.jsonl")),
+        )
+    if mode == "replay":
+        return ReplayBackend(
+            get_cassette(llm_config.get("cassette", "cassettes/default.jsonl")),
+            latency_ms=llm_config.get("replay_latency_ms", 0),
+        )
+    return ScheduledBackend(live(), llm_config)
+
+
+def _get_backend(base_url: Optional[str], config: Dict[str, Any]) -> Any:
+    """Return the shared sync backend (and its keep-alive HTTP pool) for base_url and the llm settings."""
+    mode, llm_config = _backend_settings(config)
+    key = _backend_key(base_url, config)
+    backend = _BACKENDS.get(key)
+    if backend is None:
+        def live():
+            import httpx
+            from openai import OpenAI
+
+            http_client = httpx.Client(**_http_options(llm_config))
+            # retries are handled by the scheduler
+            return LiveBackend(client=OpenAI(
+                api_key=_require_api_key(), base_url=base_url, http_client=http_client, max_retries=0,
+            ))
+
+        backend = _wrap_backend(live, mode, llm_config)
+        _BACKENDS[key] = backend
+    return backend
+
+
+def _get_async_backend(loop: asyncio.AbstractEventLoop, base_url: Optional[str], config: Dict[str, Any]) -> Any:
+    """Return the async backend for base_url and the llm settings on the given event loop."""
+    mode, llm_config = _backend_settings(config)
+    key = _backend_key(base_url, config)
+    backends = _ASYNC_BACKENDS.setdefault(loop, {})
+    backend = backends.get(key)
+    if backend is None:
+        def live():
+            import httpx
+            from openai import AsyncOpenAI
+
+            http_client = httpx.AsyncClient(**_http_options(llm_config))
+            return LiveBackend(async_client=AsyncOpenAI(
+                api_key=_require_api_key(), base_url=base_url, http_client=http_client, max_retries=0,
+            ))
+
+        backend = _wrap_backend(live, mode, llm_config)
+        backends[key] = backend
+    return backend
+
+
+def _client_key(model_config: Dict[str, Any], config: Dict[str, Any]) -> ClientKey:
+    """
+    Registry key (model, temperature, backend key, cache, schema retries) for a model configuration.
+
+    Everything a client is configured with, including its backend's settings
+    (see _backend_key()), is part of the key, so runs with different configs
+    in one process (stream and serve mode) never share a client or backend
+    whose settings another run changes.
+    """
+    llm_config = config.get("llm") or {}
+    model_name = model_config.get("name") or "gpt-4o-mini"
+    temperature = model_config.get("temperature")
+    if temperature is None:
+        temperature = 0.1
+    base_url = model_config.get("base_url") or llm_config.get("base_url")
+    schema_retries = llm_config.get("schema_retries", 1)
+    return model_name, temperature, _backend_key(base_url, config), _client_cache(config), schema_retries
+
+
+def _client_cache(config: Dict[str, Any]) -> Optional[ResponseCache]:
+    """Response cache for the configured backend; cassettes must see every call."""
+    if _backend_settings(config)[0] != "live":
+        return None
+    return get_response_cache(config)
+
+
+def get_client(model_config: Dict[str, Any], config: Dict[str, Any]) -> OpenAIClient:
+    """
+    Return the shared OpenAIClient for a model configuration.
+
+    Clients are registered per (model, temperature, base_url) and all clients
+    for the same base_url and llm settings share one backend and its pooled,
+    keep-alive HTTP transport. config["llm"]["backend"] selects live, record or replay mode.
+
+    Args:
+        model_config: Model section of the config (e.g. config["model"])
+        config: Full configuration dictionary (uses the "llm" and "cache" sections)
+
+    Returns:
+        Shared OpenAIClient
+    """
+    key = _client_key(model_config, config)
+    model_name, temperature, (base_url, _, _), cache, schema_retries = key
+    with _REGISTRY_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = OpenAIClient(
+                model_name=model_name,
+                temperature=temperature,
+                cache=cache,
+                backend=_get_backend(base_url, config),
+            )
+            client.schema_retries = schema_retries
+            _CLIENTS[key] = client
+    return client
+
+
+def get_async_client(model_config: Dict[str, Any], config: Dict[str, Any]) -> AsyncOpenAIClient:
+    """
+    Return the shared AsyncOpenAIClient for a model configuration.
+
+    Same registry semantics as get_client(), scoped to the running event loop
+    because async HTTP pools cannot be shared across loops. Must be called
+    from inside a coroutine.
+
+    Args:
+        model_config: Model section of the config (e.g. config["model"])
+        config: Full configuration dictionary (uses the "llm" and "cache" sections)
+
+    Returns:
+        Shared AsyncOpenAIClient
+    """
+    loop = asyncio.get_running_loop()
+    key = _client_key(model_config, config)
+    model_name, temperature, (base_url, _, _), cache, schema_retries = key
+    with _REGISTRY_LOCK:
+        clients = _ASYNC_CLIENTS.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = AsyncOpenAIClient(
+                model_name=model_name,
+                temperature=temperature,
+                cache=cache,
+                backend=_get_async_backend(loop, base_url, config),
+            )
+            client.schema_retries = schema_retries
+            clients[key] = client
+    return client
+
+
+def get_batch_provider(config: Dict[str, Any]) -> Tuple[BatchProvider, float]:
+    """
+    Return the batch provider selected by config["batch"]["provider"].
+
+    "openai" submits jobs to the OpenAI Batch API; "local" executes them
+    through the configured llm.backend, which is also used whenever that
+    backend is record or replay so cassettes keep working.
+
+    Args:
+        config: Full configuration dictionary (uses the "batch" and "llm" sections)
+
+    Returns:
+        Tuple of (provider, price factor applied to the cost estimates)
+    """
+    batch_config = config.get("batch") or {}
+    mode, llm_config = _backend_settings(config)
+    provider = batch_config.get("provider", "openai")
+    if provider not in ("openai", "local"):
+        raise ValueError(f"Unknown batch provider '{provider}', expected 'openai' or 'local'")
+
+    base_url = llm_config.get("base_url")
+    if provider == "local" or mode != "live":
+        work_dir = batch_config.get("work_dir", ".cache/batches")
+        with _REGISTRY_LOCK:
+            backend = _get_backend(base_url, config)
+        return LocalBatchProvider(work_dir, backend), 1.0
+
+    import httpx
+    from openai import OpenAI
+
+    http_client = httpx.Client(**_http_options(llm_config))
+    client = OpenAI(api_key=_require_api_key(), base_url=base_url, http_client=http_client)
+    return OpenAIBatchProvider(client), batch_config.get("price_factor", 0.5)
@@ -0,0 +1,241 @@
+"""Rate-limit-aware request scheduling: per-model token buckets and retry with backoff."""
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from infra.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+# Scheduling stats of the last call made in the current thread / task, see consume_call_stats()
+_CALL_STATS: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("llm_call_stats", default=None)
+
+# Buckets are process-wide so every backend (sync or per event loop) shares the quota;
+# they are keyed on (model, rpm, tpm) so a config with other limits gets its own buckets
+_LIMITERS: Dict[Tuple[str, Optional[float], Optional[float]], "RateLimiter"] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """
+    Cheap prompt token estimate (about 4 characters per token plus per-message overhead).
+
+    Args:
+        messages: Chat messages
+
+    Returns:
+        Estimated prompt tokens
+    """
+    return sum(len(message.get("content") or "") // 4 + 4 for message in messages) + 3
+
+
+def consume_call_stats() -> Dict[str, Any]:
+    """Return and clear the scheduling stats of the last call in this context."""
+    stats = _CALL_STATS.get()
+    _CALL_STATS.set(None)
+    return stats or {}
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute` units per minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take `amount` units, going into debt if needed.
+
+        Returns:
+            Seconds the caller must wait before sending
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= min(amount, self.capacity)
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def adjust(self, delta: float) -> None:
+        """Correct an earlier reservation by `delta` units (positive takes more)."""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets for one model."""
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int) -> float:
+        """Reserve one request and `tokens` tokens; return the wait in seconds."""
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.reserve(tokens))
+        with self._lock:
+            if wait > 0:
+                self.waits += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+        return wait
+
+    def count_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def settle(self, estimated: int, usage: Any) -> None:
+        """Replace the token estimate with the actual usage once known."""
+        actual = getattr(usage, "total_tokens", None)
+        if self.tokens is not None and actual:
+            self.tokens.adjust(actual - estimated)
+
+
+def get_rate_limiter(model: str, llm_config: Dict[str, Any]) -> RateLimiter:
+    """
+    Return the process-wide rate limiter for a model and its configured limits.
+
+    Args:
+        model: Model name
+        llm_config: config["llm"]; limits come from rate_limits[model] (rpm, tpm)
+
+    Returns:
+        Shared RateLimiter (unlimited if the model has no configured limits)
+    """
+    limits = (llm_config.get("rate_limits") or {}).get(model) or {}
+    key = (model, limits.get("rpm"), limits.get("tpm"))
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(key)
+        if limiter is None:
+            limiter = RateLimiter(limits.get("rpm"), limits.get("tpm"))
+            _LIMITERS[key] = limiter
+    return limiter
+
+
+def scheduler_stats() -> Dict[str, Dict[str, Any]]:
+    """Queue-wait and retry metrics per model for this process."""
+    with _LIMITERS_LOCK:
+        limiters = dict(_LIMITERS)
+    stats: Dict[str, Dict[str, Any]] = {}
+    for (model, _, _), limiter in limiters.items():
+        totals = stats.setdefault(model, {"waits": 0, "total_wait_s": 0.0, "max_wait_s": 0.0, "retries": 0})
+        totals["waits"] += limiter.waits
+        totals["total_wait_s"] = round(totals["total_wait_s"] + limiter.total_wait, 3)
+        totals["max_wait_s"] = round(max(totals["max_wait_s"], limiter.max_wait), 3)
+        totals["retries"] += limiter.retries
+    return stats
+
+
+class ScheduledBackend:
+    """Wraps a backend with per-model rate limiting and jittered exponential backoff."""
+
+    def __init__(self, inner: Any, llm_config: Dict[str, Any]):
+        """
+        Args:
+            inner: Backend actually sending the requests
+            llm_config: config["llm"] (rate_limits, max_retries, backoff_base_s,
+                backoff_max_s, expected_completion_tokens)
+        """
+        self.inner = inner
+        self.llm_config = llm_config
+        self.max_retries = llm_config.get("max_retries", 5)
+        self.backoff_base = llm_config.get("backoff_base_s", 1.0)
+        self.backoff_max = llm_config.get("backoff_max_s", 60.0)
+        self.expected_completion = llm_config.get("expected_completion_tokens", 500)
+
+    def _backoff(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None if the error is not retryable."""
+        if attempt >= self.max_retries:
+            return None
+        # imported here so startup does not pay for the SDK; errors raised by it mean it is loaded
+        import openai
+        retryable = (
+            openai.RateLimitError,
+            openai.APIConnectionError,  # includes APITimeoutError
+            openai.InternalServerError,
+        )
+        if isinstance(error, openai.APIStatusError):
+            if not isinstance(error, retryable) and error.status_code < 500:
+                return None
+            headers = error.response.headers
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            if headers.get("retry-after"):
+                try:
+                    return float(headers["retry-after"])
+                except ValueError:
+                    pass
+        elif not isinstance(error, retryable):
+            return None
+        # full jitter
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _retry(self, limiter: RateLimiter, model: str, error: Exception, attempt: int) -> Optional[float]:
+        delay = self._backoff(error, attempt)
+        if delay is not None:
+            limiter.count_retry()
+            logger.warning(f"{model} request failed ({type(error).__name__}), retry {attempt + 1} in {delay:.1f}s")
+        return delay
+
+    def create(self, **kwargs: Any) -> Any:
+        model = kwargs["model"]
+        limiter = get_rate_limiter(model, self.llm_config)
+        estimated = estimate_tokens(kwargs["messages"]) + self.expected_completion
+        queue_wait = limiter.reserve(estimated)
+        time.sleep(queue_wait)
+
+        attempt = 0
+        while True:
+            try:
+                response = self.inner.create(**kwargs)
+                break
+            except Exception as error:
+                delay = self._retry(limiter, model, error, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay + limiter.reserve(estimated))
+
+        if not kwargs.get("stream"):
+            limiter.settle(estimated, response.usage)
+        _CALL_STATS.set({"queue_wait_s": round(queue_wait, 4), "retries": attempt})
+        return response
+
+    async def acreate(self, **kwargs: Any) -> Any:
+        model = kwargs["model"]
+        limiter = get_rate_limiter(model, self.llm_config)
+        estimated = estimate_tokens(kwargs["messages"]) + self.expected_completion
+        queue_wait = limiter.reserve(estimated)
+        await asyncio.sleep(queue_wait)
+
+        attempt = 0
+        while True:
+            try:
+                response = await self.inner.acreate(**kwargs)
+                break
+            except Exception as error:
+                delay = self._retry(limiter, model, error, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay + limiter.reserve(estimated))
+
+        if not kwargs.get("stream"):
+            limiter.settle(estimated, response.usage)
+        _CALL_STATS.set({"queue_wait_s": round(queue_wait, 4), "retries": attempt})
+        return response
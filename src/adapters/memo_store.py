@@ -0,0 +1,169 @@
+"""Stage-level memoization: stage outputs keyed on a content hash of their exact inputs."""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+from infra.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+_STORES: Dict[str, "MemoStore"] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def content_hash(value: Any) -> str:
+    """sha256 of a JSON-serializable value (key order independent)."""
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_hash(path: str) -> str:
+    """sha256 of a file's bytes ("" if the file does not exist)."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return ""
+
+
+class MemoStore:
+    """SQLite-backed store of stage outputs."""
+
+    def __init__(self, path: str, refresh: bool = False):
+        """
+        Open (or create) the memo database.
+
+        Args:
+            path: Path to the SQLite file
+            refresh: If True, every lookup misses but new outputs are still stored
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.refresh = refresh
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS outputs (
+                key TEXT PRIMARY KEY,
+                stage TEXT,
+                output TEXT,
+                created REAL
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a stage output.
+
+        Args:
+            key: Key from content_hash()
+
+        Returns:
+            Stored output, or None on a miss
+        """
+        if self.refresh:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT output FROM outputs WHERE key = ?", (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, key: str, stage: str, output: Any) -> None:
+        """
+        Store a stage output.
+
+        Args:
+            key: Key from content_hash()
+            stage: Stage name (kept for inspection only)
+            output: JSON-serializable output
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?)",
+                (key, stage, json.dumps(output, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+
+def get_memo_store(config: Dict[str, Any]) -> Optional[MemoStore]:
+    """
+    Return the process-wide memo store described by config["memo"].
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Shared MemoStore, or None if memoization is disabled
+    """
+    memo_config = config.get("memo") or {}
+    if not memo_config.get("enabled", False):
+        return None
+
+    path = memo_config.get("path", ".cache/memo.sqlite")
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = MemoStore(path)
+            _STORES[path] = store
+        store.refresh = memo_config.get("refresh", False)
+    return store
+
+
+def _lookup(state: Dict[str, Any], config: Dict[str, Any], stage: str, inputs: Any):
+    store = get_memo_store(config)
+    key = content_hash({"stage": stage, "inputs": inputs})
+    output = store.get(key) if store is not None else None
+    if output is not None:
+        logger.info(f"Reusing memoized output of {stage}")
+        _note(state, stage, "reused", key)
+    return store, key, output
+
+
+def _note(state: Dict[str, Any], stage: str, status: str, key: str) -> None:
+    state.setdefault("meta", {}).setdefault("memo", {})[stage] = {"status": status, "key": key[:16]}
+
+
+def memoized(state: Dict[str, Any], config: Dict[str, Any], stage: str, inputs: Any, compute: Callable[[], Any]) -> Any:
+    """
+    Return the stored output of a stage for these inputs, or compute and store it.
+
+    Whether the stage was computed or reused is noted in state["meta"]["memo"][stage].
+    Exceptions of compute() propagate and nothing is stored.
+
+    Args:
+        state: Pipeline state
+        config: Configuration (uses the "memo" section)
+        stage: Stage name, e.g. "jd_parser" or "ranker:work1"
+        inputs: Everything the stage output depends on (JSON-serializable)
+        compute: Computes the output on a miss
+
+    Returns:
+        Stage output
+    """
+    store, key, output = _lookup(state, config, stage, inputs)
+    if output is not None:
+        return output
+    output = compute()
+    if store is not None:
+        store.put(key, stage, output)
+    _note(state, stage, "computed", key)
+    return output
+
+
+async def amemoized(
+    state: Dict[str, Any], config: Dict[str, Any], stage: str, inputs: Any, compute: Callable[[], Awaitable[Any]]
+) -> Any:
+    """Async variant of memoized(); compute() returns an awaitable."""
+    store, key, output = _lookup(state, config, stage, inputs)
+    if output is not None:
+        return output
+    output = await compute()
+    if store is not None:
+        store.put(key, stage, output)
+    _note(state, stage, "computed", key)
+    return output
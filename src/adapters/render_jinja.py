@@ -1,6 +1,5 @@
 """Jinja2 template rendering."""
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
 from typing import Dict, Any
 
 
@@ -15,6 +14,8 @@ def render_latex_template(template_path: str, context: Dict[str, Any]) -> str:
     Returns:
         Rendered LaTeX content as string
     """
+    from jinja2 import Environment, FileSystemLoader
+
     template_file = Path(template_path)
     env = Environment(
         loader=FileSystemLoader(template_file.parent),
@@ -1,11 +1,22 @@
 """YAML storage adapter."""
+import hashlib
+import json
+import os
+import sys
+import threading
 import yaml
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from infra.logging import setup_logger
 
 logger = setup_logger(__name__)
 
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# sorted (section, path) pairs -> (file signature, store)
+_STORES: Dict[Tuple, Tuple[Tuple, "BankStore"]] = {}
+_STORES_LOCK = threading.Lock()
+
 def load_profile(profile_path: str) -> Dict[str, Any]:
     """
     Load profile YAML.
@@ -20,28 +31,6 @@ def load_profile(profile_path: str) -> Dict[str, Any]:
         return yaml.safe_load(f)
 
 
-def load_bank(bank_dir: str) -> List[Dict[str, Any]]:
-    """
-    Load all bank YAML files.
-    
-    Args:
-        bank_dir: Directory containing bank YAML files
-        
-    Returns:
-        List of bank items
-    """
-    bank_path = Path(bank_dir)
-    bank_items = []
-    
-    for yaml_file in bank_path.glob("*.yaml"):
-        with open(yaml_file, "r") as f:
-            items = yaml.safe_load(f)
-            if isinstance(items, list):
-                bank_items.extend(items)
-    
-    return bank_items
-
-
 def load_jd(jd_path: str) -> str:
     """
     Load JD text file.
@@ -89,3 +78,200 @@ def load_cl_bank(cl_bank_dir: str) -> dict:
         "content": content_items,
         "stumbling_block": stumbling_block_items,
     }
+
+
+def list_jds(jd_dir: str) -> List[Path]:
+    """
+    List the JD text files in a directory.
+    
+    Args:
+        jd_dir: Directory containing one *.txt file per JD
+        
+    Returns:
+        Sorted list of JD file paths
+    """
+    jd_paths = sorted(Path(jd_dir).glob("*.txt"))
+    if not jd_paths:
+        raise FileNotFoundError(f"No JD files (*.txt) found in {jd_dir}")
+    return jd_paths
+
+
+def iter_jd_dir(jd_dir: str) -> Iterator[Tuple[str, str]]:
+    """
+    Stream the JDs of a directory, reading one file at a time.
+    
+    Args:
+        jd_dir: Directory containing one *.txt file per JD
+        
+    Yields:
+        (JD id (file stem), JD text) in file name order
+    """
+    for jd_path in list_jds(jd_dir):
+        yield jd_path.stem, load_jd(jd_path)
+
+
+def iter_jd_jsonl(jd_jsonl: str) -> Iterator[Tuple[str, str]]:
+    """
+    Stream the JDs of a JSONL file, one line at a time.
+    
+    Each line is an object with the JD text under "text" and an optional
+    "id" (defaults to the line number); blank lines are skipped.
+    
+    Args:
+        jd_jsonl: Path to the JSONL file
+        
+    Yields:
+        (JD id, JD text) in file order
+    """
+    with open(jd_jsonl, "r") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict) or not isinstance(record.get("text"), str):
+                raise ValueError(f"{jd_jsonl}:{line_number}: expected an object with a \"text\" string")
+            yield str(record.get("id", line_number)), record["text"]
+
+
+class BankRecord:
+    """Compact bank item (BankItem fields plus any extra keys such as category)."""
+
+    __slots__ = ("id", "section", "text", "tags", "priority", "extra", "keys")
+
+    def __init__(self, item: Dict[str, Any], section: str):
+        """
+        Args:
+            item: Bank item as parsed from YAML
+            section: Section key the item belongs to (e.g. "work1", "skills")
+        """
+        self.id = str(item.get("id"))
+        self.section = section
+        self.text = item.get("text", "")
+        self.tags = tuple(sys.intern(str(tag)) for tag in item.get("tags") or ())
+        self.priority = float(item.get("priority") or 0)
+        # every other key as written (id and priority keep their YAML types here)
+        self.extra = {key: value for key, value in item.items() if key not in ("text", "tags")}
+        # original key order, so to_dict() reproduces the YAML item (and the prompts built from it)
+        self.keys = tuple(sys.intern(str(key)) for key in item)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The item as parsed from YAML (a fresh dict)."""
+        fields = {"text": self.text, "tags": list(self.tags)}
+        return {key: fields[key] if key in fields else self.extra[key] for key in self.keys}
+
+
+class BankStore:
+    """The bank YAML files of every section, parsed once, with indexes by id, section/file and tag."""
+
+    def __init__(self, sources: Dict[str, str]):
+        """
+        Load every section file.
+
+        Args:
+            sources: Bank YAML file per section key; missing files leave their section unavailable
+        """
+        self.sources = dict(sources)
+        self.sections: Dict[str, List[BankRecord]] = {}
+        self.hashes: Dict[str, str] = {}
+        self.by_id: Dict[str, Dict[str, BankRecord]] = {}
+        self.by_path: Dict[str, str] = {}
+        self.by_tag: Dict[str, List[BankRecord]] = {}
+        for section, path in self.sources.items():
+            try:
+                with open(path, "rb") as f:
+                    raw = f.read()
+            except FileNotFoundError:
+                logger.info(f"Bank file not found: {path}")
+                continue
+            items = yaml.load(raw, Loader=_YAML_LOADER) or []
+            records = [BankRecord(item, section) for item in items if isinstance(item, dict)]
+            self.sections[section] = records
+            self.hashes[section] = hashlib.sha256(raw).hexdigest()
+            self.by_id[section] = {record.id: record for record in records}
+            self.by_path[str(path)] = section
+            for record in records:
+                for tag in record.tags:
+                    self.by_tag.setdefault(tag, []).append(record)
+        logger.info(f"Loaded {sum(map(len, self.sections.values()))} bank items from {len(self.sections)} files")
+
+    def has(self, section: str) -> bool:
+        """True if the section's file was loaded."""
+        return section in self.sections
+
+    def items(self, section: str) -> List[BankRecord]:
+        """
+        Records of a section, in file order.
+
+        Raises:
+            FileNotFoundError: If the section's file does not exist
+        """
+        if section not in self.sections:
+            raise FileNotFoundError(f"Bank file not found: {self.sources.get(section)}")
+        return self.sections[section]
+
+    def dicts(self, section: str) -> List[Dict[str, Any]]:
+        """Items of a section as fresh dicts, in file order (as parsed from YAML)."""
+        return [record.to_dict() for record in self.items(section)]
+
+    def get(self, section: str, item_id: str) -> Optional[BankRecord]:
+        """Record of an item id within a section, or None."""
+        return self.by_id.get(section, {}).get(str(item_id))
+
+    def with_tag(self, tag: str) -> List[BankRecord]:
+        """Records carrying a tag, across all sections."""
+        return self.by_tag.get(tag, [])
+
+    def file_hash(self, section: str) -> str:
+        """sha256 of the section's file as loaded ("" if it does not exist)."""
+        return self.hashes.get(section, "")
+
+
+def bank_sources(config: Dict[str, Any], ranked: bool = False) -> Dict[str, str]:
+    """
+    Bank YAML file per section key (work experience, education and skills sections).
+
+    Args:
+        config: Configuration (uses the work_experience, edu_experience and skills sections)
+        ranked: Only the sections scored by relevance (work experience and skills)
+
+    Returns:
+        Path per section, including files that do not exist (yet)
+    """
+    sources = dict(config.get("work_experience") or {})
+    if not ranked:
+        sources.update(config.get("edu_experience") or {})
+    if config.get("skills"):
+        sources["skills"] = config["skills"]
+    return sources
+
+
+def _signature(path: str) -> Tuple:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return (path, None, None)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+def get_bank_store(config: Dict[str, Any]) -> BankStore:
+    """
+    Return the process-wide bank store of the configured sections.
+
+    The store is loaded once and reloaded only when a bank file changes
+    (mtime or size), so long-running processes pick up bank edits.
+
+    Args:
+        config: Configuration (uses the work_experience, edu_experience and skills paths)
+
+    Returns:
+        Shared BankStore
+    """
+    sources = bank_sources(config)
+    key = tuple(sorted(sources.items()))
+    signature = tuple(_signature(path) for _, path in key)
+    with _STORES_LOCK:
+        cached = _STORES.get(key)
+        if cached is None or cached[0] != signature:
+            cached = (signature, BankStore(sources))
+            _STORES[key] = cached
+    return cached[1]
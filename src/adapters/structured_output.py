@@ -0,0 +1,181 @@
+"""Structured-output helpers: strict json_schema response formats, local JSON repair and validation."""
+import copy
+import json
+from typing import Any, Dict, List, Type
+from pydantic import BaseModel, ValidationError
+from infra.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+# Keywords the strict structured-output mode does not accept
+_UNSUPPORTED_KEYWORDS = ("default", "title", "minItems", "minLength")
+
+
+class SchemaValidationError(ValueError):
+    """Raised when a reply cannot be repaired into a valid instance of its schema."""
+
+
+def _make_strict(node: Any) -> None:
+    """Close every object schema (additionalProperties false, all keys required) in place."""
+    if isinstance(node, dict):
+        for keyword in _UNSUPPORTED_KEYWORDS:
+            if not isinstance(node.get(keyword), dict):
+                node.pop(keyword, None)
+        if node.get("type") == "object" and "properties" in node:
+            node["additionalProperties"] = False
+            node["required"] = list(node["properties"])
+        for value in node.values():
+            _make_strict(value)
+    elif isinstance(node, list):
+        for value in node:
+            _make_strict(value)
+
+
+def response_format(schema: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Build a strict json_schema response format from a pydantic model.
+
+    Args:
+        schema: Reply schema (see domain.schemas)
+
+    Returns:
+        Value for the `response_format` request parameter
+    """
+    json_schema = copy.deepcopy(schema.model_json_schema())
+    _make_strict(json_schema)
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": schema.__name__, "schema": json_schema, "strict": True},
+    }
+
+
+def repair_json(text: str) -> str:
+    """
+    Cheap local repair of a malformed JSON object reply.
+
+    Strips text around the object (e.g. code fences), drops a dangling
+    trailing member or comma and closes unterminated strings, arrays and
+    objects of a truncated reply.
+
+    Args:
+        text: Reply content
+
+    Returns:
+        Repaired JSON text (may still be invalid)
+    """
+    start = text.find("{")
+    if start < 0:
+        return text
+    text = text[start:]
+
+    stack: List[str] = []
+    in_string = False
+    escape = False
+    # offset after the last complete value at which the object can be cut and closed
+    last_safe = 0
+    safe_stack: List[str] = []
+    for index, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            last_safe, safe_stack = index + 1, list(stack)
+            if not stack:
+                return text[:index + 1]
+        elif char == ",":
+            last_safe, safe_stack = index, list(stack)
+
+    if in_string:
+        # keep a truncated string value if closing it yields valid JSON, otherwise cut it
+        closed = text + '"' + "".join(reversed(stack))
+        try:
+            json.loads(closed)
+            return closed
+        except json.JSONDecodeError:
+            pass
+    head = text[:last_safe].rstrip().rstrip(",")
+    return head + "".join(reversed(safe_stack))
+
+
+def correction_prompt(user_prompt: str, error: SchemaValidationError) -> str:
+    """User prompt for re-requesting a call whose reply failed validation."""
+    return (
+        f"{user_prompt}\n\nYour previous reply was rejected: {error}. "
+        "Return a complete JSON object that matches the schema."
+    )
+
+
+def _drop_truncated_items(data: Any, error: ValidationError) -> bool:
+    """Remove the incomplete last list items a truncated reply ends with; True if any was removed."""
+    dropped = False
+    for issue in error.errors():
+        loc = issue["loc"]
+        for depth, part in enumerate(loc):
+            if not isinstance(part, int):
+                continue
+            container = data
+            for key in loc[:depth]:
+                container = container[key]
+            if isinstance(container, list) and part == len(container) - 1 and len(container) > 1:
+                container.pop()
+                dropped = True
+            break
+    return dropped
+
+
+def parse_reply(content: str, schema: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Parse and validate a reply, trying local repairs before giving up.
+
+    Args:
+        content: Reply content
+        schema: Reply schema (see domain.schemas)
+
+    Returns:
+        Validated reply as a plain dictionary
+
+    Raises:
+        SchemaValidationError: If the reply cannot be repaired
+    """
+    repaired = False
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        try:
+            data = json.loads(repair_json(content))
+        except json.JSONDecodeError as error:
+            raise SchemaValidationError(f"reply is not valid JSON: {error}") from error
+        repaired = True
+
+    try:
+        reply = schema.model_validate(data)
+    except ValidationError as error:
+        if not (repaired and _drop_truncated_items(data, error)):
+            raise SchemaValidationError(_describe(schema, error)) from error
+        try:
+            reply = schema.model_validate(data)
+        except ValidationError as retry_error:
+            raise SchemaValidationError(_describe(schema, retry_error)) from retry_error
+
+    if repaired:
+        logger.info(f"Repaired truncated or malformed {schema.__name__} reply locally")
+    return reply.model_dump()
+
+
+def _describe(schema: Type[BaseModel], error: ValidationError) -> str:
+    details = "; ".join(
+        f"{'.'.join(str(part) for part in issue['loc']) or '<root>'}: {issue['msg']}"
+        for issue in error.errors()
+    )
+    return f"reply does not match {schema.__name__}: {details}"
@@ -10,7 +10,7 @@ def run(state: State, config: dict) -> State:
     Assemble final section lists from selected item IDs.
     
     Args:
-        state: Current state with selected items and bank
+        state: Current state with selected items
         config: Configuration
         
     Returns:
@@ -39,3 +39,8 @@ def run(state: State, config: dict) -> State:
     logger.info(f"Assembled {len(assembled)} items")
 
     return state
+
+
+async def arun(state: State, config: dict) -> State:
+    """Async variant of run(); assembling does no I/O, so it runs inline."""
+    return run(state, config)
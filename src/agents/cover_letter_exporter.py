@@ -1,9 +1,11 @@
 """Cover Letter Exporter agent: Render LaTeX template and write output files."""
+import asyncio
 from pathlib import Path
 import json
 from domain.state import State
 from adapters.render_jinja import render_latex_template
 from infra.logging import setup_logger
+from infra.metering import summarize_usage, branch_calls
 from datetime import datetime
 
 logger = setup_logger(__name__)
@@ -48,15 +50,36 @@ def run(state: State, config: dict) -> State:
         f.write(latex_content)
 
     # other files to export
+    meta = state.setdefault("meta", {})
+    # the audit leaves out the calls made for the other document of a combined run
+    calls = branch_calls(meta.get("llm_calls", []), "cover_letter")
+    usage = summarize_usage(calls)
     audit_data = {
         "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
         "jd_raw": state.get("jd_raw"),
         "jd_summary": state.get("jd_summary"),
+        "jd_clean": meta.get("jd_clean"),
+        "jd_extracted": meta.get("jd_extracted"),
         "cover_letter_content": state.get("cover_letter_content"),
+        "memo": meta.get("memo", {}),
+        "jd_match": meta.get("jd_match"),
+        "llm_usage": usage,
+        "llm_calls": calls,
     }
     audit_path = out_dir / "audit_cl.json"
     with open(audit_path, "w") as f:
         json.dump(audit_data, f, indent=2)   
 
+    run_usage = usage["run"]
+    logger.info(
+        f"LLM usage: {run_usage['calls']} calls, {run_usage['wall_s']:.2f}s, "
+        f"{run_usage['prompt_tokens']}+{run_usage['completion_tokens']} tokens "
+        f"({run_usage['cached_tokens']} prompt tokens cached, {run_usage['cached_share']:.0%}), ${run_usage['cost_usd']:.4f}"
+    )
     logger.info(f"Exported audit.json to {cl_path}")
     return state
+
+
+async def arun(state: State, config: dict) -> State:
+    """Async variant of run(); the file I/O runs in a worker thread."""
+    return await asyncio.to_thread(run, state, config)
@@ -1,35 +1,30 @@
 """Cover Letter Writer agent: Generate cover letter using AIDA method."""
+import time
+from typing import Dict, Any, Tuple
+from langgraph.config import get_stream_writer
 from domain.state import State
-from adapters.llm_openai import OpenAIClient
+from domain.schemas import CoverLetterReply
+from adapters.llm_openai import get_client, get_async_client
+from adapters.memo_store import memoized, amemoized
 from infra.logging import setup_logger
+from infra.metering import get_meter
+from utils.prompt_builder import build_user_prompt, static_block, jd_block
 import json
 
 logger = setup_logger(__name__)
 
 
-def run(state: State, config: dict) -> State:
+def build_prompts(state: State, config: dict) -> Tuple[str, str]:
     """
-    Generate cover letter using AIDA method (Attention, Interest, Desire, Action).
+    Build the system and user prompts for the cover letter.
     
     Args:
         state: Current state with jd_summary, profile, and cl_bank
-        config: Configuration with model settings
+        config: Configuration
         
     Returns:
-        Updated state with cover_letter_content
+        Tuple of (system_prompt, user_prompt)
     """
-    logger.info("Generating cover letter using AIDA method...")
-    
-    if not state.get("jd_summary"):
-        logger.error("JD summary not available")
-        return state
-    
-    model_config = config.get("cl_model")
-    client = OpenAIClient(
-        model_name=model_config.get("name"),
-        temperature=model_config.get("temperature"),
-    )
-    
     system_prompt = """You are an expert cover letter writer. Write a compelling one-page cover letter using the AIDA method:
                 - Attention: Grab the reader's attention with a strong opening hook
                 - Interest: Show understanding of the role and company, demonstrate genuine interest
@@ -40,39 +35,36 @@ def run(state: State, config: dict) -> State:
     profile = state["profile"]
     cl_bank = state.get("cl_bank")
 
-    content = json.dumps(cl_bank['content'])
-    stumbling_block = json.dumps(cl_bank['stumbling_block'])
-    
-    jd_text = f"""Company: {jd_summary['company']}
-                    Role: {jd_summary['role']}
-                    Hiring Manager: {jd_summary['hr']}
-                    Key Skills Required: {', '.join(jd_summary.get('skills', []))}
-                    Must Haves: {', '.join(jd_summary.get('must_haves', []))}
-                    Nice to Haves: {', '.join(jd_summary.get('nice_to_haves', []))}
-                    Responsibilities: {', '.join(jd_summary.get('responsibilities', []))}"""
-    
-    user_prompt = f"""Write a professional cover letter (about 600 words) for the following job application using the AIDA method. 
+    jd_fields = [
+        ("Company", "company"),
+        ("Role", "role"),
+        ("Hiring Manager", "hr"),
+        ("Key Skills Required", "skills"),
+        ("Must Haves", "must_haves"),
+        ("Nice to Haves", "nice_to_haves"),
+        ("Responsibilities", "responsibilities"),
+    ]
+    # static profile and bank blocks first, the variable JD block last (provider prefix caching)
+    user_prompt = build_user_prompt(
+        [
+            static_block("Applicant Profile", f"Name: {profile.get('name', '')}"),
+            static_block(
+                "Personal material to incorporate (use these naturally in the letter)",
+                f"Content: {json.dumps(cl_bank['content'])}\nStumbling Block: {json.dumps(cl_bank['stumbling_block'])}",
+            ),
+        ],
+        """Write a professional cover letter (about 600 words) for the job application summarized below using the AIDA method. 
 
         Four paragraphs: 1. it's about the company and the role. 2. it's about me. 3. it's about what sets me apart for the role. 4. it's about the call to action.
         
         
         Return strict JSON only with the following structure:
-        {{
+        {
             "paragraph_1": "...",
             "paragraph_2": "...",
             "paragraph_3": "...",
             "paragraph_4": "..."
-        }}
-
-        Job Description Summary:
-        {jd_text}
-
-        Applicant Profile:
-        Name: {profile.get('name', '')}
-        
-        Personal material to incorporate (use these naturally in the letter):
-        Content: {content}
-        Stumbling Block: {stumbling_block}
+        }
 
         Requirements:
         1. Use AIDA structure (Attention, Interest, Desire, Action)
@@ -84,9 +76,33 @@ def run(state: State, config: dict) -> State:
         8. try to address the stumbling blocks. But: No negativity even it is to address the concerns, phrase it positively.
         9. Start with the content, not the salutation. And do not end with the closer.
 
-        Return only valid JSON with 4 paragraphs, no other text."""
-                    
-    result = client.chat_completion_json(system_prompt, user_prompt)
+        Return only valid JSON with 4 paragraphs, no other text.""",
+        [jd_block(jd_summary, jd_fields)],
+    )
+    return system_prompt, user_prompt
+
+
+def memo_inputs(state: State, config: dict) -> Dict[str, Any]:
+    """Inputs the cover letter depends on (memoization key)."""
+    return {
+        "cl_bank": state.get("cl_bank"),
+        "jd_summary": state["jd_summary"],
+        "name": state["profile"].get("name", ""),
+        "model": config.get("cl_model"),
+    }
+
+
+def apply_result(state: State, result: Dict[str, Any]) -> State:
+    """
+    Store the parsed LLM reply as the cover letter content.
+    
+    Args:
+        state: Current state
+        result: Parsed JSON reply from the LLM
+        
+    Returns:
+        Updated state with cover_letter_content
+    """
     state["cover_letter_content"] = {
         "paragraph_1": result.get("paragraph_1", ""),
         "paragraph_2": result.get("paragraph_2", ""),
@@ -98,3 +114,131 @@ def run(state: State, config: dict) -> State:
 
     return state
 
+
+class _ParagraphStream:
+    """Collect streamed paragraphs, publishing each one as soon as it is complete."""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_paragraph = None
+        self.result = {}
+        try:
+            # lets graph.stream(..., stream_mode="custom") consumers render paragraphs early
+            self.writer = get_stream_writer()
+        except RuntimeError:
+            self.writer = None
+    
+    def add(self, key: str, value: Any) -> None:
+        self.result[key] = value
+        if not key.startswith("paragraph_"):
+            return
+        if self.first_paragraph is None:
+            self.first_paragraph = time.perf_counter() - self.started
+        logger.info(f"Received {key} ({len(value)} chars)")
+        if self.writer is not None:
+            self.writer({"cover_letter_paragraph": key, "text": value})
+    
+    def finish(self, state: State) -> Dict[str, Any]:
+        """
+        Record the stream timing and return the validated reply.
+        
+        Raises:
+            pydantic.ValidationError: If the reply does not match CoverLetterReply
+        """
+        total = time.perf_counter() - self.started
+        first = self.first_paragraph if self.first_paragraph is not None else total
+        logger.info(f"Cover letter streamed: first paragraph after {first:.2f}s, total {total:.2f}s")
+        state.setdefault("meta", {})["cover_letter_timing"] = {
+            "time_to_first_paragraph_s": round(first, 3),
+            "total_s": round(total, 3),
+        }
+        return CoverLetterReply.model_validate(self.result).model_dump()
+
+
+def _complete(state: State, client, model_config: dict, system_prompt: str, user_prompt: str, meter) -> Dict[str, Any]:
+    """Request the cover letter, streamed paragraph by paragraph if cl_model.stream is set."""
+    if model_config.get("stream"):
+        stream = _ParagraphStream()
+        try:
+            for key, value in client.chat_completion_json_stream(
+                system_prompt, user_prompt, meter=meter, schema=CoverLetterReply
+            ):
+                stream.add(key, value)
+            return stream.finish(state)
+        except ValueError as error:
+            logger.warning(f"Streamed cover letter is invalid ({error}), re-requesting")
+    return client.chat_completion_json(system_prompt, user_prompt, meter=meter, schema=CoverLetterReply)
+
+
+async def _acomplete(state: State, client, model_config: dict, system_prompt: str, user_prompt: str, meter) -> Dict[str, Any]:
+    """Async variant of _complete()."""
+    if model_config.get("stream"):
+        stream = _ParagraphStream()
+        try:
+            async for key, value in client.chat_completion_json_stream(
+                system_prompt, user_prompt, meter=meter, schema=CoverLetterReply
+            ):
+                stream.add(key, value)
+            return stream.finish(state)
+        except ValueError as error:
+            logger.warning(f"Streamed cover letter is invalid ({error}), re-requesting")
+    return await client.chat_completion_json(system_prompt, user_prompt, meter=meter, schema=CoverLetterReply)
+
+
+def run(state: State, config: dict) -> State:
+    """
+    Generate cover letter using AIDA method (Attention, Interest, Desire, Action).
+    
+    Args:
+        state: Current state with jd_summary, profile, and cl_bank
+        config: Configuration with model settings
+        
+    Returns:
+        Updated state with cover_letter_content
+    """
+    logger.info("Generating cover letter using AIDA method...")
+    
+    if not state.get("jd_summary"):
+        logger.error("JD summary not available")
+        return state
+    
+    model_config = config.get("cl_model")
+    client = get_client(model_config, config)
+    meter = get_meter(state, config, "cover_letter_writer")
+    
+    system_prompt, user_prompt = build_prompts(state, config)
+    result = memoized(
+        state, config, "cover_letter_writer", memo_inputs(state, config),
+        lambda: _complete(state, client, model_config, system_prompt, user_prompt, meter),
+    )
+    return apply_result(state, result)
+
+
+async def arun(state: State, config: dict) -> State:
+    """
+    Async variant of run().
+    
+    Args:
+        state: Current state with jd_summary, profile, and cl_bank
+        config: Configuration with model settings
+        
+    Returns:
+        Updated state with cover_letter_content
+    """
+    logger.info("Generating cover letter using AIDA method...")
+    
+    if not state.get("jd_summary"):
+        logger.error("JD summary not available")
+        return state
+    
+    model_config = config.get("cl_model")
+    client = get_async_client(model_config, config)
+    meter = get_meter(state, config, "cover_letter_writer")
+    
+    system_prompt, user_prompt = build_prompts(state, config)
+    result = await amemoized(
+        state, config, "cover_letter_writer", memo_inputs(state, config),
+        lambda: _acomplete(state, client, model_config, system_prompt, user_prompt, meter),
+    )
+    return apply_result(state, result)
+
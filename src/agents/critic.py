@@ -1,65 +1,67 @@
 """Critic agent: Check if selected content addresses JD requirements."""
+from typing import Dict, Any, Tuple
 from domain.state import State, CriticResult
-from adapters.llm_openai import OpenAIClient
+from adapters.llm_openai import get_client, get_async_client
 from infra.logging import setup_logger
+from infra.metering import get_meter
+from utils.prompt_builder import build_user_prompt, jd_block
 
 logger = setup_logger(__name__)
 
 
-def run(state: State, config: dict) -> State:
+def build_prompts(state: State, config: dict) -> Tuple[str, str]:
     """
-    Criticize assembled content against JD requirements.
+    Build the system and user prompts for the critic.
     
     Args:
         state: Current state with jd_summary and assembled lists
-        config: Configuration with model settings
+        config: Configuration
         
     Returns:
-        Updated state with critic_result
+        Tuple of (system_prompt, user_prompt)
     """
-    logger.info("Criticizing assembled content...")
-    
-    if not state.get("jd_summary") or not state.get("assembled"):
-        logger.error("JD summary or assembled content not available")
-        state["critic_result"] = CriticResult(gate_passed=False, missing_topics=[])
-        return state
-    
-    model_config = config.get("model", {})
-    client = OpenAIClient(
-        model_name=model_config.get("name", "gpt-4o-mini"),
-        temperature=model_config.get("temperature", 0.1),
-    )
-    
     system_prompt = """You are a resume critic. Evaluate if the assembled resume content adequately addresses the job description requirements.
 Return strict JSON only."""
     
-    jd_summary = state["jd_summary"]
-    jd_text = f"""Company: {jd_summary['company']}
-                Role: {jd_summary['role']}
-                Skills: {', '.join(jd_summary['skills'])}
-                Concepts: {', '.join(jd_summary['concepts'])}
-                Must Haves: {', '.join(jd_summary['must_haves'])}
-                Nice to Haves: {', '.join(jd_summary['nice_to_haves'])}"""
-    
     assembled_text = "Assembled Content:\n"
     for section, items in state["assembled"].items():
         assembled_text += f"\n{section}:\n"
         for item in items:
             assembled_text += f"- {item}\n"
     
-    user_prompt = f"""Job Description Summary:
-            {jd_text}
+    jd_fields = [
+        ("Company", "company"),
+        ("Role", "role"),
+        ("Skills", "skills"),
+        ("Concepts", "concepts"),
+        ("Must Haves", "must_haves"),
+        ("Nice to Haves", "nice_to_haves"),
+    ]
+    # static instructions first, the variable assembled content and JD last (provider prefix caching)
+    user_prompt = build_user_prompt(
+        [],
+        """Evaluate if the assembled content below addresses the requirements of the job description summary below. List any missing JD topics not covered by the assembled content.
 
-            {assembled_text}
+            If acceptable, return: {"gate_passed": true, "missing_topics": []}
+            Otherwise, return: {"gate_passed": false, "missing_topics": ["topic1", "topic2"]}
 
-            Evaluate if the assembled content addresses the JD requirements. List any missing JD topics not covered by the assembled content.
+            Return only valid JSON, no other text.""",
+        [assembled_text.strip(), jd_block(state["jd_summary"], jd_fields)],
+    )
+    return system_prompt, user_prompt
 
-            If acceptable, return: {{"gate_passed": true, "missing_topics": []}}
-            Otherwise, return: {{"gate_passed": false, "missing_topics": ["topic1", "topic2"]}}
 
-            Return only valid JSON, no other text."""
+def apply_result(state: State, result: Dict[str, Any]) -> State:
+    """
+    Store the parsed LLM reply as the critic result.
     
-    result = client.chat_completion_json(system_prompt, user_prompt)
+    Args:
+        state: Current state
+        result: Parsed JSON reply from the LLM
+        
+    Returns:
+        Updated state with critic_result
+    """
     state["critic_result"] = CriticResult(
         gate_passed=result.get("gate_passed", False),
         missing_topics=result.get("missing_topics", []),
@@ -67,3 +69,62 @@ Return strict JSON only."""
     logger.info(f"Critic gate passed: {state['critic_result']['gate_passed']}")
     return state
 
+
+def _has_inputs(state: State) -> bool:
+    """Check the critic inputs and record a failed gate if they are missing."""
+    if not state.get("jd_summary") or not state.get("assembled"):
+        logger.error("JD summary or assembled content not available")
+        state["critic_result"] = CriticResult(gate_passed=False, missing_topics=[])
+        return False
+    return True
+
+
+def run(state: State, config: dict) -> State:
+    """
+    Criticize assembled content against JD requirements.
+    
+    Args:
+        state: Current state with jd_summary and assembled lists
+        config: Configuration with model settings
+        
+    Returns:
+        Updated state with critic_result
+    """
+    logger.info("Criticizing assembled content...")
+    
+    if not _has_inputs(state):
+        return state
+    
+    model_config = config.get("model", {})
+    client = get_client(model_config, config)
+    meter = get_meter(state, config, "critic")
+    
+    system_prompt, user_prompt = build_prompts(state, config)
+    result = client.chat_completion_json(system_prompt, user_prompt, meter=meter)
+    return apply_result(state, result)
+
+
+async def arun(state: State, config: dict) -> State:
+    """
+    Async variant of run().
+    
+    Args:
+        state: Current state with jd_summary and assembled lists
+        config: Configuration with model settings
+        
+    Returns:
+        Updated state with critic_result
+    """
+    logger.info("Criticizing assembled content...")
+    
+    if not _has_inputs(state):
+        return state
+    
+    model_config = config.get("model", {})
+    client = get_async_client(model_config, config)
+    meter = get_meter(state, config, "critic")
+    
+    system_prompt, user_prompt = build_prompts(state, config)
+    result = await client.chat_completion_json(system_prompt, user_prompt, meter=meter)
+    return apply_result(state, result)
+
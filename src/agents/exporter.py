@@ -1,9 +1,11 @@
 """Exporter agent: Render LaTeX template and write output files."""
+import asyncio
 import json
 from pathlib import Path
 from domain.state import State
 from adapters.render_jinja import render_latex_template
 from infra.logging import setup_logger
+from infra.metering import summarize_usage, branch_calls
 import os
 from datetime import datetime
 
@@ -55,16 +57,41 @@ def run(state: State, config: dict) -> State:
     
     # Write explain.json
     # other files to export
+    meta = state.setdefault("meta", {})
+    # the audit leaves out the calls made for the other document of a combined run
+    calls = branch_calls(meta.get("llm_calls", []), "cv")
+    usage = summarize_usage(calls)
     audit_data = {
         "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
         "jd_raw": state.get("jd_raw"),
         "jd_summary": state.get("jd_summary"),
+        "jd_clean": meta.get("jd_clean"),
+        "jd_extracted": meta.get("jd_extracted"),
         "ranked": state.get("ranked"),
+        "shortlist": meta.get("shortlist", {}),
+        "relevance": meta.get("relevance", {}),
+        "local_scores": meta.get("local_scores", {}),
+        "ranker_timing": meta.get("ranker_timing"),
+        "unknown_ids": meta.get("unknown_ids", {}),
+        "memo": meta.get("memo", {}),
+        "jd_match": meta.get("jd_match"),
+        "llm_usage": usage,
+        "llm_calls": calls,
     }
     audit_path = out_dir / "audit_cv.json"
     with open(audit_path, "w") as f:
         json.dump(audit_data, f, indent=2)   
 
+    run_usage = usage["run"]
+    logger.info(
+        f"LLM usage: {run_usage['calls']} calls, {run_usage['wall_s']:.2f}s, "
+        f"{run_usage['prompt_tokens']}+{run_usage['completion_tokens']} tokens "
+        f"({run_usage['cached_tokens']} prompt tokens cached, {run_usage['cached_share']:.0%}), ${run_usage['cost_usd']:.4f}"
+    )
     logger.info(f"Exported audit.json to {audit_path}")
     return state
 
+
+async def arun(state: State, config: dict) -> State:
+    """Async variant of run(); the file I/O runs in a worker thread."""
+    return await asyncio.to_thread(run, state, config)
@@ -0,0 +1,83 @@
+"""JD Cleaner agent: Strip markup, job board chrome and boilerplate from the JD before parsing."""
+from collections import Counter
+from domain.state import State
+from adapters.boilerplate_store import get_boilerplate_store
+from adapters.jd_fingerprints import simhash
+from infra.logging import setup_logger
+from utils.jd_boilerplate import looks_like_html, normalize_text, clean_lines, join_lines, line_key
+
+logger = setup_logger(__name__)
+
+
+def run(state: State, config: dict) -> State:
+    """
+    Store the cleaned text of jd_raw in jd_clean; jd_raw keeps the original posting.
+
+    HTML is reduced to its visible text, whitespace is collapsed, and job
+    board chrome, boilerplate sentences (curated patterns, jd_cleaner.extra_patterns
+    and lines learned from other postings), benefits/EEO/privacy sections and
+    repeated lines are dropped. The sizes before and after, the lines and
+    characters removed per reason and every removed line are recorded in
+    state["meta"]["jd_clean"]; a state is cleaned once. With
+    jd_cleaner.enabled off, jd_clean is jd_raw unchanged.
+
+    Args:
+        state: Current state with jd_raw
+        config: Configuration (uses the "jd_cleaner" section)
+
+    Returns:
+        Updated state with jd_clean
+    """
+    cleaner_config = config.get("jd_cleaner") or {}
+    meta = state.setdefault("meta", {})
+    if state.get("jd_clean") is not None:
+        return state
+    if not cleaner_config.get("enabled", True):
+        state["jd_clean"] = state["jd_raw"]
+        return state
+
+    jd_raw = state["jd_raw"]
+    text = normalize_text(jd_raw)
+    extra_patterns = cleaner_config.get("extra_patterns") or ()
+    store = get_boilerplate_store(config)
+    kept, removed = clean_lines(text, extra_patterns, store.is_boilerplate if store is not None else None)
+    learned = sum(len(line) for reason, line in removed if reason == "learned")
+    max_share = (cleaner_config.get("learn") or {}).get("max_share", 0.25)
+    if learned > max_share * len(text):
+        # boilerplate is a small part of a posting; this much known text means a reworded repost
+        logger.info(f"Learned boilerplate would remove {learned / len(text):.0%} of the JD; keeping those lines")
+        kept, removed = clean_lines(text, extra_patterns)
+    cleaned = join_lines(kept)
+    if not cleaned:
+        logger.warning("Cleaning removed the whole JD; keeping the normalized text")
+        cleaned, removed = text, []
+    if store is not None:
+        store.learn(simhash(cleaned), [line_key(line) for line in kept if line])
+
+    state["jd_clean"] = cleaned
+    counts = Counter(reason for reason, _ in removed)
+    removed_chars = Counter()
+    for reason, line in removed:
+        removed_chars[reason] += len(line)
+    meta["jd_clean"] = {
+        "html": looks_like_html(jd_raw),
+        "chars_before": len(jd_raw),
+        "chars_after": len(cleaned),
+        # same 4 characters per token estimate as the rate limiter
+        "tokens_before": len(jd_raw) // 4,
+        "tokens_after": len(cleaned) // 4,
+        "removed_share": round(1 - len(cleaned) / len(jd_raw), 4) if jd_raw else 0.0,
+        "removed": dict(counts),
+        "removed_chars": dict(removed_chars),
+        "removed_lines": [{"reason": reason, "text": line} for reason, line in removed],
+    }
+    logger.info(
+        f"Cleaned JD: {len(jd_raw)} -> {len(cleaned)} chars ({meta['jd_clean']['removed_share']:.0%} removed, "
+        f"{', '.join(f'{count} {reason}' for reason, count in counts.items()) or 'no lines dropped'})"
+    )
+    return state
+
+
+async def arun(state: State, config: dict) -> State:
+    """Async variant of run(); cleaning is local, so it runs inline."""
+    return run(state, config)
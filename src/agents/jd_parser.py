@@ -1,58 +1,156 @@
 """JD Parser agent: Extract structured summary from JD text."""
+from typing import Dict, Any, Tuple
 from domain.state import State, JDSummary
-from adapters.llm_openai import OpenAIClient
+from domain.schemas import jd_reply_schema
+from adapters.llm_openai import get_client, get_async_client
+from adapters.memo_store import memoized, amemoized
+from adapters.jd_fingerprints import reuse_summary, remember_summary
 from infra.logging import setup_logger
+from infra.metering import get_meter
+from utils.jd_extractor import extract_metadata
 
 logger = setup_logger(__name__)
 
 
-def run(state: State, config: dict) -> State:
+# fields only the LLM can fill; the metadata fields are pre-extracted by rules where possible
+SEMANTIC_FIELDS = ("role", "skills", "responsibilities", "must_haves", "nice_to_haves")
+METADATA_FIELDS = ("company", "hr", "address", "zip", "city")
+
+# how the LLM fills each metadata field it is asked for
+_METADATA_INSTRUCTIONS = {
+    "hr": '"hr" is the assumed Ms./Mr. (do assume the gender!) + last name of the hiring manager if available, otherwise "Hiring Manager".',
+    "address": '"address" is the address of the company if available, otherwise "xxxxxxx x".',
+    "zip": '"zip" is the zip code of the company if available, otherwise "1000".',
+    "city": '"city" is the city of the company if available, otherwise "Zurich".',
+}
+# with the city known from the text, a missing street or zip stays empty instead of a placeholder
+_LOCATED_INSTRUCTIONS = {
+    "address": '"address" is the street address of the company in {city} if available, otherwise "".',
+    "zip": '"zip" is the zip code of the company in {city} if available, otherwise "".',
+}
+
+
+def extracted_fields(state: State, config: dict) -> Dict[str, str]:
     """
-    Parse JD text into structured summary.
+    Metadata fields extracted from the JD by rules (jd_parser.pre_extract), computed once per state.
     
     Args:
-        state: Current state with jd_raw
-        config: Configuration with model settings
+        state: Current state with jd_clean
+        config: Configuration
         
     Returns:
-        Updated state with jd_summary
+        The fields found among company, hr, address, zip and city
     """
-    logger.info("Parsing JD...")
+    if not (config.get("jd_parser") or {}).get("pre_extract", True):
+        return {}
+    meta = state.setdefault("meta", {})
+    if "jd_extracted" not in meta:
+        meta["jd_extracted"] = extract_metadata(state["jd_clean"])
+        logger.info(f"Pre-extracted JD fields: {meta['jd_extracted']}")
+    return meta["jd_extracted"]
+
+
+def llm_fields(state: State, config: dict) -> Tuple[str, ...]:
+    """
+    Fields asked from the LLM: the semantic ones, plus the jd_parser.llm_fallback
+    metadata fields the rules did not find (the others keep their defaults).
+    A city found without its zip also asks for the zip and address.
     
-    model_config = config.get("model", {})
-    client = OpenAIClient(
-        model_name=model_config.get("name", "gpt-4o-mini"),
-        temperature=model_config.get("temperature", 0.1),
+    Args:
+        state: Current state with jd_clean
+        config: Configuration
+        
+    Returns:
+        Field names in JDSummary order
+    """
+    parser_config = config.get("jd_parser") or {}
+    if not parser_config.get("pre_extract", True):
+        return ("company", *SEMANTIC_FIELDS, "hr", "address", "zip", "city")
+    found = extracted_fields(state, config)
+    fallback = list(parser_config.get("llm_fallback", ["company", "hr"]))
+    if "city" in found and "zip" not in found:
+        fallback += ["address", "zip"]
+    fallback = [field for field in fallback if field not in found]
+    return tuple(
+        field for field in ("company", *SEMANTIC_FIELDS, "hr", "address", "zip", "city")
+        if field in SEMANTIC_FIELDS or field in fallback
     )
+
+
+def reply_schema(state: State, config: dict):
+    """Reply schema covering exactly the fields asked from the LLM."""
+    return jd_reply_schema(llm_fields(state, config), located="city" in extracted_fields(state, config))
+
+
+def build_prompts(state: State, config: dict) -> Tuple[str, str]:
+    """
+    Build the system and user prompts for parsing the JD.
+    
+    Only the fields from llm_fields() are asked for.
     
+    Args:
+        state: Current state with jd_clean
+        config: Configuration
+        
+    Returns:
+        Tuple of (system_prompt, user_prompt)
+    """
     system_prompt = "Extract a structured summary from a short JD. Return strict JSON only."
     
+    fields = llm_fields(state, config)
+    template = ",\n        ".join(
+        f'"{field}": []' if field in ("skills", "responsibilities", "must_haves", "nice_to_haves") else f'"{field}": ""'
+        for field in fields
+    )
+    field_instructions = dict(_METADATA_INSTRUCTIONS)
+    city = extracted_fields(state, config).get("city")
+    if city:
+        field_instructions.update({field: text.format(city=city) for field, text in _LOCATED_INSTRUCTIONS.items()})
+    # the hr instruction, then the location instructions, each block after a blank line
+    blocks = [
+        [f"        {field_instructions[field]}" for field in group if field in fields]
+        for group in (("hr",), ("address", "zip", "city"))
+    ]
+    instructions = "".join("\n\n" + "\n".join(block) for block in blocks if block)
     user_prompt = f"""Parse the following job description and return a JSON object with these exact fields:
         {{
-        "company": "",
-        "role": "",
-        "skills": [],
-        "responsibilities": [],
-        "must_haves": [],
-        "nice_to_haves": [],
-        "hr": "",
-        "address": "",
-        "zip": "",
-        "city": ""
-        }}
-
-        "hr" is the assumed Ms./Mr. (do assume the gender!) + last name of the hiring manager if available, otherwise "Hiring Manager".
-
-        "address" is the address of the company if available, otherwise "xxxxxxx x".
-        "zip" is the zip code of the company if available, otherwise "1000".
-        "city" is the city of the company if available, otherwise "Zurich".
+        {template}
+        }}{instructions}
 
         Job Description:
-        {state["jd_raw"]}
+        {state["jd_clean"]}
 
         Return only valid JSON, no other text."""
+    return system_prompt, user_prompt
+
+
+def memo_inputs(state: State, config: dict) -> Dict[str, Any]:
+    """Inputs the parsed summary depends on (memoization key)."""
+    return {
+        "jd_clean": state["jd_clean"],
+        "model": config.get("model", {}),
+        "fields": llm_fields(state, config),
+        "extracted": extracted_fields(state, config),
+    }
+
+
+def apply_result(state: State, result: Dict[str, Any]) -> State:
+    """
+    Store the parsed LLM reply, completed with the pre-extracted fields, as the JD summary.
+
+    Missing fields get the placeholder defaults, except that the address and
+    zip of a city found in the text stay empty.
     
-    result = client.chat_completion_json(system_prompt, user_prompt)
+    Args:
+        state: Current state
+        result: Parsed JSON reply from the LLM (or a stored summary)
+        
+    Returns:
+        Updated state with jd_summary
+    """
+    extracted = state.get("meta", {}).get("jd_extracted", {})
+    result = {**result, **extracted}
+    located = "city" in extracted
     state["jd_summary"] = JDSummary(
             company=result.get("company", ""),
             role=result.get("role", ""),
@@ -61,10 +159,77 @@ def run(state: State, config: dict) -> State:
             must_haves=result.get("must_haves", []),
             nice_to_haves=result.get("nice_to_haves", []),
             hr=result.get("hr", "Hiring Manager"),
-            address=result.get("address", "xxxxxxx x"),
-            zip=result.get("zip", "1000"),
+            address=result.get("address", "" if located else "xxxxxxx x"),
+            zip=result.get("zip", "" if located else "1000"),
             city=result.get("city", "Zurich"),
         )
     logger.info(f"Parsed JD: {state['jd_summary']['role']} at {state['jd_summary']['company']}")
     return state
 
+
+def run(state: State, config: dict) -> State:
+    """
+    Parse JD text into structured summary.
+    
+    A near duplicate of a previously parsed JD (see jd_dedup) reuses the
+    stored summary instead of calling the LLM.
+    
+    Args:
+        state: Current state with jd_clean
+        config: Configuration with model settings
+        
+    Returns:
+        Updated state with jd_summary
+    """
+    logger.info("Parsing JD...")
+    
+    summary = reuse_summary(state, config)
+    if summary is not None:
+        return apply_result(state, summary)
+    
+    model_config = config.get("model", {})
+    client = get_client(model_config, config)
+    meter = get_meter(state, config, "jd_parser")
+    
+    system_prompt, user_prompt = build_prompts(state, config)
+    schema = reply_schema(state, config)
+    result = memoized(
+        state, config, "jd_parser", memo_inputs(state, config),
+        lambda: client.chat_completion_json(system_prompt, user_prompt, meter=meter, schema=schema),
+    )
+    apply_result(state, result)
+    remember_summary(state, config)
+    return state
+
+
+async def arun(state: State, config: dict) -> State:
+    """
+    Async variant of run().
+    
+    Args:
+        state: Current state with jd_clean
+        config: Configuration with model settings
+        
+    Returns:
+        Updated state with jd_summary
+    """
+    logger.info("Parsing JD...")
+    
+    summary = reuse_summary(state, config)
+    if summary is not None:
+        return apply_result(state, summary)
+    
+    model_config = config.get("model", {})
+    client = get_async_client(model_config, config)
+    meter = get_meter(state, config, "jd_parser")
+    
+    system_prompt, user_prompt = build_prompts(state, config)
+    schema = reply_schema(state, config)
+    result = await amemoized(
+        state, config, "jd_parser", memo_inputs(state, config),
+        lambda: client.chat_completion_json(system_prompt, user_prompt, meter=meter, schema=schema),
+    )
+    apply_result(state, result)
+    remember_summary(state, config)
+    return state
+
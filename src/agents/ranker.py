@@ -1,43 +1,53 @@
 """Ranker agent: Select best items from bank for JD."""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
 from domain.state import State, SelectionResult, SelectedItem
 from adapters.llm_openai import OpenAIClient
+from adapters.memo_store import memoized, amemoized
+from adapters.storage_yaml import get_bank_store
 from infra.logging import setup_logger
-from utils.work_experience_ranker import rank_and_select_work_experience
+from utils.work_experience_ranker import rank_and_select_work_experience, arank_and_select_work_experience
 from utils.edu_experience_ranker import rank_and_select_edu_experience
-from utils.skill_experience_ranker import rank_and_select_skill
+from utils.skill_experience_ranker import rank_and_select_skill, arank_and_select_skill
+from utils.merged_ranker import rank_and_select_merged, arank_and_select_merged
+from utils.local_ranker import local_select_work_experience, local_select_skill
 
 logger = setup_logger(__name__)
 
 
-def run(state: State, config: dict) -> State:
+def store_ranked(
+    state: State,
+    config: dict,
+    skills_selected: List[Dict[str, Any]],
+    works_selected: Dict[str, List[Dict[str, Any]]],
+) -> State:
     """
-    Rank and select best items from bank per section.
+    Build state["ranked"] from the LLM selections plus the LLM-free education sections.
     
     Args:
-        state: Current state with jd_summary and bank
-        config: Configuration with model settings and caps
+        state: Current state
+        config: Configuration with the section mappings
+        skills_selected: Selected skills
+        works_selected: Selected items per work experience key
         
     Returns:
-        Updated state with selected items
+        Updated state with ranked sections
     """
-    logger.info("Ranking and selecting items from bank...")
-
     work_indices = config.get("work_experience").keys()
     edu_indices = config.get("edu_experience").keys()
     ranked = dict.fromkeys(list(work_indices) + list(edu_indices) + ["skills"], [])
 
     #  ----- skills contents ----- #
-    selected = rank_and_select_skill(state, config)
-    ranked["skills"] = {"selected": selected}
+    ranked["skills"] = {"selected": skills_selected}
 
     #  ----- work experience contents ----- #
     for work in work_indices:
-        selected = rank_and_select_work_experience(state, config, work)
-        
         ranked[work] = SelectionResult(
             selected=[
                 SelectedItem(id=item["id"], text=item["text"])
-                for item in selected
+                for item in _known_items(state, config, work, works_selected[work])
             ]
         )
     
@@ -57,3 +67,222 @@ def run(state: State, config: dict) -> State:
     state["ranked"] = ranked
     return state
 
+
+def _known_items(state: State, config: dict, section: str, selected: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop selected items whose id is not in the section's bank file (ids invented by the LLM)."""
+    bank = get_bank_store(config)
+    if not bank.has(section):
+        return selected
+    known = [item for item in selected if bank.get(section, item["id"]) is not None]
+    if len(known) < len(selected):
+        unknown = [item["id"] for item in selected if bank.get(section, item["id"]) is None]
+        logger.warning(f"Dropped items with unknown ids from '{section}': {unknown}")
+        state.setdefault("meta", {}).setdefault("unknown_ids", {})[section] = unknown
+    return known
+
+
+def _sections(config: dict) -> List[str]:
+    """Section keys ranked by the LLM, in output order."""
+    return ["skills", *config.get("work_experience").keys()]
+
+
+def local_mode(config: dict) -> bool:
+    """True if ranker.mode is "local" (deterministic scoring, no LLM calls)."""
+    return (config.get("ranker") or {}).get("mode", "llm") == "local"
+
+
+def ranking_strategy(config: dict) -> str:
+    """ranker.strategy: "per_section" (one LLM call per section) or "merged" (one call for all sections)."""
+    return (config.get("ranker") or {}).get("strategy", "per_section")
+
+
+def _max_parallel(config: dict) -> int:
+    return max(1, (config.get("ranker") or {}).get("max_parallel_sections", 4))
+
+
+class RankingError(RuntimeError):
+    """One or more sections could not be ranked; raised once every section has finished."""
+
+    def __init__(self, failures: Dict[str, Exception]):
+        self.failures = failures
+        super().__init__("; ".join(f"{section}: {type(error).__name__}: {error}" for section, error in failures.items()))
+
+
+def _section_failed(state: State, failures: Dict[str, Exception], section: str, error: Exception) -> List[Dict[str, Any]]:
+    """Record a failed section in meta errors and failures; the others still complete before the run fails."""
+    logger.error(f"Ranking section '{section}' failed: {type(error).__name__}: {error}")
+    state.setdefault("meta", {}).setdefault("errors", []).append(f"ranker:{section}: {error}")
+    failures[section] = error
+    return []
+
+
+def _raise_failures(failures: Dict[str, Exception]) -> None:
+    """Fail the node if any section failed, so no CV with an empty section is exported and the checkpoint stays."""
+    if failures:
+        raise RankingError(failures)
+
+
+def memo_inputs(state: State, config: dict, section: str) -> Dict[str, Any]:
+    """
+    Inputs a section's selection depends on (memoization key).
+    
+    Args:
+        state: Current state with jd_summary
+        config: Configuration
+        section: "skills" or a work experience key
+        
+    Returns:
+        JD summary, content hash of the section's bank file, caps, tailoring type, model and ranker settings
+    """
+    bank = get_bank_store(config)
+    ranker_config = {
+        key: value for key, value in (config.get("ranker") or {}).items() if key != "max_parallel_sections"
+    }
+    inputs = {
+        "jd_summary": state["jd_summary"],
+        "bank": bank.file_hash(section),
+        "caps": config.get("caps"),
+        "tailoring_type": config.get("tailoring_type"),
+        "model": config.get("model"),
+        "ranker": ranker_config,
+    }
+    if ranker_config.get("scorer") == "tfidf":
+        # the TF-IDF shortlist depends on the idf over the whole bank
+        inputs["bank_sources"] = dict(bank.hashes)
+    return inputs
+
+
+def _select_section(state: State, config: dict, section: str) -> List[Dict[str, Any]]:
+    if local_mode(config):
+        if section == "skills":
+            return local_select_skill(state, config)
+        return local_select_work_experience(state, config, section)
+    if section == "skills":
+        return rank_and_select_skill(state, config)
+    return rank_and_select_work_experience(state, config, section)
+
+
+def _rank_section(state: State, config: dict, section: str, failures: Dict[str, Exception]) -> List[Dict[str, Any]]:
+    try:
+        return memoized(
+            state, config, f"ranker:{section}", memo_inputs(state, config, section),
+            lambda: _select_section(state, config, section),
+        )
+    except Exception as error:
+        return _section_failed(state, failures, section, error)
+
+
+def _merged_inputs(state: State, config: dict) -> Dict[str, Any]:
+    return {section: memo_inputs(state, config, section) for section in _sections(config)}
+
+
+def _record_timing(state: State, config: dict, started: float) -> None:
+    """Note the ranking wall time and strategy in meta["ranker_timing"], for comparing the strategies."""
+    strategy = "local" if local_mode(config) else ranking_strategy(config)
+    wall_s = time.perf_counter() - started
+    logger.info(f"Ranking ({strategy}) took {wall_s:.2f}s")
+    state.setdefault("meta", {})["ranker_timing"] = {"strategy": strategy, "wall_s": round(wall_s, 3)}
+
+
+async def _arank_section(
+    state: State, config: dict, section: str, semaphore: asyncio.Semaphore, failures: Dict[str, Exception]
+) -> List[Dict[str, Any]]:
+    async with semaphore:
+        try:
+            if section == "skills":
+                compute = lambda: arank_and_select_skill(state, config)
+            else:
+                compute = lambda: arank_and_select_work_experience(state, config, section)
+            return await amemoized(state, config, f"ranker:{section}", memo_inputs(state, config, section), compute)
+        except Exception as error:
+            return _section_failed(state, failures, section, error)
+
+
+def run(state: State, config: dict) -> State:
+    """
+    Rank and select best items from bank per section.
+    
+    The skills and work experience sections are independent LLM calls and
+    run concurrently on up to ranker.max_parallel_sections threads. A failed
+    section is recorded in meta errors; once the other sections have finished
+    (and been memoized) a RankingError fails the node. With ranker.strategy
+    "merged" all sections are ranked by a single LLM call instead; with
+    ranker.mode "local" they are scored locally without any LLM call.
+    
+    Args:
+        state: Current state with jd_summary
+        config: Configuration with model settings and caps
+        
+    Returns:
+        Updated state with selected items
+
+    Raises:
+        RankingError: If any section failed
+    """
+    logger.info("Ranking and selecting items from bank...")
+
+    started = time.perf_counter()
+    sections = _sections(config)
+    failures: Dict[str, Exception] = {}
+    if local_mode(config):
+        # local scoring takes milliseconds; no threads needed
+        selected = [_rank_section(state, config, section, failures) for section in sections]
+    elif ranking_strategy(config) == "merged":
+        try:
+            skills, works = memoized(
+                state, config, "ranker:merged", _merged_inputs(state, config),
+                lambda: rank_and_select_merged(state, config),
+            )
+        except Exception as error:
+            _section_failed(state, failures, "merged", error)
+            raise RankingError(failures) from error
+        selected = [skills, *(works[section] for section in sections[1:])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(_max_parallel(config), len(sections))) as executor:
+            # map() keeps the section order
+            selected = list(executor.map(lambda section: _rank_section(state, config, section, failures), sections))
+    _record_timing(state, config, started)
+    _raise_failures(failures)
+    return store_ranked(state, config, selected[0], dict(zip(sections[1:], selected[1:])))
+
+
+async def arun(state: State, config: dict) -> State:
+    """
+    Async variant of run(): the sections are awaited concurrently, at most
+    ranker.max_parallel_sections at a time.
+    
+    Args:
+        state: Current state with jd_summary
+        config: Configuration with model settings and caps
+        
+    Returns:
+        Updated state with selected items
+
+    Raises:
+        RankingError: If any section failed
+    """
+    logger.info("Ranking and selecting items from bank...")
+
+    started = time.perf_counter()
+    sections = _sections(config)
+    failures: Dict[str, Exception] = {}
+    if local_mode(config):
+        selected = [_rank_section(state, config, section, failures) for section in sections]
+    elif ranking_strategy(config) == "merged":
+        try:
+            skills, works = await amemoized(
+                state, config, "ranker:merged", _merged_inputs(state, config),
+                lambda: arank_and_select_merged(state, config),
+            )
+        except Exception as error:
+            _section_failed(state, failures, "merged", error)
+            raise RankingError(failures) from error
+        selected = [skills, *(works[section] for section in sections[1:])]
+    else:
+        semaphore = asyncio.Semaphore(_max_parallel(config))
+        selected = await asyncio.gather(
+            *[_arank_section(state, config, section, semaphore, failures) for section in sections]
+        )
+    _record_timing(state, config, started)
+    _raise_failures(failures)
+    return store_ranked(state, config, selected[0], dict(zip(sections[1:], selected[1:])))
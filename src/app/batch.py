@@ -0,0 +1,286 @@
+"""Batch execution of the CV and cover letter pipelines over many JDs.
+
+Instead of running one graph per JD, every LLM stage collects its requests
+across all JDs into one batch job, waits for the job and fans the replies
+back into each JD's state. The non-LLM stages (clean, assemble, export) run
+per JD in between.
+"""
+import time
+from typing import Dict, Any, Callable, List, Optional, Tuple, Type
+from pydantic import BaseModel
+from domain.state import State
+from domain.schemas import SkillSelection, WorkSelection, CoverLetterReply, merged_selection_schema
+from adapters.llm_openai import OpenAIClient, get_client, get_batch_provider
+from adapters.llm_batch import BatchProvider, run_batch
+from adapters.structured_output import SchemaValidationError, correction_prompt
+from adapters.jd_fingerprints import reuse_summary, remember_summary
+from agents import jd_cleaner, jd_parser, ranker, assembler, exporter, cover_letter_writer, cover_letter_exporter
+from utils.skill_experience_ranker import build_skill_prompts
+from utils.work_experience_ranker import build_work_experience_prompts
+from utils.merged_ranker import build_merged_prompts, split_merged_result
+from infra.logging import setup_logger
+from infra.metering import UsageMeter, get_meter
+
+logger = setup_logger(__name__)
+
+
+class _Request:
+    """A queued request and what to do with its reply."""
+
+    def __init__(
+        self,
+        client: OpenAIClient,
+        meter: UsageMeter,
+        prompts: Tuple[str, str],
+        schema: Type[BaseModel],
+        on_result: Callable[[Dict[str, Any]], None],
+    ):
+        self.client = client
+        self.meter = meter
+        self.prompts = prompts
+        self.schema = schema
+        self.on_result = on_result
+
+
+def _record_errors(states: Dict[str, State], errors: Dict[str, str], stage: str) -> None:
+    """Log failed JDs and store the error in their state."""
+    for jd_name, error in errors.items():
+        logger.error(f"[{jd_name}] {stage} failed: {error}")
+        states[jd_name]["meta"].setdefault("errors", []).append(f"{stage}: {error}")
+
+
+def _active(states: Dict[str, State]) -> List[str]:
+    """Names of the JDs without errors."""
+    return [name for name, state in states.items() if not state["meta"].get("errors")]
+
+
+def _setter(target: Dict[str, Any], key: str) -> Callable[[Dict[str, Any]], None]:
+    def store(result: Dict[str, Any]) -> None:
+        target[key] = result.get("selected")
+    return store
+
+
+def _merged_setter(selected: Dict[str, Any], config: Dict[str, Any]) -> Callable[[Dict[str, Any]], None]:
+    """Store a merged ranker reply split into the per-section shape of the other strategy."""
+    def store(result: Dict[str, Any]) -> None:
+        selected["skills"], selected["works"] = split_merged_result(result, config)
+    return store
+
+
+def run_batch_pipeline(
+    states: Dict[str, State],
+    config: Dict[str, Any],
+    generate_cv: bool,
+    generate_cover_letter: bool,
+) -> Dict[str, State]:
+    """
+    Run the CV and/or cover letter pipeline for many JDs with one batch job per LLM stage.
+
+    Each state carries its own configuration in state["config"] (e.g. its
+    own output directory). A JD whose request fails is recorded in
+    state["meta"]["errors"] and skipped by the later stages.
+
+    Args:
+        states: Initial states keyed by JD name
+        config: Configuration (uses the "batch" and "llm" sections)
+        generate_cv: Run the CV stages
+        generate_cover_letter: Run the cover letter stages
+
+    Returns:
+        Final states keyed by JD name
+    """
+    provider, price_factor = get_batch_provider(config)
+    batch_config = config.get("batch") or {}
+
+    def stage(name: str) -> BatchStage:
+        return BatchStage(name, provider, price_factor, batch_config)
+
+    # ----- clean and parse ----- #
+    parse = stage("parse")
+    for name in _active(states):
+        state = states[name]
+        jd_config = state["config"]
+        jd_cleaner.run(state, jd_config)
+        summary = reuse_summary(state, jd_config)
+        if summary is not None:
+            jd_parser.apply_result(state, summary)
+            continue
+        parse.add(
+            name, f"{name}:jd_parser",
+            get_client(jd_config.get("model", {}), jd_config),
+            get_meter(state, jd_config, "jd_parser"),
+            jd_parser.build_prompts(state, jd_config),
+            jd_parser.reply_schema(state, jd_config),
+            lambda result, state=state: jd_parser.apply_result(state, result),
+        )
+    _record_errors(states, parse.run(), "parse")
+    for name in _active(states):
+        remember_summary(states[name], states[name]["config"])
+
+    if generate_cv:
+        # ----- rank ----- #
+        # ranker.mode "local" scores every JD in process; otherwise one batch job for all sections
+        rank = stage("rank")
+        selections: Dict[str, Dict[str, Any]] = {}
+        for name in _active(states):
+            state = states[name]
+            jd_config = state["config"]
+            if ranker.local_mode(jd_config):
+                continue
+            client = get_client(jd_config.get("model"), jd_config)
+            selected = selections.setdefault(name, {"works": {}})
+            if ranker.ranking_strategy(jd_config) == "merged":
+                rank.add(
+                    name, f"{name}:ranker:merged", client,
+                    get_meter(state, jd_config, "ranker", "merged"),
+                    build_merged_prompts(state, jd_config),
+                    merged_selection_schema(tuple(jd_config.get("work_experience").keys())),
+                    _merged_setter(selected, jd_config),
+                )
+                continue
+            rank.add(
+                name, f"{name}:ranker:skills", client,
+                get_meter(state, jd_config, "ranker", "skills"),
+                build_skill_prompts(state, jd_config),
+                SkillSelection,
+                _setter(selected, "skills"),
+            )
+            for work in jd_config.get("work_experience").keys():
+                rank.add(
+                    name, f"{name}:ranker:{work}", client,
+                    get_meter(state, jd_config, "ranker", work),
+                    build_work_experience_prompts(state, jd_config, work),
+                    WorkSelection,
+                    _setter(selected["works"], work),
+                )
+        _record_errors(states, rank.run(), "rank")
+
+        # ----- assemble and export ----- #
+        for name in _active(states):
+            state = states[name]
+            jd_config = state["config"]
+            if ranker.local_mode(jd_config):
+                ranker.run(state, jd_config)
+            else:
+                ranker.store_ranked(state, jd_config, selections[name]["skills"], selections[name]["works"])
+            assembler.run(state, jd_config)
+            exporter.run(state, jd_config)
+
+    if generate_cover_letter:
+        # ----- write ----- #
+        write = stage("write_cover_letter")
+        for name in _active(states):
+            state = states[name]
+            jd_config = state["config"]
+            write.add(
+                name, f"{name}:cover_letter_writer",
+                get_client(jd_config.get("cl_model"), jd_config),
+                get_meter(state, jd_config, "cover_letter_writer"),
+                cover_letter_writer.build_prompts(state, jd_config),
+                CoverLetterReply,
+                lambda result, state=state: cover_letter_writer.apply_result(state, result),
+            )
+        _record_errors(states, write.run(), "write_cover_letter")
+
+        # ----- export ----- #
+        for name in _active(states):
+            cover_letter_exporter.run(states[name], states[name]["config"])
+
+    failed = len(states) - len(_active(states))
+    logger.info(f"Batch pipeline finished: {len(states) - failed} succeeded, {failed} failed")
+    return states
+
+
+class BatchStage:
+    """Collects the requests of one pipeline stage across all JDs."""
+
+    def __init__(self, name: str, provider: BatchProvider, price_factor: float, batch_config: Dict[str, Any]):
+        """
+        Args:
+            name: Stage name, used in logs
+            provider: Batch provider the requests are submitted to
+            price_factor: Cost multiplier recorded for batch results
+            batch_config: config["batch"] (work_dir, poll_interval_s, timeout_h)
+        """
+        self.name = name
+        self.provider = provider
+        self.price_factor = price_factor
+        self.batch_config = batch_config
+        self._requests: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Tuple[str, _Request, Optional[str]]] = {}
+        self._started = time.perf_counter()
+        self.cached = 0
+        self.errors: Dict[str, str] = {}
+
+    def add(
+        self,
+        jd_name: str,
+        custom_id: str,
+        client: OpenAIClient,
+        meter: UsageMeter,
+        prompts: Tuple[str, str],
+        schema: Type[BaseModel],
+        on_result: Callable[[Dict[str, Any]], None],
+    ) -> None:
+        """
+        Queue a JSON request; cached replies are applied right away.
+
+        Args:
+            jd_name: JD the request belongs to
+            custom_id: Unique id of the request within the batch
+            client: Client the request is built with
+            meter: Meter of the JD's state
+            prompts: (system_prompt, user_prompt)
+            schema: Reply schema (see domain.schemas)
+            on_result: Called with the parsed JSON reply
+        """
+        request = _Request(client, meter, prompts, schema, on_result)
+        kwargs, key, cached = client.prepare_batch_request(*prompts, schema=schema)
+        if cached is not None:
+            self.cached += 1
+            self._apply(jd_name, request, key, cached, cache_hit=True)
+            return
+        self._requests[custom_id] = kwargs
+        self._pending[custom_id] = (jd_name, request, key)
+
+    def run(self) -> Dict[str, str]:
+        """
+        Submit the queued requests, wait and apply the results.
+
+        Returns:
+            Error message per failed JD
+        """
+        logger.info(f"Batch stage '{self.name}': {len(self._requests)} requests, {self.cached} served from cache")
+        results = run_batch(
+            self.provider,
+            self._requests,
+            self.batch_config.get("work_dir", ".cache/batches"),
+            poll_interval_s=self.batch_config.get("poll_interval_s", 30),
+            timeout_s=self.batch_config.get("timeout_h", 24) * 3600,
+        )
+        for custom_id, result in results.items():
+            jd_name, request, key = self._pending[custom_id]
+            if result.error:
+                self.errors.setdefault(jd_name, f"{custom_id}: {result.error}")
+                continue
+            self._apply(jd_name, request, key, result.content, usage=result.usage, price_factor=self.price_factor)
+        return self.errors
+
+    def _apply(self, jd_name: str, request: _Request, key: Optional[str], content: str, **kwargs: Any) -> None:
+        """Validate a reply and hand it to the request's callback; invalid replies are re-requested directly."""
+        client = request.client
+        try:
+            try:
+                result = client.finish_batch_request(
+                    key, content, request.meter, self._started, schema=request.schema, **kwargs
+                )
+            except SchemaValidationError as error:
+                # only this call is repeated, outside the batch
+                logger.warning(f"[{jd_name}] invalid batch reply ({error}), re-requesting it directly")
+                system_prompt, user_prompt = request.prompts
+                result = client.chat_completion_json(
+                    system_prompt, correction_prompt(user_prompt, error), meter=request.meter, schema=request.schema
+                )
+            request.on_result(result)
+        except Exception as error:
+            self.errors.setdefault(jd_name, f"{type(error).__name__}: {error}")
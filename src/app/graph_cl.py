@@ -2,7 +2,8 @@
 from typing import Dict, Any
 from langgraph.graph import StateGraph, END
 from domain.state import State
-from agents import jd_parser, cover_letter_writer, cover_letter_exporter
+from adapters.checkpoint_store import get_checkpointer
+from app.services import agent_node
 
 
 def create_cover_letter_graph(config: Dict[str, Any]):
@@ -10,7 +11,9 @@ def create_cover_letter_graph(config: Dict[str, Any]):
     Create and compile the cover letter graph.
     
     Flow:
-    - parse -> write_cover_letter -> export_cover_letter
+    - clean -> parse -> write_cover_letter -> export_cover_letter
+    
+    The compiled graph supports both invoke() and ainvoke().
     
     Args:
         config: Configuration dictionary
@@ -21,15 +24,18 @@ def create_cover_letter_graph(config: Dict[str, Any]):
     graph = StateGraph(State)
     
     # Add nodes
-    graph.add_node("parse", lambda state: jd_parser.run(state, config))
-    graph.add_node("write_cover_letter", lambda state: cover_letter_writer.run(state, config))
-    graph.add_node("export_cover_letter", lambda state: cover_letter_exporter.run(state, config))
+    graph.add_node("clean", agent_node("agents.jd_cleaner", config))
+    graph.add_node("parse", agent_node("agents.jd_parser", config))
+    graph.add_node("write_cover_letter", agent_node("agents.cover_letter_writer", config))
+    graph.add_node("export_cover_letter", agent_node("agents.cover_letter_exporter", config))
     
     # Main flow
-    graph.set_entry_point("parse")
+    graph.set_entry_point("clean")
+    graph.add_edge("clean", "parse")
     graph.add_edge("parse", "write_cover_letter")
     graph.add_edge("write_cover_letter", "export_cover_letter")
     graph.add_edge("export_cover_letter", END)
     
-    return graph.compile()
+    # name identifies the graph of a checkpointed run when it is resumed
+    return graph.compile(checkpointer=get_checkpointer(config), name="cover_letter")
 
@@ -0,0 +1,56 @@
+"""LangGraph wiring for generating the CV and the cover letter in one run."""
+from typing import Dict, Any
+from langgraph.graph import StateGraph, END
+from domain.state import State
+from adapters.checkpoint_store import get_checkpointer
+from app.services import agent_node, branch_node
+
+
+def create_combined_graph(config: Dict[str, Any]):
+    """
+    Create and compile the graph producing both the CV and the cover letter.
+
+    Flow:
+    - clean -> parse, then in parallel
+    - rank -> assemble -> export
+    - write_cover_letter -> export_cover_letter
+
+    The JD is parsed once for both documents, and the two branches run
+    concurrently (threads under invoke(), tasks under ainvoke()). The graph
+    ends once both branches have exported.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Compiled StateGraph
+    """
+    graph = StateGraph(State)
+
+    # Add nodes
+    graph.add_node("clean", agent_node("agents.jd_cleaner", config))
+    graph.add_node("parse", agent_node("agents.jd_parser", config))
+    # branch nodes return only the keys they set, so both branches can update the state in one step
+    graph.add_node("rank", branch_node("agents.ranker", config))
+    graph.add_node("assemble", branch_node("agents.assembler", config))
+    graph.add_node("export", branch_node("agents.exporter", config))
+    graph.add_node("write_cover_letter", branch_node("agents.cover_letter_writer", config))
+    graph.add_node("export_cover_letter", branch_node("agents.cover_letter_exporter", config))
+
+    # Shared parse
+    graph.set_entry_point("clean")
+    graph.add_edge("clean", "parse")
+
+    # CV branch
+    graph.add_edge("parse", "rank")
+    graph.add_edge("rank", "assemble")
+    graph.add_edge("assemble", "export")
+    graph.add_edge("export", END)
+
+    # Cover letter branch
+    graph.add_edge("parse", "write_cover_letter")
+    graph.add_edge("write_cover_letter", "export_cover_letter")
+    graph.add_edge("export_cover_letter", END)
+
+    # name identifies the graph of a checkpointed run when it is resumed
+    return graph.compile(checkpointer=get_checkpointer(config), name="combined")
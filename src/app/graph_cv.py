@@ -2,7 +2,8 @@
 from typing import Dict, Any
 from langgraph.graph import StateGraph, END
 from domain.state import State
-from agents import jd_parser, ranker, assembler, critic, exporter
+from adapters.checkpoint_store import get_checkpointer
+from app.services import agent_node
 
 
 def create_cv_graph(config: Dict[str, Any]):
@@ -10,7 +11,9 @@ def create_cv_graph(config: Dict[str, Any]):
     Create and compile the CV tailoring graph.
     
     Flow:
-    - parse -> rank -> assemble -> critic -> export
+    - clean -> parse -> rank -> assemble -> critic -> export
+    
+    The compiled graph supports both invoke() and ainvoke().
     
     Args:
         config: Configuration dictionary
@@ -21,17 +24,20 @@ def create_cv_graph(config: Dict[str, Any]):
     graph = StateGraph(State)
     
     # Add nodes
-    graph.add_node("parse", lambda state: jd_parser.run(state, config))
-    graph.add_node("rank", lambda state: ranker.run(state, config))
-    graph.add_node("assemble", lambda state: assembler.run(state, config))
-    # graph.add_node("critic", lambda state: critic.run(state, config))
-    graph.add_node("export", lambda state: exporter.run(state, config))
+    graph.add_node("clean", agent_node("agents.jd_cleaner", config))
+    graph.add_node("parse", agent_node("agents.jd_parser", config))
+    graph.add_node("rank", agent_node("agents.ranker", config))
+    graph.add_node("assemble", agent_node("agents.assembler", config))
+    # graph.add_node("critic", agent_node("agents.critic", config))
+    graph.add_node("export", agent_node("agents.exporter", config))
     
     # Main flow
-    graph.set_entry_point("parse")
+    graph.set_entry_point("clean")
+    graph.add_edge("clean", "parse")
     graph.add_edge("parse", "rank")
     graph.add_edge("rank", "assemble")
     graph.add_edge("assemble", "export")
     graph.add_edge("export", END)
     
-    return graph.compile()
+    # name identifies the graph of a checkpointed run when it is resumed
+    return graph.compile(checkpointer=get_checkpointer(config), name="cv")
@@ -0,0 +1,207 @@
+"""In-process job queue of the service mode: JD jobs run on a worker pool against warm graphs."""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from domain.state import State
+from app.services import new_run_id, run_options, tracked_run
+from infra.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+TERMINAL = ("done", "error")
+
+
+class Job:
+    """One submitted JD and its progress."""
+
+    def __init__(self, jd_raw: str, generate_cv: bool, generate_cover_letter: bool, options: Dict[str, Any], out_root: Path):
+        """
+        Args:
+            jd_raw: Raw JD text
+            generate_cv: Produce the resume
+            generate_cover_letter: Produce the cover letter
+            options: Per-job settings (tailoring_type, label)
+            out_root: Directory the job's output directory is created in
+        """
+        # same shape as the run directories of run.py
+        self.id = new_run_id()
+        self.jd_raw = jd_raw
+        self.generate_cv = generate_cv
+        self.generate_cover_letter = generate_cover_letter
+        self.options = options
+        self.out_dir = out_root / self.id
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.events: List[Dict[str, Any]] = []
+
+    def artifacts(self) -> List[str]:
+        """Names of the files the job has written so far."""
+        if not self.out_dir.is_dir():
+            return []
+        return sorted(path.name for path in self.out_dir.iterdir() if path.is_file())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status of the job as returned by the API."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "label": self.options.get("label"),
+            "cv": self.generate_cv,
+            "cl": self.generate_cover_letter,
+            "tailoring_type": self.options.get("tailoring_type"),
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "wall_s": round(self.finished - self.started, 3) if self.finished and self.started else None,
+            "error": self.error,
+            "out_dir": str(self.out_dir),
+            "artifacts": self.artifacts(),
+        }
+
+
+class JobQueue:
+    """Runs jobs on a thread pool and keeps their status for polling and event streams."""
+
+    def __init__(
+        self,
+        graphs: Dict[Tuple[bool, bool], Any],
+        make_state: Callable[[Job], State],
+        finish: Callable[[State, Path], None],
+        out_root: Path,
+        workers: int = 4,
+        max_jobs: int = 1000,
+    ):
+        """
+        Args:
+            graphs: Compiled graph per (generate_cv, generate_cover_letter)
+            make_state: Builds the initial state of a job
+            finish: Called with the final state and output directory (e.g. to save the state)
+            out_root: Directory the job output directories are created in
+            workers: Jobs processed concurrently
+            max_jobs: Finished jobs kept in memory; the oldest are forgotten (their files stay)
+        """
+        self.graphs = graphs
+        self.make_state = make_state
+        self.finish = finish
+        self.out_root = out_root
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._changed = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+
+    def submit(self, jd_raw: str, generate_cv: bool, generate_cover_letter: bool, options: Dict[str, Any]) -> Job:
+        """
+        Queue a JD.
+
+        Args:
+            jd_raw: Raw JD text
+            generate_cv: Produce the resume
+            generate_cover_letter: Produce the cover letter
+            options: Per-job settings (tailoring_type, label)
+
+        Returns:
+            The queued job
+        """
+        job = Job(jd_raw, generate_cv, generate_cover_letter, options, self.out_root)
+        with self._changed:
+            self._jobs[job.id] = job
+            self._event(job, {"event": "queued"})
+            self._forget_finished()
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._changed:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Job]:
+        with self._changed:
+            return list(self._jobs.values())
+
+    def counts(self) -> Dict[str, int]:
+        """Number of known jobs per status."""
+        counts: Dict[str, int] = {}
+        for job in self.jobs():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    def events(self, job: Job, timeout: float = 15.0) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Events of a job from the first one until it has finished.
+
+        Yields None after `timeout` seconds without a new event, so callers
+        can send a keep-alive or notice a closed connection.
+        """
+        position = 0
+        while True:
+            with self._changed:
+                # the condition is shared by all jobs; wake up only for this one
+                if not self._changed.wait_for(lambda: position < len(job.events) or job.status in TERMINAL, timeout):
+                    new, finished = [], False
+                else:
+                    new = job.events[position:]
+                    finished = job.status in TERMINAL
+            if not new and not finished:
+                yield None
+            for event in new:
+                yield event
+            position += len(new)
+            if finished and position >= len(job.events):
+                return
+
+    def shutdown(self) -> None:
+        """Stop accepting work and wait for the running jobs."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _event(self, job: Job, event: Dict[str, Any]) -> None:
+        # callers hold self._changed
+        job.events.append({"t": round(time.time(), 3), **event})
+        self._changed.notify_all()
+
+    def _update(self, job: Job, event: Dict[str, Any], **fields: Any) -> None:
+        with self._changed:
+            for name, value in fields.items():
+                setattr(job, name, value)
+            self._event(job, event)
+
+    def _forget_finished(self) -> None:
+        # callers hold self._changed
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in TERMINAL]
+        for job_id in finished[:max(len(self._jobs) - self.max_jobs, 0)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: Job) -> None:
+        """Run a job's graph, recording an event per finished node."""
+        self._update(job, {"event": "running"}, status="running", started=time.time())
+        try:
+            job.out_dir.mkdir(parents=True, exist_ok=True)
+            state = self.make_state(job)
+            graph = self.graphs[(job.generate_cv, job.generate_cover_letter)]
+            # the job id is the run id, so run.py --resume can continue a failed job
+            with tracked_run(graph, job.id):
+                for mode, chunk in graph.stream(state, stream_mode=["updates", "values"], **run_options(graph, job.id)):
+                    if mode == "values":
+                        state = chunk
+                        continue
+                    for node in chunk:
+                        self._update(job, {"event": "node", "node": node})
+            self.finish(state, job.out_dir)
+        except Exception as error:
+            logger.error(f"[job {job.id}] failed: {type(error).__name__}: {error}")
+            self._update(
+                job, {"event": "error", "error": f"{type(error).__name__}: {error}"},
+                status="error", error=f"{type(error).__name__}: {error}", finished=time.time(),
+            )
+            return
+        finally:
+            # the JD text is not needed once the job has run
+            job.jd_raw = ""
+        self._update(job, {"event": "done", "artifacts": job.artifacts()}, status="done", finished=time.time())
+        logger.info(f"[job {job.id}] done in {job.finished - job.started:.2f}s")
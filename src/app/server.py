@@ -0,0 +1,184 @@
+"""HTTP API of the service mode (TCP or Unix socket), backed by a JobQueue.
+
+    POST /jobs                         submit {"jd": "...", "cv": true, "cl": false, "type": "tech", "label": "..."}
+    GET  /jobs                         list the known jobs
+    GET  /jobs/<id>                    status of a job
+    GET  /jobs/<id>/events             stream the job's events as JSON lines until it has finished
+    GET  /jobs/<id>/artifacts/<name>   download a file the job has written
+    GET  /health                       worker and queue counts
+"""
+import json
+import mimetypes
+import os
+import re
+import socketserver
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from app.jobs import JobQueue
+from infra.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+_JOB_PATH = re.compile(r"^/jobs/(?P<id>[\w-]+)(?:/(?P<rest>events|artifacts(?:/(?P<name>[^/]+))?))?$")
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """Maps the API routes onto the server's job queue."""
+
+    server_version = "cv-agentic"
+
+    @property
+    def queue(self) -> JobQueue:
+        return self.server.queue
+
+    def address_string(self) -> str:
+        # Unix socket peers have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status: HTTPStatus, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: HTTPStatus, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def _read_json(self) -> Optional[Dict[str, Any]]:
+        """Parsed request body, or None after sending the error response."""
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > self.server.max_body_bytes:
+            self._error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body exceeds {self.server.max_body_bytes} bytes")
+            return None
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as error:
+            self._error(HTTPStatus.BAD_REQUEST, f"invalid JSON: {error}")
+            return None
+        if not isinstance(payload, dict):
+            self._error(HTTPStatus.BAD_REQUEST, "expected a JSON object")
+            return None
+        return payload
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/jobs":
+            self._error(HTTPStatus.NOT_FOUND, f"no route for POST {self.path}")
+            return
+        payload = self._read_json()
+        if payload is None:
+            return
+        jd_raw = payload.get("jd")
+        if not isinstance(jd_raw, str) or not jd_raw.strip():
+            self._error(HTTPStatus.BAD_REQUEST, '"jd" (the JD text) is required')
+            return
+        generate_cv = bool(payload.get("cv", True))
+        generate_cover_letter = bool(payload.get("cl", False))
+        if not generate_cv and not generate_cover_letter:
+            self._error(HTTPStatus.BAD_REQUEST, 'at least one of "cv" and "cl" must be true')
+            return
+        tailoring_type = payload.get("type", self.server.default_type)
+        if tailoring_type not in ("tech", "business"):
+            self._error(HTTPStatus.BAD_REQUEST, '"type" must be "tech" or "business"')
+            return
+        job = self.queue.submit(
+            jd_raw, generate_cv, generate_cover_letter,
+            {"tailoring_type": tailoring_type, "label": payload.get("label")},
+        )
+        self._send_json(HTTPStatus.ACCEPTED, {**job.to_dict(), "links": {
+            "status": f"/jobs/{job.id}", "events": f"/jobs/{job.id}/events",
+        }})
+
+    def do_GET(self) -> None:
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok", "workers": self.queue.workers, "jobs": self.queue.counts()})
+            return
+        if path == "/jobs":
+            self._send_json(HTTPStatus.OK, [job.to_dict() for job in self.queue.jobs()])
+            return
+        match = _JOB_PATH.match(path)
+        job = self.queue.get(match.group("id")) if match else None
+        if job is None:
+            self._error(HTTPStatus.NOT_FOUND, f"no job or route for GET {self.path}")
+            return
+        if match.group("rest") is None:
+            self._send_json(HTTPStatus.OK, job.to_dict())
+        elif match.group("rest") == "events":
+            self._stream_events(job)
+        elif match.group("name") is None:
+            self._send_json(HTTPStatus.OK, job.artifacts())
+        else:
+            self._send_artifact(job, match.group("name"))
+
+    def _stream_events(self, job) -> None:
+        """Write the job's events as JSON lines; the connection closes when the job has finished."""
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        try:
+            for event in self.queue.events(job):
+                # an empty line keeps idle connections alive and detects closed ones
+                line = json.dumps(event, ensure_ascii=False) if event is not None else ""
+                self.wfile.write(line.encode("utf-8") + b"\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug(f"event stream of job {job.id} closed by the client")
+        self.close_connection = True
+
+    def _send_artifact(self, job, name: str) -> None:
+        if name not in job.artifacts():
+            self._error(HTTPStatus.NOT_FOUND, f"job {job.id} has no artifact {name}")
+            return
+        path = job.out_dir / name
+        content_type = mimetypes.guess_type(name)[0] or "text/plain"
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(path.stat().st_size))
+        self.end_headers()
+        with open(path, "rb") as f:
+            self.wfile.write(f.read())
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def create_server(
+    queue: JobQueue,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[str] = None,
+    default_type: str = "tech",
+    max_body_bytes: int = 512 * 1024,
+):
+    """
+    Create the API server; call serve_forever() on the result.
+
+    Args:
+        queue: Job queue the requests are served from
+        host: Interface to listen on (TCP)
+        port: Port to listen on (TCP)
+        socket_path: Listen on this Unix socket instead of host/port
+        default_type: Tailoring type of jobs that do not set "type"
+        max_body_bytes: Largest accepted request body
+
+    Returns:
+        ThreadingHTTPServer, or a threading Unix socket server
+    """
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = _UnixHTTPServer(socket_path, JobRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), JobRequestHandler)
+    server.queue = queue
+    server.default_type = default_type
+    server.max_body_bytes = max_body_bytes
+    return server
@@ -1,5 +1,42 @@
 """Small helper functions."""
-from typing import Dict, Any, List
+import copy
+import importlib
+import uuid
+from contextlib import nullcontext
+from datetime import datetime
+from typing import TYPE_CHECKING, ContextManager, Dict, Any, List, Union
+from types import ModuleType
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableLambda
+
+# An agent module, or its dotted name to import when the node first runs
+Agent = Union[ModuleType, str]
+
+
+def new_run_id() -> str:
+    """Collision-free run id: start time plus a random suffix (parallel runs may start in the same second)."""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+def run_options(graph: Any, run_id: str) -> Dict[str, Any]:
+    """
+    invoke()/ainvoke()/stream() keyword arguments selecting the checkpoints of a run.
+
+    Graphs compiled without a checkpointer need none. With one, the run id
+    is the thread id, and each checkpoint is written before the next node
+    starts, so a failed run resumes from its last completed node.
+    """
+    if graph.checkpointer is None:
+        return {}
+    return {"config": {"configurable": {"thread_id": run_id}}, "durability": "sync"}
+
+
+def tracked_run(graph: Any, run_id: str) -> ContextManager:
+    """Record the run's status next to its checkpoints (see SQLiteCheckpointSaver.track); a no-op without a checkpointer."""
+    if graph.checkpointer is None:
+        return nullcontext()
+    return graph.checkpointer.track(run_id, graph.name)
 
 
 def get_retry_count(state: Dict[str, Any]) -> int:
@@ -14,3 +51,121 @@ def increment_retry_count(state: Dict[str, Any]) -> Dict[str, Any]:
     state["meta"]["retry_count"] = state["meta"].get("retry_count", 0) + 1
     return state
 
+
+def _resolve(agent: Agent) -> ModuleType:
+    # import_module caches in sys.modules, so later calls are a dict lookup
+    return importlib.import_module(agent) if isinstance(agent, str) else agent
+
+
+def _own_meta(state: Dict[str, Any]) -> Dict[str, Any]:
+    """The state with a copy of meta (and of its lists and dicts) the agent can record into."""
+    meta = state.get("meta") or {}
+    return {**state, "meta": {key: copy.copy(value) if isinstance(value, (list, dict)) else value for key, value in meta.items()}}
+
+
+def meta_delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    What an agent recorded into meta, in the form domain.state.merge_meta merges.
+
+    Args:
+        before: Meta the node started from
+        after: Meta the agent left
+
+    Returns:
+        New and replaced values, the items appended to lists and the changed entries of dicts
+    """
+    delta = {}
+    for key, value in after.items():
+        if key not in before:
+            delta[key] = value
+            continue
+        old = before[key]
+        if isinstance(value, list) and isinstance(old, list):
+            # meta lists (llm_calls, errors) are append-only
+            if len(value) > len(old):
+                delta[key] = value[len(old):]
+        elif isinstance(value, dict) and isinstance(old, dict):
+            changed = {name: item for name, item in value.items() if name not in old or old[name] != item}
+            if changed:
+                delta[key] = changed
+        elif value != old:
+            delta[key] = value
+    return delta
+
+
+def agent_node(agent: Agent, config: Dict[str, Any]) -> "RunnableLambda":
+    """
+    Wrap an agent module as a graph node usable by both invoke and ainvoke.
+
+    A state carrying its own configuration (state["config"], e.g. with its
+    own output directory) is run with it, so one compiled graph can serve
+    many JDs.
+
+    Given a module name, the agent (and the LLM SDK, rankers or template
+    engine it pulls in) is imported when the node first runs, so a graph
+    only loads the code of the nodes it executes.
+
+    The agent records into its own copy of state["meta"], and the node
+    returns only what it recorded there (see meta_delta()).
+
+    Args:
+        agent: Agent module exposing run(state, config) and arun(state, config),
+            or its dotted name (e.g. "agents.ranker")
+        config: Configuration dictionary bound to the node
+
+    Returns:
+        Runnable calling agent.run when invoked and agent.arun when awaited
+    """
+    from langchain_core.runnables import RunnableLambda
+
+    def update(before: Dict[str, Any], state: Dict[str, Any]) -> Dict[str, Any]:
+        return {**state, "meta": meta_delta(before, state.get("meta") or {})}
+
+    def run(state):
+        before, state = state.get("meta") or {}, _own_meta(state)
+        return update(before, _resolve(agent).run(state, state.get("config") or config))
+
+    async def arun(state):
+        before, state = state.get("meta") or {}, _own_meta(state)
+        return update(before, await _resolve(agent).arun(state, state.get("config") or config))
+
+    return RunnableLambda(run, afunc=arun)
+
+
+def branch_node(agent: Agent, config: Dict[str, Any]) -> "RunnableLambda":
+    """
+    Like agent_node(), but the node returns only the state keys the agent assigned.
+
+    Nodes of parallel branches run in the same step, and two nodes returning
+    the whole state would both write every key. Each branch records into its
+    own copy of state["meta"] and returns what it recorded, which the meta
+    reducer merges with the other branch's records.
+
+    Args:
+        agent: Agent module exposing run(state, config) and arun(state, config),
+            or its dotted name
+        config: Configuration dictionary bound to the node
+
+    Returns:
+        Runnable returning the assigned keys only
+    """
+    from langchain_core.runnables import RunnableLambda
+
+    def changed(meta: Dict[str, Any], before: Dict[str, int], state: Dict[str, Any]) -> Dict[str, Any]:
+        update = {key: value for key, value in state.items() if key != "meta" and before.get(key) != id(value)}
+        recorded = meta_delta(meta, state.get("meta") or {})
+        if recorded:
+            update["meta"] = recorded
+        return update
+
+    def run(state):
+        meta, state = state.get("meta") or {}, _own_meta(state)
+        before = {key: id(value) for key, value in state.items()}
+        return changed(meta, before, _resolve(agent).run(state, state.get("config") or config))
+
+    async def arun(state):
+        meta, state = state.get("meta") or {}, _own_meta(state)
+        before = {key: id(value) for key, value in state.items()}
+        return changed(meta, before, await _resolve(agent).arun(state, state.get("config") or config))
+
+    return RunnableLambda(run, afunc=arun)
@@ -0,0 +1,142 @@
+"""Streaming execution of the CV and cover letter graphs over a large JD corpus.
+
+JDs are pulled from a generator only when a pipeline slot frees up, so at
+most `concurrency` JD states are alive at any time and memory stays flat
+however long the corpus is. The compiled graphs, bank, profile and config
+are shared by all JDs; each JD runs with its own copy of the config (its
+own output directory) and is forgotten once its status line is written.
+"""
+import asyncio
+import json
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from domain.state import State
+from app.services import run_options, tracked_run
+from infra.logging import setup_logger
+from infra.metering import summarize_usage
+
+logger = setup_logger(__name__)
+
+
+def jd_run_id(seq: int, jd_id: str) -> str:
+    """Run id of the seq-th JD of a stream: unique within the run even when JD ids repeat."""
+    slug = re.sub(r"[^\w.-]+", "_", jd_id).strip("._")[:60] or "jd"
+    return f"{seq:06d}_{slug}"
+
+
+def _status(run_id: str, jd_id: str, out_dir: Path, state: Optional[State], error: Optional[str], started: float) -> Dict[str, Any]:
+    """Results line of one JD."""
+    record: Dict[str, Any] = {
+        "run_id": run_id,
+        "jd_id": jd_id,
+        "status": "error" if error else "ok",
+        "out_dir": str(out_dir),
+        "wall_s": round(time.perf_counter() - started, 3),
+    }
+    if error:
+        record["error"] = error
+    if state is not None:
+        summary = state.get("jd_summary") or {}
+        # totals of the whole run, both documents of a combined run included
+        run_usage = summarize_usage(state.get("meta", {}).get("llm_calls", []))["run"]
+        record.update({
+            "company": summary.get("company"),
+            "role": summary.get("role"),
+            "llm_calls": run_usage.get("calls", 0),
+            "cost_usd": run_usage.get("cost_usd", 0.0),
+        })
+    return record
+
+
+async def _run_jd(
+    seq: int,
+    jd_id: str,
+    jd_raw: str,
+    out_dir: Path,
+    make_state: Callable[[str, Path], State],
+    graphs: List[Any],
+    finish: Optional[Callable[[State], None]],
+) -> Dict[str, Any]:
+    """Run the graphs one after the other for one JD and return its results line."""
+    run_id = jd_run_id(seq, jd_id)
+    jd_out_dir = out_dir / run_id
+    started = time.perf_counter()
+    state = None
+    try:
+        jd_out_dir.mkdir(parents=True, exist_ok=True)
+        state = make_state(jd_raw, jd_out_dir)
+        for graph in graphs:
+            # checkpointed under <stream run id>/<JD run id>, which run.py --resume accepts
+            thread_id = f"{out_dir.name}/{run_id}" if len(graphs) == 1 else f"{out_dir.name}/{run_id}/{graph.name}"
+            with tracked_run(graph, thread_id):
+                state = await graph.ainvoke(state, **run_options(graph, thread_id))
+        if finish is not None:
+            await asyncio.to_thread(finish, state)
+    except Exception as error:
+        logger.error(f"[{run_id}] pipeline failed: {type(error).__name__}: {error}")
+        return _status(run_id, jd_id, jd_out_dir, state, f"{type(error).__name__}: {error}", started)
+    return _status(run_id, jd_id, jd_out_dir, state, None, started)
+
+
+async def arun_stream(
+    jds: Iterable[Tuple[str, str]],
+    make_state: Callable[[str, Path], State],
+    graphs: List[Any],
+    out_dir: Path,
+    results_path: Path,
+    concurrency: int = 8,
+    finish: Optional[Callable[[State], None]] = None,
+) -> Dict[str, int]:
+    """
+    Run the graphs for every JD of a stream with at most `concurrency` JDs in flight.
+
+    Each JD gets the run id <sequence number>_<JD id> and the output
+    directory out_dir/<run id>/. One status line per JD (run id, status,
+    wall time, LLM calls and cost, or the error) is appended to
+    results_path as soon as the JD finishes; a failing JD does not stop
+    the stream.
+
+    Args:
+        jds: (JD id, JD text) pairs, consumed lazily
+        make_state: Builds the initial state of a JD from its text and output directory
+        graphs: Compiled graphs run in order on each JD's state
+        out_dir: Directory of this run
+        results_path: JSONL file the status lines are appended to
+        concurrency: Maximum number of JD pipelines in flight
+        finish: Optional blocking callback for each final state (runs in a worker thread)
+
+    Returns:
+        Number of JDs per status ("ok", "error")
+    """
+    counts: Counter = Counter()
+    pending = set()
+    started = time.perf_counter()
+
+    with open(results_path, "a") as results:
+
+        def write(done) -> None:
+            for task in done:
+                record = task.result()
+                counts[record["status"]] += 1
+                results.write(json.dumps(record, ensure_ascii=False) + "\n")
+            results.flush()
+            total = sum(counts.values())
+            if total // 100 > (total - len(done)) // 100 or not pending:
+                logger.info(
+                    f"Stream: {total} JDs done ({counts['error']} failed), "
+                    f"{total / (time.perf_counter() - started):.2f} JDs/s"
+                )
+
+        for seq, (jd_id, jd_raw) in enumerate(jds, 1):
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                write(done)
+            pending.add(asyncio.create_task(_run_jd(seq, jd_id, jd_raw, out_dir, make_state, graphs, finish)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            write(done)
+
+    return dict(counts)
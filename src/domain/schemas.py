@@ -0,0 +1,149 @@
+"""Pydantic schemas of the structured LLM replies.
+
+Each schema is sent as a strict json_schema response format (see
+adapters.structured_output) and used to validate the reply. `aliases` maps
+key names models commonly use instead of the canonical ones; they are
+renamed before validation.
+"""
+from functools import lru_cache
+from typing import Any, ClassVar, Dict, List, Tuple, Type
+from pydantic import BaseModel, ConfigDict, Field, create_model, model_validator
+
+
+class LLMReply(BaseModel):
+    """Base class of the reply schemas: ignores unknown keys and applies key aliases."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    aliases: ClassVar[Dict[str, str]] = {}
+
+    @model_validator(mode="before")
+    @classmethod
+    def _rename_aliases(cls, data: Any) -> Any:
+        if not isinstance(data, dict) or not cls.aliases:
+            return data
+        renamed = dict(data)
+        for alias, name in cls.aliases.items():
+            if alias in renamed and name not in renamed:
+                renamed[name] = renamed.pop(alias)
+        return renamed
+
+
+class JDSummaryReply(LLMReply):
+    """Reply of the JD parser."""
+
+    aliases: ClassVar[Dict[str, str]] = {
+        "company_name": "company",
+        "employer": "company",
+        "title": "role",
+        "job_title": "role",
+        "position": "role",
+        "required_skills": "skills",
+        "key_skills": "skills",
+        "tasks": "responsibilities",
+        "requirements": "must_haves",
+        "must_have": "must_haves",
+        "nice_to_have": "nice_to_haves",
+        "hiring_manager": "hr",
+        "zip_code": "zip",
+        "postal_code": "zip",
+    }
+
+    company: str
+    role: str
+    skills: List[str]
+    responsibilities: List[str]
+    must_haves: List[str]
+    nice_to_haves: List[str]
+    hr: str = "Hiring Manager"
+    address: str = "xxxxxxx x"
+    zip: str = "1000"
+    city: str = "Zurich"
+
+
+@lru_cache(maxsize=None)
+def jd_reply_schema(fields: Tuple[str, ...], located: bool = False) -> Type[LLMReply]:
+    """
+    Reply schema of the JD parser restricted to the fields asked from the LLM.
+
+    Args:
+        fields: JDSummaryReply field names (the others are extracted locally)
+        located: The city is known, so a missing address or zip defaults to "" instead of a placeholder
+
+    Returns:
+        JDSummaryReply itself if all fields are asked, else a schema with just those fields
+    """
+    if set(fields) == set(JDSummaryReply.model_fields) and not located:
+        return JDSummaryReply
+    definitions = {name: (JDSummaryReply.model_fields[name].annotation, JDSummaryReply.model_fields[name]) for name in fields}
+    if located:
+        definitions.update({name: (str, "") for name in ("address", "zip") if name in fields})
+    schema = create_model("JDPartialReply", __base__=LLMReply, **definitions)
+    schema.aliases = {alias: name for alias, name in JDSummaryReply.aliases.items() if name in fields}
+    return schema
+
+
+class SkillItem(LLMReply):
+    """One skills line (category and its LaTeX text)."""
+
+    aliases: ClassVar[Dict[str, str]] = {"category": "categories", "name": "categories", "skills": "text"}
+
+    categories: str
+    text: str
+
+
+class SkillSelection(LLMReply):
+    """Reply of the skills ranker."""
+
+    aliases: ClassVar[Dict[str, str]] = {"skills": "selected", "items": "selected"}
+
+    selected: List[SkillItem] = Field(min_length=1)
+
+
+class WorkItem(LLMReply):
+    """One selected work experience bullet."""
+
+    aliases: ClassVar[Dict[str, str]] = {"item_id": "id", "bullet": "text", "content": "text"}
+
+    id: str
+    text: str
+
+
+class WorkSelection(LLMReply):
+    """Reply of the work experience ranker."""
+
+    aliases: ClassVar[Dict[str, str]] = {"items": "selected", "bullets": "selected"}
+
+    selected: List[WorkItem] = Field(min_length=1)
+
+
+@lru_cache(maxsize=None)
+def merged_selection_schema(work_names: Tuple[str, ...]) -> Type[LLMReply]:
+    """
+    Reply schema of the merged ranker: one key per section.
+
+    Args:
+        work_names: Work experience section keys (config["work_experience"])
+
+    Returns:
+        Schema with a SkillSelection under "skills" and a WorkSelection per work section
+    """
+    fields: Dict[str, Any] = {"skills": (SkillSelection, ...)}
+    fields.update({work: (WorkSelection, ...) for work in work_names})
+    return create_model("MergedSelection", __base__=LLMReply, **fields)
+
+
+class CoverLetterReply(LLMReply):
+    """Reply of the cover letter writer."""
+
+    aliases: ClassVar[Dict[str, str]] = {
+        "paragraph1": "paragraph_1",
+        "paragraph2": "paragraph_2",
+        "paragraph3": "paragraph_3",
+        "paragraph4": "paragraph_4",
+    }
+
+    paragraph_1: str = Field(min_length=1)
+    paragraph_2: str = Field(min_length=1)
+    paragraph_3: str = Field(min_length=1)
+    paragraph_4: str = Field(min_length=1)
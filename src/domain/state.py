@@ -1,5 +1,5 @@
 """Shared state TypedDict for the CV tailoring pipeline."""
-from typing import TypedDict, List, Dict, Any, Optional
+from typing import Annotated, TypedDict, List, Dict, Any, Optional
 
 
 class JDSummary(TypedDict):
@@ -46,11 +46,32 @@ class CoverLetterContent(TypedDict):
     action: str
 
 
+def merge_meta(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reducer of state["meta"]: merge what one node recorded into the current meta.
+
+    Nodes return only their changes (see app.services.meta_delta): lists are
+    extended with the appended items, dicts updated with the changed entries
+    and other values replaced, so the records of parallel branches that run
+    in the same step all survive.
+    """
+    merged = dict(left or {})
+    for key, value in (right or {}).items():
+        current = merged.get(key)
+        if isinstance(value, list) and isinstance(current, list):
+            merged[key] = current + value
+        elif isinstance(value, dict) and isinstance(current, dict):
+            merged[key] = {**current, **value}
+        else:
+            merged[key] = value
+    return merged
+
+
 class State(TypedDict):
     """Main state dictionary for the pipeline."""
     jd_raw: str
+    jd_clean: Optional[str]  # jd_raw without markup and boilerplate (set by jd_cleaner)
     jd_summary: Optional[JDSummary]
-    bank: List[BankItem]
     profile: Dict[str, Any]
     plan: Optional[Dict[str, Any]]
     selected: Optional[SelectionResult]
@@ -61,7 +82,7 @@ class State(TypedDict):
     cl_bank: Dict[str, List[Dict[str, Any]]]  # Cover letter bank items
     artifacts: Dict[str, str]  # e.g., {"tex": "path/to/file.tex", "explain": "path/to/explain.json", "cover_letter": "path/to/cover_letter.tex"}
     config: Dict[str, Any]
-    meta: Dict[str, Any]  # e.g., retry_count, errors
+    meta: Annotated[Dict[str, Any], merge_meta]  # e.g., retry_count, errors
     ranked: Optional[Dict[str, SelectionResult]]
     assembled: Optional[Dict[str, List[str]]]
 
@@ -1,9 +1,22 @@
 """Rich logging setup."""
-from rich.console import Console
-from rich.logging import RichHandler
 import logging
 
 
+class _LazyRichHandler(logging.Handler):
+    """Forwards to a RichHandler created on the first record, so importing a module does not import rich."""
+
+    def __init__(self):
+        super().__init__()
+        self._handler = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._handler is None:
+            from rich.logging import RichHandler
+            self._handler = RichHandler(rich_tracebacks=True)
+            self._handler.setFormatter(self.formatter)
+        self._handler.emit(record)
+
+
 def setup_logger(name: str = "cv-agentic") -> logging.Logger:
     """
     Setup Rich logger.
@@ -18,9 +31,8 @@ def setup_logger(name: str = "cv-agentic") -> logging.Logger:
     logger.setLevel(logging.INFO)
     
     if not logger.handlers:
-        handler = RichHandler(rich_tracebacks=True)
+        handler = _LazyRichHandler()
         handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))
         logger.addHandler(handler)
     
     return logger
-
@@ -0,0 +1,198 @@
+"""Per-call LLM latency, token and cost metering."""
+import threading
+from typing import Dict, Any, List, Optional
+
+# Appends from concurrently running agents share one state["meta"] list
+_LOCK = threading.Lock()
+
+# Agents that only run for one document; calls of the others (jd_parser) are shared by both
+AGENT_BRANCHES = {
+    "ranker": "cv",
+    "critic": "cv",
+    "cover_letter_writer": "cover_letter",
+}
+
+
+def estimate_cost(
+    pricing: Dict[str, Dict[str, float]],
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    cached_tokens: int = 0,
+) -> float:
+    """
+    Estimate the USD cost of a call from the config price table.
+
+    Args:
+        pricing: config["pricing"], USD per 1M tokens keyed by model name
+        model: Model name as configured (longest matching prefix is used)
+        prompt_tokens: Prompt tokens, including cached ones
+        completion_tokens: Completion tokens
+        cached_tokens: Prompt tokens served from the provider prefix cache
+
+    Returns:
+        Estimated cost in USD (0.0 if the model is not in the table)
+    """
+    matches = [name for name in pricing if model.startswith(name)]
+    if not matches:
+        return 0.0
+    prices = pricing[max(matches, key=len)]
+    input_price = prices.get("input", 0.0)
+    cached_price = prices.get("cached_input", input_price)
+    uncached = prompt_tokens - cached_tokens
+    cost = (
+        uncached * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * prices.get("output", 0.0)
+    )
+    return cost / 1_000_000
+
+
+class UsageMeter:
+    """Records one entry per LLM call made on behalf of an agent."""
+
+    def __init__(
+        self,
+        calls: List[Dict[str, Any]],
+        agent: str,
+        pricing: Optional[Dict[str, Dict[str, float]]] = None,
+        section: Optional[str] = None,
+    ):
+        """
+        Args:
+            calls: List the records are appended to (usually state["meta"]["llm_calls"])
+            agent: Name of the calling agent, used as the per-node grouping key
+            pricing: config["pricing"] price table
+            section: Optional sub-label, e.g. the ranked section
+        """
+        self.calls = calls
+        self.agent = agent
+        self.pricing = pricing or {}
+        self.section = section
+
+    def record(
+        self,
+        model: str,
+        wall_s: float,
+        usage: Any = None,
+        cache_hit: bool = False,
+        price_factor: float = 1.0,
+        **extra: Any,
+    ) -> Dict[str, Any]:
+        """
+        Record a finished call.
+
+        Args:
+            model: Model name
+            wall_s: Wall time of the call in seconds
+            usage: The response `usage` object (None for cache hits)
+            cache_hit: True if served from the local response cache
+            price_factor: Multiplier on the estimated cost (e.g. 0.5 for Batch API calls)
+            **extra: Additional fields stored on the record
+
+        Returns:
+            The stored record
+        """
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", 0) or 0
+
+        record = {
+            "agent": self.agent,
+            "section": self.section,
+            "branch": AGENT_BRANCHES.get(self.agent),
+            "model": model,
+            "wall_s": round(wall_s, 4),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached_tokens,
+            "cost_usd": round(
+                price_factor * estimate_cost(self.pricing, model, prompt_tokens, completion_tokens, cached_tokens), 6
+            ),
+            "cache_hit": cache_hit,
+        }
+        record.update(extra)
+        with _LOCK:
+            self.calls.append(record)
+        return record
+
+
+def get_meter(state: Dict[str, Any], config: Dict[str, Any], agent: str, section: Optional[str] = None) -> UsageMeter:
+    """
+    Return a meter that records into state["meta"]["llm_calls"].
+
+    Args:
+        state: Pipeline state
+        config: Configuration (uses the "pricing" section)
+        agent: Name of the calling agent
+        section: Optional sub-label, e.g. the ranked section
+
+    Returns:
+        UsageMeter bound to the state
+    """
+    meta = state.setdefault("meta", {})
+    with _LOCK:
+        calls = meta.setdefault("llm_calls", [])
+    return UsageMeter(calls, agent, config.get("pricing"), section)
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "cache_hits": 0,
+        "wall_s": 0.0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cached_tokens": 0,
+        "cost_usd": 0.0,
+        "queue_wait_s": 0.0,
+        "retries": 0,
+    }
+
+
+def _add(totals: Dict[str, Any], record: Dict[str, Any]) -> None:
+    totals["calls"] += 1
+    totals["cache_hits"] += int(record.get("cache_hit", False))
+    for field in ("wall_s", "prompt_tokens", "completion_tokens", "cached_tokens", "cost_usd", "queue_wait_s", "retries"):
+        totals[field] += record.get(field, 0)
+
+
+def branch_calls(calls: List[Dict[str, Any]], branch: str) -> List[Dict[str, Any]]:
+    """
+    Call records made for one document: its own branch plus the shared calls.
+
+    Args:
+        calls: Records from state["meta"]["llm_calls"]
+        branch: "cv" or "cover_letter"
+
+    Returns:
+        The matching records, in call order
+    """
+    with _LOCK:
+        return [record for record in calls if record.get("branch") in (None, branch)]
+
+
+def summarize_usage(calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate call records per node (agent) and for the whole run.
+
+    Args:
+        calls: Records from state["meta"]["llm_calls"] (or branch_calls() of them)
+
+    Returns:
+        {"run": totals, "by_node": {agent: totals}}
+    """
+    run_totals = _empty_totals()
+    by_node: Dict[str, Dict[str, Any]] = {}
+    for record in calls:
+        _add(run_totals, record)
+        _add(by_node.setdefault(record["agent"], _empty_totals()), record)
+
+    for totals in [run_totals, *by_node.values()]:
+        totals["wall_s"] = round(totals["wall_s"], 4)
+        totals["queue_wait_s"] = round(totals["queue_wait_s"], 4)
+        totals["cost_usd"] = round(totals["cost_usd"], 6)
+        # share of the prompt tokens served from the provider prefix cache
+        totals["cached_share"] = round(totals["cached_tokens"] / totals["prompt_tokens"], 4) if totals["prompt_tokens"] else 0.0
+    return {"run": run_totals, "by_node": by_node}
@@ -0,0 +1,136 @@
+"""Import-time profile of the CLI startup and the pipelines, checked against budgets."""
+import importlib
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from infra.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+# Modules the nodes of each pipeline import when they first run (see app.services.agent_node)
+PIPELINE_MODULES = {
+    "cv": ["app.graph_cv", "agents.jd_cleaner", "agents.jd_parser", "agents.ranker", "agents.assembler", "agents.exporter"],
+    "cl": ["app.graph_cl", "agents.jd_cleaner", "agents.jd_parser", "agents.cover_letter_writer", "agents.cover_letter_exporter"],
+}
+
+# What each profiled target imports: the CLI alone, or the CLI plus one pipeline
+TARGETS = {
+    "cli": ["run"],
+    "cv": ["run", *PIPELINE_MODULES["cv"]],
+    "cl": ["run", *PIPELINE_MODULES["cl"]],
+}
+
+# Module prefixes a target must not load
+FORBIDDEN = {
+    "cli": [
+        "langgraph", "langchain_core", "openai", "httpx", "dotenv", "jinja2", "rich", "asyncio",
+        "agents.", "app.graph_", "app.batch", "app.stream",
+    ],
+    "cv": ["agents.cover_letter_", "app.graph_cl"],
+    "cl": [
+        "agents.ranker", "app.graph_cv", "utils.work_experience_ranker", "utils.edu_experience_ranker",
+        "utils.skill_experience_ranker", "utils.merged_ranker", "utils.local_ranker", "utils.shortlist",
+        "utils.bm25_index", "utils.tfidf_index",
+    ],
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def preload(*pipelines: str) -> None:
+    """Import the node modules of the given pipelines now instead of on the first run."""
+    for pipeline in pipelines:
+        for module in PIPELINE_MODULES[pipeline]:
+            importlib.import_module(module)
+
+
+def measure(target: str) -> Dict[str, Any]:
+    """
+    Import a target in a fresh interpreter under -X importtime.
+
+    Args:
+        target: Key of TARGETS
+
+    Returns:
+        Dict with total_ms (cumulative time of the target's modules) and
+        modules (name -> {"self_ms", "cumulative_ms", "parent"})
+    """
+    code = "; ".join(f"import {module}" for module in TARGETS[target])
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=Path(__file__).resolve().parents[1], capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing the {target} target failed:\n{result.stderr[-2000:]}")
+    modules: Dict[str, Dict[str, Any]] = {}
+    # a module's line follows those of the modules it imported, so walk backwards to know the parent
+    ancestors: List[str] = []
+    for line in reversed(result.stderr.splitlines()):
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            depth = (len(indent) - 1) // 2
+            del ancestors[depth:]
+            modules[name] = {
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "parent": ancestors[-1] if ancestors else None,
+            }
+            ancestors.append(name)
+    # interpreter startup (site and its .pth imports) is not ours to budget
+    total = sum(modules[name]["cumulative_ms"] for name in TARGETS[target] if name in modules)
+    return {"total_ms": round(total, 1), "modules": modules}
+
+
+def forbidden_imports(target: str, modules: Dict[str, Any]) -> List[str]:
+    """Modules loaded by a target although FORBIDDEN excludes them."""
+    prefixes = FORBIDDEN.get(target, ())
+    return sorted(name for name in modules if any(name == p.rstrip(".") or name.startswith(p) for p in prefixes))
+
+
+def profile_startup(config: Dict[str, Any], targets: Optional[List[str]] = None, top: int = 10) -> int:
+    """
+    Profile the import time of each target and check it against config["startup"].
+
+    Every target is imported `runs` times in a fresh interpreter and the
+    fastest run is kept. A target fails if it exceeds its budget_ms or loads
+    a module FORBIDDEN for it (e.g. ranker code on the cover letter path).
+
+    Args:
+        config: Configuration (uses the "startup" section)
+        targets: Keys of TARGETS to profile (default: all)
+        top: Number of slowest imports listed per target
+
+    Returns:
+        Process exit code: 0 if every target is within budget, 1 otherwise
+    """
+    startup_config = config.get("startup") or {}
+    budgets = startup_config.get("budget_ms") or {}
+    runs = max(startup_config.get("runs", 3), 1)
+    failed = False
+    for target in targets or list(TARGETS):
+        profile = min((measure(target) for _ in range(runs)), key=lambda p: p["total_ms"])
+        modules = profile["modules"]
+        budget = budgets.get(target)
+        # direct imports of the target's modules
+        slowest = sorted(
+            (name for name in modules if modules[name]["parent"] in TARGETS[target]),
+            key=lambda name: modules[name]["cumulative_ms"], reverse=True,
+        )[:top]
+        logger.info(
+            f"Startup [{target}]: {profile['total_ms']:.0f} ms importing {len(modules)} modules"
+            + (f" (budget {budget} ms)" if budget is not None else "")
+        )
+        for name in slowest:
+            logger.info(f"  {modules[name]['cumulative_ms']:8.1f} ms  {name}")
+
+        if budget is not None and profile["total_ms"] > budget:
+            logger.error(f"Startup [{target}] exceeds its budget: {profile['total_ms']:.0f} ms > {budget} ms")
+            failed = True
+        leaked = forbidden_imports(target, modules)
+        if leaked:
+            logger.error(f"Startup [{target}] imports modules it must not load: {', '.join(leaked)}")
+            failed = True
+    return 1 if failed else 0
@@ -1,19 +1,229 @@
 """Main entry point for CV tailoring pipeline."""
 import sys
 import argparse
+from typing import Optional
 from infra.config import load_config
 from infra.logging import setup_logger
-from adapters.storage_yaml import load_profile, load_bank, load_jd, load_cl_bank
+from adapters.storage_yaml import load_profile, load_jd, load_cl_bank, iter_jd_dir, iter_jd_jsonl
+from adapters.llm_cache import get_response_cache
 from domain.state import State
-from app.graph_cv import create_cv_graph
-from app.graph_cl import create_cover_letter_graph
+from app.services import new_run_id, run_options, tracked_run
+import copy
 import yaml
 from pathlib import Path
-from datetime import datetime
 
 logger = setup_logger(__name__)
 
 
+def iter_jds(args):
+    """(JD id, JD text) pairs from --jd-jsonl or --jd-dir, read lazily."""
+    if args.jd_jsonl:
+        return iter_jd_jsonl(args.jd_jsonl)
+    return iter_jd_dir(args.jd_dir)
+
+
+def create_graph(name: str, config: dict):
+    """Compile the graph with the given name ("cv", "cover_letter" or "combined")."""
+    if name == "combined":
+        from app.graph_combined import create_combined_graph
+        return create_combined_graph(config)
+    if name == "cover_letter":
+        from app.graph_cl import create_cover_letter_graph
+        return create_cover_letter_graph(config)
+    from app.graph_cv import create_cv_graph
+    return create_cv_graph(config)
+
+
+def invoke_graph(graph, state: Optional[State], run_id: str, use_async: bool = False) -> State:
+    """
+    Run a compiled graph, either synchronously or via ainvoke on an event loop.
+
+    With a checkpointer the run is checkpointed under run_id, and a state of
+    None continues the run from its last completed node.
+    """
+    options = run_options(graph, run_id)
+    try:
+        with tracked_run(graph, run_id):
+            if use_async:
+                import asyncio
+                return asyncio.run(graph.ainvoke(state, **options))
+            return graph.invoke(state, **options)
+    except BaseException:
+        if graph.checkpointer is not None:
+            logger.error(f"Run {run_id} did not finish; continue it from its last completed node with --resume {run_id}")
+        raise
+
+
+def initial_state(jd_raw: str, profile: dict, cl_bank: dict, config: dict) -> State:
+    """Build the initial pipeline state for one JD."""
+    return {
+        "jd_raw": jd_raw,
+        "jd_clean": None, # will be populated by the jd_cleaner agent
+        "jd_summary": None, # will be populated by the jd_parser agent
+        "profile": profile,
+        "plan": None,
+        "selected": None,
+        "assembled": None,
+        "critic_result": None,
+        "latex_ctx": None,
+        "cover_letter_content": None,
+        "cl_bank": cl_bank,
+        "artifacts": {},
+        "config": config,
+        "meta": {"retry_count": 0, "errors": []},
+    }
+
+
+def save_state(final_state: State, out_dir: Path) -> None:
+    """Write the final state to out_dir/final_state.yaml."""
+    with open(out_dir / "final_state.yaml", "w") as f:
+        yaml.dump(final_state, f)
+    logger.info(f"Saved state to: {out_dir / 'final_state.yaml'}")
+
+
+def run_batch(args, config: dict, out_dir: Path, generate_cv: bool, generate_cover_letter: bool,
+              profile: dict, cl_bank: dict) -> None:
+    """Run all JDs through the batch pipeline, writing each JD's outputs to out_dir/<jd name>/."""
+    paths = config.get("paths")
+    if args.jd_jsonl or args.jd_dir:
+        jds = iter_jds(args)
+    else:
+        jds = [(Path(paths.get("jd")).stem, load_jd(paths.get("jd")))]
+
+    # a batch job spans all JDs, so every state is held at once
+    states = {}
+    for jd_name, jd_raw in jds:
+        if jd_name in states:
+            raise ValueError(f"Duplicate JD id in batch mode: {jd_name}")
+        jd_config = copy.deepcopy(config)
+        jd_config["paths"]["out_dir"] = out_dir / jd_name
+        jd_config["paths"]["out_dir"].mkdir(parents=True, exist_ok=True)
+        states[jd_name] = initial_state(jd_raw, profile, cl_bank, jd_config)
+    logger.info(f"Batch mode: {len(states)} JDs")
+
+    from app.batch import run_batch_pipeline
+    final_states = run_batch_pipeline(states, config, generate_cv, generate_cover_letter)
+    for name, final_state in final_states.items():
+        save_state(final_state, final_state["config"]["paths"]["out_dir"])
+
+
+def run_stream(args, config: dict, out_dir: Path, generate_cv: bool, generate_cover_letter: bool,
+               profile: dict, cl_bank: dict) -> None:
+    """Stream the JDs of --jd-jsonl / --jd-dir through the graphs, a bounded number at a time."""
+    # asyncio is only loaded by the modes that need it (startup budget)
+    import asyncio
+    from app.stream import arun_stream
+
+    stream_config = config.get("stream") or {}
+    concurrency = args.concurrency or stream_config.get("concurrency", 8)
+    results_path = out_dir / stream_config.get("results_file", "results.jsonl")
+
+    # compiled once and shared by every JD
+    if generate_cv and generate_cover_letter:
+        graphs = [create_graph("combined", config)]
+    elif generate_cover_letter:
+        graphs = [create_graph("cover_letter", config)]
+    else:
+        graphs = [create_graph("cv", config)]
+
+    def make_state(jd_raw: str, jd_out_dir: Path) -> State:
+        # only paths differs per JD, the rest of the config is shared
+        jd_config = {**config, "paths": {**config["paths"], "out_dir": jd_out_dir}}
+        return initial_state(jd_raw, profile, cl_bank, jd_config)
+
+    logger.info(f"Streaming JDs with {concurrency} pipelines in flight, results in {results_path}")
+    counts = asyncio.run(arun_stream(
+        iter_jds(args), make_state, graphs, out_dir, results_path, concurrency,
+        finish=lambda final_state: save_state(final_state, final_state["config"]["paths"]["out_dir"]),
+    ))
+    logger.info(f"Stream finished: {counts.get('ok', 0)} succeeded, {counts.get('error', 0)} failed")
+
+
+def run_single(args, config: dict, out_dir: Path, generate_cv: bool, generate_cover_letter: bool,
+               state: State) -> None:
+    """Run the selected graphs for a single JD."""
+    final_state = None
+
+    if generate_cv and generate_cover_letter:
+        # Compile and run the combined graph: one JD parse, then both branches in parallel
+        logger.info("Compiling combined resume and cover letter graph...")
+        graph = create_graph("combined", config)
+
+        logger.info("Running resume and cover letter pipelines...")
+        final_state = invoke_graph(graph, state, out_dir.name, args.use_async)
+
+        logger.info(f"Exported resume to: {out_dir / 'resume.tex'}")
+        logger.info(f"Exported cover letter to: {out_dir / 'cover_letter.tex'}")
+
+    elif generate_cover_letter:
+        logger.info("Generating cover letter...")
+
+        # Compile and run cover letter graph
+        logger.info("Compiling cover letter graph...")
+        graph = create_graph("cover_letter", config)
+
+        logger.info("Running cover letter pipeline...")
+        final_state = invoke_graph(graph, state, out_dir.name, args.use_async)
+        logger.info(f"Exported cover letter to: {out_dir / 'cover_letter.tex'}")
+
+    elif generate_cv:
+        # Compile and run resume graph
+        logger.info("Compiling resume graph...")
+        graph = create_graph("cv", config)
+
+        logger.info("Running resume pipeline...")
+        final_state = invoke_graph(graph, state, out_dir.name, args.use_async)
+
+        logger.info(f"Exported resume to: {out_dir / 'resume.tex'}")
+
+    # save the final_state to a yaml file
+    if final_state:
+        save_state(final_state, out_dir)
+    else:
+        logger.error("No output generated. final_state is None.")
+
+
+def resume_run(args, config: dict) -> None:
+    """Continue a failed or interrupted run from its last completed node."""
+    from adapters.checkpoint_store import get_checkpointer
+
+    checkpointer = get_checkpointer(config)
+    if checkpointer is None:
+        sys.exit("Checkpointing is disabled (checkpoint.enabled in config.yaml); there is nothing to resume")
+    run = checkpointer.get_run(args.resume)
+    if run is None:
+        sys.exit(f"No incomplete run {args.resume} (it finished, or never checkpointed); see --list-runs")
+    if run["status"] == "done":
+        sys.exit(f"Run {args.resume} has already finished")
+
+    graph = create_graph(run["graph"], config)
+    snapshot = graph.get_state(run_options(graph, args.resume)["config"])
+    if not snapshot.next:
+        sys.exit(f"Run {args.resume} has no nodes left to run")
+    # the checkpointed state carries the run's own config (output directory, tailoring type, ...)
+    logger.info(f"Resuming run {args.resume} ({run['graph']} graph) at {', '.join(snapshot.next)}")
+    final_state = invoke_graph(graph, None, args.resume, args.use_async)
+    save_state(final_state, Path(final_state["config"]["paths"]["out_dir"]))
+
+
+def list_runs(config: dict) -> None:
+    """Print the runs that can be resumed."""
+    from datetime import datetime
+    from adapters.checkpoint_store import get_checkpointer
+
+    checkpointer = get_checkpointer(config)
+    runs = checkpointer.incomplete_runs() if checkpointer is not None else []
+    if not runs:
+        print("No incomplete runs.")
+        return
+    for run in runs:
+        updated = datetime.fromtimestamp(run["updated"]).strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{run['run_id']}  {run['graph']}  {run['status']}  {updated}  completed: {', '.join(run['completed']) or '-'}")
+        if run["error"]:
+            print(f"    {run['error'][:200]}")
+    print("\nContinue one with: run.py --resume RUN_ID")
+
+
 def main():
     """Main entry point."""
     # Parse command line arguments
@@ -24,14 +234,56 @@ def main():
                        help="Generate resume instead of cover letter")
     parser.add_argument("-t", "--type", choices=["tech", "business"], default="tech",
                        help="Type of tailoring: 'tech' or 'business' (default: 'tech')")
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument("--no-cache", action="store_true",
+                       help="Bypass the LLM response cache, stage memoization and near-duplicate JD reuse entirely")
+    cache_group.add_argument("--refresh-cache", action="store_true",
+                       help="Ignore cached LLM responses, memoized stages and stored JD summaries but store the fresh ones")
+    parser.add_argument("--llm-backend", choices=["live", "record", "replay"],
+                       help="Override llm.backend: call the API, record calls to a cassette, or replay a cassette offline")
+    parser.add_argument("--cassette",
+                       help="Override llm.cassette (path of the record/replay JSONL file)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                       help="Run the pipeline with graph.ainvoke on an asyncio event loop")
+    parser.add_argument("--batch", action="store_true",
+                       help="Collect each stage's LLM requests across JDs into one batch job (see the batch config section)")
+    jd_source = parser.add_mutually_exclusive_group()
+    jd_source.add_argument("--jd-dir",
+                       help="Directory of JD *.txt files to stream through the pipeline (or to process in --batch mode)")
+    jd_source.add_argument("--jd-jsonl",
+                       help="JSONL file of JDs ({\"id\": ..., \"text\": ...} per line) to stream through the pipeline (or to process in --batch mode)")
+    parser.add_argument("--concurrency", type=int,
+                       help="JD pipelines in flight when streaming --jd-dir / --jd-jsonl (default: stream.concurrency)")
+    parser.add_argument("--profile-startup", action="store_true",
+                       help="Profile the import time of the CLI and of each pipeline against startup.budget_ms and exit (non-zero when over budget)")
+    run_group = parser.add_mutually_exclusive_group()
+    run_group.add_argument("--resume", metavar="RUN_ID",
+                       help="Continue a failed or interrupted run from its last completed node (see the checkpoint config section)")
+    run_group.add_argument("--list-runs", action="store_true",
+                       help="List the failed or interrupted runs that --resume can continue")
     args = parser.parse_args()
 
+    if args.profile_startup:
+        from infra.startup import profile_startup
+        sys.exit(profile_startup(load_config("config.yaml")))
+    if args.list_runs:
+        list_runs(load_config("config.yaml"))
+        return
+    if args.resume:
+        resume_run(args, load_config("config.yaml"))
+        return
+
     generate_cv = args.generate_cv
     generate_cover_letter = args.cover_letter
     tailoring_type = args.type  # either 'tech' or 'business'
 
+    if args.concurrency is not None and args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
     # If neither option is specified, ask the user
     if not generate_cv and not generate_cover_letter:
+        if not sys.stdin.isatty():
+            parser.error("pass -cv and/or -cl when not running interactively")
         print("\nWhat would you like to generate?")
         print("1. CV (Resume)")
         print("2. Cover Letter")
@@ -48,9 +300,20 @@ def main():
     # Load configuration
     config = load_config("config.yaml")
     config["tailoring_type"] = tailoring_type  # Add selected type to config
+    # response cache, stage memoization and near-duplicate JD reuse
+    for store in ("cache", "memo", "jd_dedup"):
+        store_config = config.setdefault(store, {})
+        if args.no_cache:
+            store_config["enabled"] = False
+        store_config["refresh"] = args.refresh_cache
+    llm_config = config.setdefault("llm", {})
+    if args.llm_backend:
+        llm_config["backend"] = args.llm_backend
+    if args.cassette:
+        llm_config["cassette"] = args.cassette
 
     # for each unique run, create a new out directory under the out directory
-    out_dir = Path(config.get("paths").get("out_dir")) / str(datetime.now().strftime("%Y%m%d_%H%M%S"))
+    out_dir = Path(config.get("paths").get("out_dir")) / new_run_id()
     out_dir.mkdir(parents=True, exist_ok=True)
     config.get("paths")["out_dir"] = out_dir
 
@@ -58,61 +321,32 @@ def main():
     
     # Load data
     paths = config.get("paths")
-    jd_raw = load_jd(paths.get("jd"))
     profile = load_profile(paths.get("profile"))
-    bank = load_bank(paths.get("bank_dir"))
 
     # Load cover letter bank
     cl_bank = load_cl_bank(paths.get("cl_bank_dir"))
 
-    # Initialize state
-    state: State = {
-        "jd_raw": jd_raw,
-        "jd_summary": None, # will be populated by the jd_parser agent
-        "bank": bank,
-        "profile": profile,
-        "plan": None,
-        "selected": None,
-        "assembled": None,
-        "critic_result": None,
-        "latex_ctx": None,
-        "cover_letter_content": None,
-        "cl_bank": cl_bank,
-        "artifacts": {},
-        "config": config,
-        "meta": {"retry_count": 0, "errors": []},
-    }
-
-    final_state = None
-
-    if generate_cover_letter:
-        logger.info("Generating cover letter...")
-
-        # Compile and run cover letter graph
-        logger.info("Compiling cover letter graph...")
-        graph = create_cover_letter_graph(config)
-
-        logger.info("Running cover letter pipeline...")
-        final_state = graph.invoke(state)
-        logger.info(f"Exported cover letter to: {out_dir / 'cover_letter.tex'}")
-
-    if generate_cv:
-        # Compile and run resume graph
-        logger.info("Compiling resume graph...")
-        graph = create_cv_graph(config)
-
-        logger.info("Running resume pipeline...")
-        final_state = graph.invoke(state)
+    if args.batch:
+        run_batch(args, config, out_dir, generate_cv, generate_cover_letter, profile, cl_bank)
+    elif args.jd_dir or args.jd_jsonl:
+        run_stream(args, config, out_dir, generate_cv, generate_cover_letter, profile, cl_bank)
+    else:
+        jd_raw = load_jd(paths.get("jd"))
+        run_single(args, config, out_dir, generate_cv, generate_cover_letter,
+                   initial_state(jd_raw, profile, cl_bank, config))
 
-        logger.info(f"Exported resume to: {out_dir / 'resume.tex'}")
+    cache = get_response_cache(config)
+    if cache is not None:
+        stats = cache.stats()
+        logger.info(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries")
 
-    # save the final_state to a yaml file
-    if final_state:
-        with open(out_dir / "final_state.yaml", "w") as f:
-            yaml.dump(final_state, f)
-        logger.info(f"Saved state to: {out_dir / 'final_state.yaml'}")
-    else:
-        logger.error("No output generated. final_state is None.")
+    # imported here: the scheduler pulls in asyncio, which --help and --list-runs do not need
+    from adapters.llm_scheduler import scheduler_stats
+    for model, stats in scheduler_stats().items():
+        logger.info(
+            f"LLM scheduler [{model}]: {stats['waits']} throttled requests, "
+            f"{stats['total_wait_s']}s queue wait (max {stats['max_wait_s']}s), {stats['retries']} retries"
+        )
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,86 @@
+"""Service entry point: a warm process running JD jobs submitted over HTTP or a Unix socket."""
+import argparse
+import signal
+import threading
+from pathlib import Path
+from infra.config import load_config
+from infra.logging import setup_logger
+from adapters.storage_yaml import load_profile, load_cl_bank, get_bank_store
+from app.graph_cv import create_cv_graph
+from app.graph_cl import create_cover_letter_graph
+from app.graph_combined import create_combined_graph
+from app.jobs import Job, JobQueue
+from app.server import create_server
+from domain.state import State
+from infra.startup import preload
+from run import initial_state, save_state
+
+logger = setup_logger(__name__)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="CV Tailoring Service")
+    parser.add_argument("--host", help="Interface to listen on (default: serve.host)")
+    parser.add_argument("--port", type=int, help="Port to listen on (default: serve.port)")
+    parser.add_argument("--socket", help="Listen on this Unix socket instead of host/port (default: serve.socket)")
+    parser.add_argument("--workers", type=int, help="JDs processed concurrently (default: serve.workers)")
+    parser.add_argument("-t", "--type", choices=["tech", "business"], default="tech",
+                       help="Tailoring type of jobs that do not set one (default: 'tech')")
+    args = parser.parse_args()
+
+    config = load_config("config.yaml")
+    config["tailoring_type"] = args.type
+    serve_config = config.get("serve") or {}
+    workers = args.workers or serve_config.get("workers", 4)
+    if workers < 1:
+        parser.error("--workers must be at least 1")
+
+    # everything a job needs is loaded and compiled once
+    paths = config.get("paths")
+    profile = load_profile(paths.get("profile"))
+    cl_bank = load_cl_bank(paths.get("cl_bank_dir"))
+    get_bank_store(config)
+    graphs = {
+        (True, False): create_cv_graph(config),
+        (False, True): create_cover_letter_graph(config),
+        (True, True): create_combined_graph(config),
+    }
+    # nodes import their agents on first run; a warm process pays that before the first job
+    preload("cv", "cl")
+
+    def make_state(job: Job) -> State:
+        # only the tailoring type and the output directory differ per job
+        jd_config = {
+            **config,
+            "tailoring_type": job.options["tailoring_type"],
+            "paths": {**paths, "out_dir": job.out_dir},
+        }
+        return initial_state(job.jd_raw, profile, cl_bank, jd_config)
+
+    queue = JobQueue(
+        graphs, make_state, save_state, Path(paths.get("out_dir")),
+        workers=workers, max_jobs=serve_config.get("max_jobs", 1000),
+    )
+    socket_path = args.socket or serve_config.get("socket")
+    host = args.host or serve_config.get("host", "127.0.0.1")
+    port = args.port or serve_config.get("port", 8765)
+    server = create_server(
+        queue, host, port, socket_path,
+        default_type=args.type, max_body_bytes=serve_config.get("max_body_kb", 512) * 1024,
+    )
+    # SIGTERM (e.g. from a service manager) shuts down like Ctrl-C; shutdown() must not run on the serving thread
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    logger.info(f"Serving on {socket_path or f'http://{host}:{port}'} with {workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info("Shutting down, waiting for running jobs...")
+        server.server_close()
+        queue.shutdown()
+
+
+if __name__ == "__main__":
+    main()
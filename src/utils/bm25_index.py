@@ -0,0 +1,113 @@
+"""BM25 inverted index over bank items, used to shortlist ranking candidates."""
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_TOKEN = re.compile(r"[\w+#]+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our the this to we with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords (keeps e.g. c++, c#)."""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def item_text(item: Dict[str, Any]) -> str:
+    """Indexed text of a bank item: its text plus its tags."""
+    tags = item.get("tags") or []
+    return " ".join([str(item.get("text", "")), *map(str, tags)])
+
+
+def jd_query(jd_summary: Dict[str, Any]) -> List[str]:
+    """Query tokens from the JD skills, must-haves and responsibilities."""
+    parts: List[str] = []
+    for key in ("skills", "must_haves", "responsibilities"):
+        parts.extend(jd_summary.get(key) or [])
+    return tokenize(" ".join(parts))
+
+
+class BM25Index:
+    """Okapi BM25 over a list of documents, with postings per term."""
+
+    def __init__(self, documents: Iterable[str], k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            documents: Document texts; results refer to their positions
+            k1: Term frequency saturation
+            b: Length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_id, text in enumerate(documents):
+            counts = Counter(tokenize(text))
+            self.lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((doc_id, tf))
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self) - df + 0.5) / (df + 0.5))
+
+    def scores(self, query: Iterable[str]) -> List[float]:
+        """BM25 score of every document for the query tokens."""
+        scores = [0.0] * len(self)
+        for term, qtf in Counter(query).items():
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / (self.avg_length or 1))
+                scores[doc_id] += qtf * idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def top_k(self, query: Iterable[str], k: int) -> List[Tuple[int, float]]:
+        """(document position, score) of the k best documents, best first (ties keep document order)."""
+        scores = self.scores(query)
+        ranked = sorted(range(len(scores)), key=lambda doc_id: (-scores[doc_id], doc_id))
+        return [(doc_id, scores[doc_id]) for doc_id in ranked[:k]]
+
+
+def shortlist(
+    items: List[Dict[str, Any]],
+    jd_summary: Dict[str, Any],
+    k: Optional[int],
+    pinned: int = 0,
+    relevance: Optional[Dict[str, float]] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+    """
+    Keep the k bank items most relevant to the JD, in bank order.
+
+    Args:
+        items: Bank items (BankItem shape: id, text, tags)
+        jd_summary: Parsed JD summary used as the query
+        k: Number of items to keep; None, 0 or k >= len(items) keeps all
+        pinned: Number of leading items that are always kept (e.g. the company description)
+        relevance: Precomputed score per item id (e.g. TF-IDF) used instead of BM25
+
+    Returns:
+        Tuple of (kept items, score per kept item id)
+    """
+    if not k or k >= len(items):
+        return items, {}
+
+    candidates = items[pinned:]
+    if relevance is None:
+        scores = BM25Index(item_text(item) for item in candidates).scores(jd_query(jd_summary))
+    else:
+        scores = [relevance.get(str(item.get("id")), 0.0) for item in candidates]
+    ranked = sorted(range(len(candidates)), key=lambda doc_id: (-scores[doc_id], doc_id))
+    best = [(doc_id, scores[doc_id]) for doc_id in ranked[:max(k - pinned, 0)]]
+    kept = set(range(pinned)) | {pinned + doc_id for doc_id, _ in best}
+    scores = {str(items[pinned + doc_id].get("id")): round(score, 4) for doc_id, score in best}
+    return [item for position, item in enumerate(items) if position in kept], scores
+
@@ -0,0 +1,201 @@
+"""Rule-based JD cleaning: HTML, job board chrome, boilerplate sections and repeated lines."""
+import html
+import re
+import unicodedata
+from html.parser import HTMLParser
+from typing import Callable, Iterable, List, Optional, Tuple
+from utils.jd_extractor import mentions_contact
+
+_HTML = re.compile(r"<\s*/?\s*(?:p|div|br|li|ul|ol|span|h[1-6]|strong|b|em|a|table|tr|td|section|html|body)\b[^>]*>", re.IGNORECASE)
+# tags whose content is never visible text, and tags that end a line
+_SKIPPED_TAGS = {"script", "style", "noscript", "head", "template", "svg"}
+_BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+    "tr", "table", "section", "article", "header", "footer", "hr",
+}
+_INVISIBLE = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff\u00ad"))
+
+# job board UI text copied along with the posting (matched against the whole line)
+_CHROME = re.compile(
+    r"(?:share|show (?:more|less)(?: options)?|see (?:more|less)|easy apply|apply(?: now)?|save|saved|message|follow(?:ing)?"
+    r"|1st|2nd|3rd|.+ logo|promoted(?: by hirer)?.*|actively reviewing applicants|(?:over )?\d+ applicants"
+    r"|matches your job preferences.*|your ai-powered job assessment|am i a good match\??|tailor my resume"
+    r"|how can i best position myself\??|job poster · .*|\d+ mutual connections?|[\d,.]+k? followers"
+    r"|see who .* hired.*|people you can reach out to|\d+ (?:school )?alumni work here|(?:try|retry) premium.*"
+    r"|(?:get|set) job alerts?.*|similar jobs|jobs similar to .*|report this job|back to search"
+    r"|skip to (?:main )?content|sign in|log in|join now|apply on company website)",
+    re.IGNORECASE,
+)
+# boilerplate sentences (matched anywhere in the line)
+_BOILERPLATE = re.compile(
+    r"\bcookies?\b.*\b(?:use|accept|consent|settings|preferences)\b|\b(?:accept|reject|manage) (?:all )?cookies\b"
+    r"|\bequal (?:employment )?opportunit(?:y|ies) employer\b"
+    r"|\b(?:regardless of|without regard to) (?:race|colou?r|religion|gender|sex|age|national origin|sexual orientation|disability)"
+    r"|\baccommodations? (?:during|in|throughout) the (?:application|recruitment|hiring) process"
+    r"|\bprivacy (?:policy|notice|statement)\b|\bunsolicited (?:applications|cvs|resumes)\b"
+    r"|\bby (?:applying|submitting)\b.*\b(?:consent|agree)\b"
+    r"|\bfollow us on\b|\bshare (?:this|the) job\b",
+    re.IGNORECASE,
+)
+# headings of sections whose block is dropped (matched against the whole heading)
+_DROP_HEADINGS = re.compile(
+    r"(?:(?:our )?benefits(?: (?:and|&) perks)?|perks(?: (?:and|&) benefits)?|what we (?:can )?offer(?: you)?|our offer"
+    r"|we offer|why join(?: us)?|why (?:work|join) (?:with|at) us|what's in it for you|wir bieten(?: dir| ihnen)?"
+    r"|das bieten wir(?: dir| ihnen)?|unser angebot|equal (?:employment )?opportunit(?:y|ies)(?: employer)?"
+    r"|diversity(?:,)? (?:equity )?(?:and|&) inclusion|eeo statement|privacy(?: notice| policy)?|data protection|datenschutz)",
+    re.IGNORECASE,
+)
+_SECTION_HEADINGS = re.compile(
+    r"(?:about (?:the )?(?:job|role|position|company|us|you)|(?:the |your )?role|your (?:tasks|responsibilities|mission|impact)"
+    r"|(?:key )?responsibilities|what you(?:'ll| will) (?:do|bring)|what we(?:'re| are) looking for|who you are"
+    r"|(?:your )?profile|requirements|(?:minimum |preferred |basic )?qualifications|must[- ]haves?|nice[- ]to[- ]haves?"
+    r"|skills|(?:the |our )?team|contact|how to apply|application|meet the hiring team"
+    r"|(?:deine|ihre) aufgaben|(?:dein|ihr) profil|anforderungen|kontakt)",
+    re.IGNORECASE,
+)
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the visible text of an HTML document, one line per block element."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS:
+            self._skipping = max(self._skipping - 1, 0)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def html_to_text(text: str) -> str:
+    """Visible text of pasted HTML (scripts and styles dropped, block elements on their own lines)."""
+    parser = _TextExtractor()
+    parser.feed(text)
+    parser.close()
+    # adjacent block boundaries (</li><li>) end a single line
+    return re.sub(r"\n\s*\n+", "\n", "".join(parser.parts))
+
+
+def looks_like_html(text: str) -> bool:
+    """Whether the text contains HTML markup."""
+    return bool(_HTML.search(text))
+
+
+def normalize_text(text: str) -> str:
+    """
+    Strip HTML (if any) and normalize whitespace.
+
+    Args:
+        text: Raw JD text
+
+    Returns:
+        Text with single spaces within lines and at most one blank line between paragraphs
+    """
+    if looks_like_html(text):
+        text = html_to_text(text)
+    else:
+        text = html.unescape(text)
+    text = unicodedata.normalize("NFKC", text).translate(_INVISIBLE)
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def line_key(line: str) -> str:
+    """Comparison key of a line: lowercase, single spaces, straight apostrophes."""
+    return " ".join(line.lower().replace("’", "'").split())
+
+
+def _heading(line: str) -> Optional[str]:
+    """Heading key of a short line, or None if the line is too long to be a heading."""
+    key = line_key(line).rstrip(":").strip()
+    return key if key and len(key.split()) <= 8 else None
+
+
+def _is_heading(line: str, heading: Optional[str]) -> bool:
+    """Whether a line is a heading: a known section heading or a short line ending with a colon."""
+    return heading is not None and (line.rstrip().endswith(":") or bool(_SECTION_HEADINGS.fullmatch(heading)))
+
+
+def clean_lines(
+    text: str,
+    extra_patterns: Iterable[str] = (),
+    is_boilerplate: Optional[Callable[[str], bool]] = None,
+) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Split normalized JD text into lines and drop the ones that carry no JD content.
+
+    Dropped are job board chrome, boilerplate sentences (plus extra_patterns),
+    the block under a benefits/EEO/privacy heading (up to the next heading or
+    paragraph break), lines is_boilerplate() accepts (e.g. learned from other
+    postings) and repeats of earlier lines. Lines naming a contact person or
+    postal address are always kept.
+
+    Args:
+        text: Text from normalize_text()
+        extra_patterns: Additional regexes; a line matching one is dropped
+        is_boilerplate: Optional predicate on line_key() of a line
+
+    Returns:
+        Tuple of (kept lines including blank separators, removed (reason, line) pairs)
+    """
+    extra = [re.compile(pattern, re.IGNORECASE) for pattern in extra_patterns]
+    kept: List[str] = []
+    removed: List[Tuple[str, str]] = []
+    seen = set()
+    dropping = False
+    # lines dropped since the drop heading; a blank line right below the heading does not end the block
+    dropped_in_block = 0
+    for line in text.split("\n"):
+        if not line:
+            if dropped_in_block:
+                dropping = False
+            kept.append(line)
+            continue
+        key = line_key(line)
+        heading = _heading(line)
+        if heading is not None and _DROP_HEADINGS.fullmatch(heading):
+            dropping = True
+            dropped_in_block = 0
+            reason = "section"
+        elif _is_heading(line, heading):
+            dropping = False
+            reason = None
+        elif mentions_contact(line):
+            reason = None
+        elif dropping:
+            dropped_in_block += 1
+            reason = "section"
+        elif _CHROME.fullmatch(key):
+            reason = "chrome"
+        elif _BOILERPLATE.search(line) or any(pattern.search(line) for pattern in extra):
+            reason = "boilerplate"
+        elif is_boilerplate is not None and is_boilerplate(key):
+            reason = "learned"
+        else:
+            reason = None
+        if reason is None and key in seen:
+            reason = "duplicate"
+        if reason is not None:
+            removed.append((reason, line))
+            continue
+        seen.add(key)
+        kept.append(line)
+    return kept, removed
+
+
+def join_lines(lines: List[str]) -> str:
+    """Join kept lines, collapsing the blank lines left around dropped ones."""
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
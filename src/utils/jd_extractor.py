@@ -0,0 +1,128 @@
+"""Rule-based extraction of JD metadata (company, address, zip, city, hr) before the LLM parse."""
+import re
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+# canonical city -> spellings found in postings
+CITIES: Dict[str, Tuple[str, ...]] = {
+    "Zurich": ("zurich", "zürich", "zuerich"),
+    "Geneva": ("geneva", "genève", "geneve", "genf"),
+    "Basel": ("basel", "bâle"),
+    "Bern": ("bern", "berne"),
+    "Lausanne": ("lausanne",),
+    "Lucerne": ("lucerne", "luzern"),
+    "St. Gallen": ("st. gallen", "st gallen", "sankt gallen"),
+    "Winterthur": ("winterthur",),
+    "Lugano": ("lugano",),
+    "Zug": ("zug",),
+    "Baar": ("baar",),
+    "Aarau": ("aarau",),
+    "Schaffhausen": ("schaffhausen",),
+    "Berlin": ("berlin",),
+    "Munich": ("munich", "münchen", "muenchen"),
+    "Hamburg": ("hamburg",),
+    "Frankfurt": ("frankfurt am main", "frankfurt"),
+    "Vienna": ("vienna", "wien"),
+}
+_CITY_BY_SPELLING = {spelling: city for city, spellings in CITIES.items() for spelling in spellings}
+
+# female / male titles -> the salutation used in the cover letter
+_TITLES = {
+    "ms": "Ms.", "mrs": "Ms.", "miss": "Ms.", "frau": "Ms.", "madame": "Ms.", "mme": "Ms.",
+    "mr": "Mr.", "herr": "Mr.", "monsieur": "Mr.",
+}
+
+_NAME = r"[A-ZÄÖÜ][\wäöüéèà'\-]+"
+_HR = re.compile(
+    rf"\b(?P<title>Mrs?|Ms|Miss|Herr|Frau|Madame|Mme|Monsieur)\.?\s+(?:(?:Dr|Prof)\.\s+)?"
+    rf"(?P<first>{_NAME})(?:\s+(?P<last>{_NAME}))?"
+)
+# known spellings, longest first so "frankfurt am main" wins over "frankfurt"
+_KNOWN_CITY = "|".join(re.escape(spelling) for spelling in sorted(_CITY_BY_SPELLING, key=len, reverse=True))
+_STREET = re.compile(
+    r"(?P<street>[A-ZÄÖÜ][\wäöüßéèà'\.\- ]{1,40}?"
+    r"(?i:strasse|straße|str\.|gasse|weg|platz|allee|ring|quai|rain|graben|street|road|avenue)"
+    r"\s+\d{1,4}[a-zA-Z]?)"
+    r"\s*[,\n]\s*(?:CH-|D-|A-)?(?P<zip>\d{4,5})\s+"
+    # a known (possibly multi-word) city, else one word of letters and hyphens, never trailing punctuation
+    rf"(?P<city>(?i:{_KNOWN_CITY})(?!\w)|[A-ZÄÖÜ][^\W\d_]+(?:-[^\W\d_]+)*)"
+)
+_CITY = re.compile(
+    rf"\b(?:(?:CH-|D-|A-)?(?P<zip>\d{{4,5}})\s+)?(?P<city>{_KNOWN_CITY})\b",
+    re.IGNORECASE,
+)
+_COMPANY_PATTERNS = (
+    # job board headers: "Save GenAI Engineer at DeepRec.ai", "DeepRec.ai · Zurich, Switzerland (On-site)"
+    re.compile(r"^Save .+? at (?P<company>[^\n]{2,60}?)\s*$", re.MULTILINE),
+    re.compile(r"^(?P<company>[^\n·]{2,60}?) · [^\n]*\((?:On-site|Hybrid|Remote)\)\s*$", re.MULTILINE),
+    # registered names: "Example Systems AG", "Foo GmbH"
+    re.compile(
+        r"\b(?P<company>[A-Z][\w&\.\-]*(?: [A-Z][\w&\.\-]*){0,3} "
+        r"(?:AG|GmbH|SA|S\.A\.|SE|Sàrl|Ltd\.?|Inc\.?|LLC|plc))(?![\w])"
+    ),
+)
+
+
+def _canonical_city(text: str) -> str:
+    return _CITY_BY_SPELLING.get(text.lower(), text)
+
+
+def extract_company(jd_raw: str) -> Optional[str]:
+    """Company from job board headers or the most frequent registered company name."""
+    for pattern in _COMPANY_PATTERNS:
+        names = Counter(match.group("company").strip() for match in pattern.finditer(jd_raw))
+        if names:
+            return names.most_common(1)[0][0]
+    return None
+
+
+def mentions_contact(text: str) -> bool:
+    """Whether the text names a titled contact person or a postal address."""
+    return bool(_HR.search(text) or _STREET.search(text))
+
+
+def extract_hr(jd_raw: str) -> Optional[str]:
+    """Salutation of the first titled contact person, e.g. "Ms. Meier"."""
+    match = _HR.search(jd_raw)
+    if match is None:
+        return None
+    return f"{_TITLES[match.group('title').lower()]} {match.group('last') or match.group('first')}"
+
+
+def extract_location(jd_raw: str) -> Dict[str, str]:
+    """Address, zip and city from a postal address, or the city (and its zip, if given) from a known city name."""
+    match = _STREET.search(jd_raw)
+    if match is not None:
+        return {
+            "address": " ".join(match.group("street").split()),
+            "zip": match.group("zip"),
+            "city": _canonical_city(match.group("city")),
+        }
+    match = _CITY.search(jd_raw)
+    if match is None:
+        return {}
+    fields = {"city": _canonical_city(match.group("city"))}
+    # a city alone does not tell the zip; it is only taken from the text
+    if match.group("zip"):
+        fields["zip"] = match.group("zip")
+    return fields
+
+
+def extract_metadata(jd_raw: str) -> Dict[str, str]:
+    """
+    Extract the JD metadata found in fixed places of a posting.
+
+    Args:
+        jd_raw: Raw JD text
+
+    Returns:
+        The fields found among company, hr, address, zip and city
+    """
+    fields = extract_location(jd_raw)
+    company = extract_company(jd_raw)
+    if company:
+        fields["company"] = company
+    hr = extract_hr(jd_raw)
+    if hr:
+        fields["hr"] = hr
+    return fields
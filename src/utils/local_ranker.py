@@ -0,0 +1,88 @@
+"""LLM-free ranking (ranker.mode: local): bank items scored by weighted JD overlap and priority."""
+from typing import Any, Dict, List
+from domain.state import State, SelectedItem
+from adapters.storage_yaml import get_bank_store
+from utils.bm25_index import tokenize
+
+# weight of a JD term by the jd_summary field it comes from (the highest applies)
+JD_FIELD_WEIGHTS = (
+    ("must_haves", 3.0),
+    ("skills", 2.0),
+    ("responsibilities", 1.0),
+    ("nice_to_haves", 1.0),
+    ("role", 1.0),
+)
+
+
+def jd_terms(jd_summary: Dict[str, Any]) -> Dict[str, float]:
+    """Weighted JD terms from the jd_summary fields in JD_FIELD_WEIGHTS."""
+    weights: Dict[str, float] = {}
+    for key, weight in JD_FIELD_WEIGHTS:
+        value = jd_summary.get(key) or []
+        if isinstance(value, str):
+            value = [value]
+        for term in tokenize(" ".join(map(str, value))):
+            weights[term] = max(weights.get(term, 0.0), weight)
+    return weights
+
+
+def score_item(item: Dict[str, Any], terms: Dict[str, float], config: dict) -> float:
+    """
+    Score a bank item against the weighted JD terms.
+
+    A term found in the item's tags counts ranker.local.tag_weight times its
+    JD weight, a term found only in its text ranker.local.text_weight times;
+    the item's priority is added with weight ranker.local.priority_weight.
+
+    Args:
+        item: Bank item (BankItem shape: id, text, tags, priority)
+        terms: Weighted JD terms from jd_terms()
+        config: Configuration
+
+    Returns:
+        Score (higher is better)
+    """
+    local = (config.get("ranker") or {}).get("local") or {}
+    tag_tokens = set(tokenize(" ".join(map(str, item.get("tags") or []))))
+    text_tokens = set(tokenize(str(item.get("text", ""))))
+    score = 0.0
+    for term, weight in terms.items():
+        if term in tag_tokens:
+            score += local.get("tag_weight", 2.0) * weight
+        elif term in text_tokens:
+            score += local.get("text_weight", 1.0) * weight
+    return score + local.get("priority_weight", 1.0) * float(item.get("priority") or 0)
+
+
+def _ranked(state: State, config: dict, section: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Items best first (ties keep bank order); the scores are noted in meta["local_scores"][section]."""
+    terms = jd_terms(state["jd_summary"])
+    scores = [score_item(item, terms, config) for item in items]
+    state.setdefault("meta", {}).setdefault("local_scores", {})[section] = {
+        str(item.get("id")): round(score, 4) for item, score in zip(items, scores)
+    }
+    order = sorted(range(len(items)), key=lambda position: (-scores[position], position))
+    return [items[position] for position in order]
+
+
+def local_select_work_experience(state: State, config: dict, work_name: str) -> List[SelectedItem]:
+
+    items = get_bank_store(config).dicts(work_name)
+
+    # the first bullet describes the company and always leads the section
+    cap = config.get("caps", {}).get("experience")
+    ranked = items[:1] + _ranked(state, config, work_name, items[1:])
+    if cap is not None:
+        ranked = ranked[:max(cap, 1)]
+    return [SelectedItem(id=item["id"], text=str(item["text"]).strip()) for item in ranked]
+
+
+def local_select_skill(state: State, config: dict) -> List[Dict[str, str]]:
+
+    items = get_bank_store(config).dicts("skills")
+
+    # like the LLM skills prompt, every category is kept; the best matching ones come first
+    return [
+        {"categories": item.get("category", ""), "text": str(item["text"]).strip()}
+        for item in _ranked(state, config, "skills", items)
+    ]
@@ -0,0 +1,99 @@
+from typing import Any, Dict, List, Tuple
+from domain.state import State
+from domain.schemas import merged_selection_schema
+from utils.shortlist import shortlist_section
+from utils.prompt_builder import build_user_prompt, static_block, jd_block
+from adapters.llm_openai import get_client, get_async_client
+from adapters.storage_yaml import get_bank_store
+from infra.metering import get_meter
+
+def build_merged_prompts(state: State, config: dict) -> Tuple[str, str]:
+
+    caps = config.get("caps")
+    work_names = list(config.get("work_experience").keys())
+    tailoring_type = config.get("tailoring_type")
+    if tailoring_type == "tech":
+        add_prompt = "This job description is in tech, very technical. so please prioritize the hard technical skills and experiences."
+    elif tailoring_type == "business":
+        add_prompt = "This job description is in business, very business-oriented. so please prioritize the soft business skills and experiences."
+    else:
+        add_prompt = ""
+
+    bank = get_bank_store(config)
+    skills_contents = bank.dicts("skills")
+    skills_contents = shortlist_section(state, config, "skills", skills_contents, "skills")
+    blocks = [static_block("Skills bullet points (section 'skills')", skills_contents)]
+    for work_name in work_names:
+        work_experience_contents = bank.dicts(work_name)
+        work_experience_contents = shortlist_section(
+            state, config, work_name, work_experience_contents, "experience", pinned=1
+        )
+        blocks.append(static_block(f"Work Experience bullet points (section '{work_name}')", work_experience_contents))
+
+    system_prompt = """You are a resume selector. Rank and SELECT the best items per section for this JD.
+Prefer concrete metrics. Do NOT invent facts. Return strict JSON."""
+
+    # continuation lines carry the indentation of the instructions below, which build_user_prompt strips
+    caps_lines = "\n                ".join(f"- {work_name}: max {caps.get('experience')} items" for work_name in work_names)
+    work_keys = "\n                    ".join(
+        f'"{work_name}": {{"selected": [{{"id": "...", "text": "..."}}, ...]}},' for work_name in work_names
+    )
+    # bank blocks first, the variable JD block last (provider prefix caching);
+    # the bank blocks are only identical across JDs while caps.shortlist is off
+    user_prompt = build_user_prompt(
+        blocks,
+        f"""You are writing a resume for a given job description. Given the bullet points of every section above and the job description summary below, fill every section of the resume.
+
+                Skills section: keep all categories and items of skills. An addition of skills in the categories is allowed and encouraged based on JD.
+                Work experience sections: rank and rewrite (shorten, tailor, etc.) the bullet points of each section. The first bullet point of each section must describe the company.
+                Select only from the bullet points of the same section. Do not invent facts.
+                Make sure the text is formatted in LaTeX.
+
+                {add_prompt}
+
+                Selection Budgets (caps) per work experience section:
+                {caps_lines}
+
+                Return a JSON object with one key per section and this exact structure:
+                {{
+                    "skills": {{"selected": [{{"categories": "...", "text": "..."}}, ...]}},
+                    {work_keys}
+                }}
+
+                Do NOT exceed the caps.
+                Return only valid JSON, no other text.""",
+        [jd_block(state["jd_summary"])],
+    )
+    return system_prompt, user_prompt
+
+
+def split_merged_result(result: Dict[str, Any], config: dict) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+    """Split a merged reply into (selected skills, selected items per work section)."""
+    works = {work_name: result[work_name]["selected"] for work_name in config.get("work_experience").keys()}
+    return result["skills"]["selected"], works
+
+
+def rank_and_select_merged(state: State, config: dict) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+
+    model_config = config.get("model")
+
+    client = get_client(model_config, config)
+    meter = get_meter(state, config, "ranker", "merged")
+    schema = merged_selection_schema(tuple(config.get("work_experience").keys()))
+
+    system_prompt, user_prompt = build_merged_prompts(state, config)
+    result = client.chat_completion_json(system_prompt, user_prompt, meter=meter, schema=schema)
+    return split_merged_result(result, config)
+
+
+async def arank_and_select_merged(state: State, config: dict) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+
+    model_config = config.get("model")
+
+    client = get_async_client(model_config, config)
+    meter = get_meter(state, config, "ranker", "merged")
+    schema = merged_selection_schema(tuple(config.get("work_experience").keys()))
+
+    system_prompt, user_prompt = build_merged_prompts(state, config)
+    result = await client.chat_completion_json(system_prompt, user_prompt, meter=meter, schema=schema)
+    return split_merged_result(result, config)
@@ -0,0 +1,73 @@
+"""Cache-friendly prompt assembly.
+
+Providers cache the longest previously seen prompt prefix, so prompts are laid
+out from the most to the least stable part: static system prompt, static bank
+blocks, run-level instructions, and the variable JD block last. Static blocks
+are serialized deterministically so their bytes are identical across JDs.
+"""
+import inspect
+import json
+from typing import Any, Dict, Sequence, Tuple
+
+# (label, jd_summary key) pairs of the JD block used by the rankers
+JD_FIELDS = (
+    ("Company", "company"),
+    ("Role", "role"),
+    ("Skills", "skills"),
+    ("Responsibilities", "responsibilities"),
+    ("Must Haves", "must_haves"),
+    ("Nice to Haves", "nice_to_haves"),
+)
+
+
+def static_block(title: str, content: Any) -> str:
+    """
+    Render a static block (bank content, profile material).
+
+    Args:
+        title: Block heading
+        content: Text, or YAML/JSON data serialized as compact, order-preserving JSON
+
+    Returns:
+        Block text
+    """
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False, separators=(", ", ": "))
+    return f"{title}:\n{content.strip()}"
+
+
+def jd_block(jd_summary: Dict[str, Any], fields: Sequence[Tuple[str, str]] = JD_FIELDS, title: str = "Job Description Summary") -> str:
+    """
+    Render the variable JD block.
+
+    Args:
+        jd_summary: Parsed JD summary
+        fields: (label, key) pairs to include; list values are comma-joined
+        title: Block heading
+
+    Returns:
+        Block text
+    """
+    lines = []
+    for label, key in fields:
+        value = jd_summary.get(key, "")
+        if isinstance(value, list):
+            value = ", ".join(value)
+        lines.append(f"{label}: {value}")
+    return f"{title}:\n" + "\n".join(lines)
+
+
+def build_user_prompt(static_blocks: Sequence[str], instructions: str, variable_blocks: Sequence[str]) -> str:
+    """
+    Assemble a user prompt as static blocks -> instructions -> variable blocks.
+
+    Args:
+        static_blocks: Blocks identical for every JD (bank content)
+        instructions: Task instructions (indentation is normalized; identical for every JD of a run)
+        variable_blocks: Per-JD blocks
+
+    Returns:
+        User prompt
+    """
+    parts = [*static_blocks, inspect.cleandoc(instructions), *variable_blocks]
+    return "\n\n".join(parts)
@@ -0,0 +1,52 @@
+"""Candidate shortlisting for the ranking prompts (BM25 or TF-IDF relevance)."""
+from typing import Any, Dict, List
+from utils.bm25_index import shortlist
+from utils.tfidf_index import relevance_scores
+
+
+def shortlist_section(
+    state: Dict[str, Any],
+    config: Dict[str, Any],
+    section: str,
+    items: List[Dict[str, Any]],
+    default_key: str,
+    pinned: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Shortlist a section's bank items with k from caps.shortlist and note the result in state meta.
+
+    Items are scored with BM25, or with the TF-IDF engine when ranker.scorer
+    is "tfidf". The TF-IDF scores of all bank items are kept in
+    meta["relevance"] when that scorer is used or ranker.relevance_audit is
+    set (for audit_cv.json); otherwise no TF-IDF index is built. A shortlist makes the bank block of the
+    prompt depend on the JD, so it forfeits provider prefix caching across
+    JDs; caps.shortlist is therefore off by default.
+
+    Args:
+        state: Pipeline state with jd_summary; the result goes to meta["shortlist"][section]
+        config: Configuration; k is caps.shortlist[section], else caps.shortlist[default_key]
+        section: Section key (e.g. "work1", "skills")
+        items: The section's bank items
+        default_key: Fallback caps.shortlist key (e.g. "experience")
+        pinned: Number of leading items that are always kept
+
+    Returns:
+        Kept items in bank order
+    """
+    if not isinstance(items, list):
+        return items
+    limits = (config.get("caps") or {}).get("shortlist") or {}
+    k = limits.get(section, limits.get(default_key))
+    ranker_config = config.get("ranker") or {}
+    use_tfidf = ranker_config.get("scorer", "bm25") == "tfidf"
+    if use_tfidf or ranker_config.get("relevance_audit"):
+        # also kept in meta["relevance"] for the audit
+        relevance_scores(state, config)
+    relevance = state["meta"]["relevance"].get(section, {}) if use_tfidf else None
+    kept, scores = shortlist(items, state["jd_summary"], k, pinned, relevance)
+    state.setdefault("meta", {}).setdefault("shortlist", {})[section] = {
+        "candidates": len(items),
+        "kept": len(kept),
+        "scores": scores,
+    }
+    return kept
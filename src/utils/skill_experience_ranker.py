@@ -1,16 +1,13 @@
-from typing import List
-import yaml
+from typing import List, Tuple
 from domain.state import State, SelectedItem
-from adapters.llm_openai import OpenAIClient
+from domain.schemas import SkillSelection
+from utils.shortlist import shortlist_section
+from utils.prompt_builder import build_user_prompt, static_block, jd_block
+from adapters.llm_openai import get_client, get_async_client
+from adapters.storage_yaml import get_bank_store
+from infra.metering import get_meter
 
-def rank_and_select_skill(state: State, config: dict) -> List[SelectedItem]:
-
-    model_config = config.get("model")
-    
-    client = OpenAIClient(
-        model_name=model_config.get("name", "gpt-4o-mini"),
-        temperature=model_config.get("temperature", 0.1),
-    )
+def build_skill_prompts(state: State, config: dict) -> Tuple[str, str]:
 
     caps = config.get("caps")
     tailoring_type = config.get("tailoring_type")
@@ -21,26 +18,16 @@ def rank_and_select_skill(state: State, config: dict) -> List[SelectedItem]:
     else:
         add_prompt = ""
 
-    with open(config.get("skills"), "r") as f:
-        skills_contents = yaml.load(f, Loader=yaml.SafeLoader)
+    skills_contents = get_bank_store(config).dicts("skills")
+    skills_contents = shortlist_section(state, config, "skills", skills_contents, "skills")
 
     system_prompt = """You are a resume writer. Your task is to see whether you need to add skills to match the JD. Return strict JSON."""
 
-    jd_summary = state["jd_summary"]
-    jd_text = f"""Company: {jd_summary['company']}
-                Role: {jd_summary['role']}
-                Skills: {', '.join(jd_summary['skills'])}
-                Responsibilities: {', '.join(jd_summary['responsibilities'])}
-                Must Haves: {', '.join(jd_summary['must_haves'])}
-                Nice to Haves: {', '.join(jd_summary['nice_to_haves'])}"""
-
-    user_prompt = f"""You are writing a resume for a given job description. Given the following job description summary and fact bank, select the items for the skills section.
-
-                Job Description Summary:
-                {jd_text}
-
-                Skills bullet points:
-                {skills_contents}
+    # bank block first, the variable JD block last (provider prefix caching);
+    # the bank block is only identical across JDs while caps.shortlist is off
+    user_prompt = build_user_prompt(
+        [static_block("Skills bullet points", skills_contents)],
+        f"""You are writing a resume for a given job description. Given the skills bullet points above and the job description summary below, select the items for the skills section.
 
                 First, keep the all categories and items of skills.
                 An addition of skills in the categories is allowed and encouraged based on JD.
@@ -48,16 +35,42 @@ def rank_and_select_skill(state: State, config: dict) -> List[SelectedItem]:
 
                 {add_prompt}
 
-
                 Return a JSON object with this exact structure:
                 {{
                     "selected": [{{"categories": "...", "text": "..."}}, {{"categories": "...", "text": "..."}}, ...],
                 }}
 
-                Return only valid JSON, no other text."""
+                Return only valid JSON, no other text.""",
+        [jd_block(state["jd_summary"])],
+    )
+    return system_prompt, user_prompt
+
+
+def rank_and_select_skill(state: State, config: dict) -> List[SelectedItem]:
+
+    model_config = config.get("model")
+    
+    client = get_client(model_config, config)
+    meter = get_meter(state, config, "ranker", "skills")
+
+    system_prompt, user_prompt = build_skill_prompts(state, config)
+    result = client.chat_completion_json(system_prompt, user_prompt, meter=meter, schema=SkillSelection)
+    
+    # Validate and structure the result
+    selected = result.get("selected")
+    return selected
+
+
+async def arank_and_select_skill(state: State, config: dict) -> List[SelectedItem]:
+
+    model_config = config.get("model")
     
-    result = client.chat_completion_json(system_prompt, user_prompt)
+    client = get_async_client(model_config, config)
+    meter = get_meter(state, config, "ranker", "skills")
+
+    system_prompt, user_prompt = build_skill_prompts(state, config)
+    result = await client.chat_completion_json(system_prompt, user_prompt, meter=meter, schema=SkillSelection)
     
     # Validate and structure the result
     selected = result.get("selected")
-    return selected
\ No newline at end of file
+    return selected
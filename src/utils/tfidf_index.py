@@ -0,0 +1,347 @@
+"""Sparse TF-IDF scoring engine over the bank, optionally persisted with a manifest.
+
+Every bank bullet is a row of an L2-normalized TF-IDF matrix over hashed word
+unigrams and bigrams. The matrix is kept in compressed sparse column form in
+stdlib `array`s (NumPy is not a dependency); only the columns of terms that
+occur in the bank are stored, so its size follows the bank's vocabulary, not
+the hash space. It can be persisted as raw binary next to a JSON manifest.
+Scoring a JD is one sparse matrix-vector product that only visits the columns
+of the query terms, so a JD is scored against tens of thousands of bullets in
+milliseconds.
+"""
+import bisect
+import hashlib
+import json
+import math
+import os
+import sys
+import threading
+import zlib
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import yaml
+from adapters.storage_yaml import bank_sources
+from infra.logging import setup_logger
+from utils.bm25_index import item_text, jd_query, tokenize
+
+logger = setup_logger(__name__)
+
+INDEX_VERSION = 3
+N_FEATURES = 1 << 20
+
+# (index path, bank files) -> (source file signature, index)
+_INDEXES: Dict[Tuple, Tuple[Tuple, "TfidfIndex"]] = {}
+_INDEXES_LOCK = threading.Lock()
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def terms(tokens: List[str]) -> List[str]:
+    """Unigram and bigram terms of a token list."""
+    return tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+
+def feature(term: str, n_features: int = N_FEATURES) -> int:
+    """Stable column of a term (hashing trick, independent of PYTHONHASHSEED)."""
+    return zlib.crc32(term.encode("utf-8")) & (n_features - 1)
+
+
+class TfidfIndex:
+    """Compressed sparse column TF-IDF matrix of bank bullets, over the columns that occur in the bank."""
+
+    def __init__(
+        self,
+        rows: List[Tuple[str, str]],
+        columns: array,
+        indptr: array,
+        indices: array,
+        data: array,
+        idf: array,
+        n_features: int = N_FEATURES,
+    ):
+        """
+        Args:
+            rows: (section, item id) of every matrix row
+            columns: Sorted hashed columns that occur in the bank
+            indptr: Start offsets into indices/data per stored column (len(columns) + 1 entries)
+            indices: Row number of every stored value
+            data: Stored TF-IDF weights
+            idf: Inverse document frequency per stored column
+            n_features: Number of hashed columns
+        """
+        self.rows = rows
+        self.columns = columns
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.idf = idf
+        self.n_features = n_features
+        # smoothed idf of a term that occurs in no bank item
+        self.unseen_idf = math.log(1 + len(rows)) + 1
+
+    def _position(self, column: int) -> Optional[int]:
+        """Position of a hashed column among the stored columns, or None if no bank item has it."""
+        position = bisect.bisect_left(self.columns, column)
+        if position < len(self.columns) and self.columns[position] == column:
+            return position
+        return None
+
+    @classmethod
+    def build(cls, sections: Dict[str, List[Dict[str, Any]]], n_features: int = N_FEATURES) -> "TfidfIndex":
+        """
+        Build the matrix over the bank items of every section.
+
+        Args:
+            sections: Bank items (id, text, tags) per section key
+            n_features: Number of hashed columns (power of two)
+
+        Returns:
+            TfidfIndex
+        """
+        rows: List[Tuple[str, str]] = []
+        row_counts: List[Counter] = []
+        for section, items in sections.items():
+            for item in items:
+                rows.append((section, str(item.get("id"))))
+                row_counts.append(Counter(feature(term, n_features) for term in terms(tokenize(item_text(item)))))
+
+        document_frequency: Counter = Counter()
+        for counts in row_counts:
+            document_frequency.update(counts.keys())
+        columns = array("i", sorted(document_frequency))
+        position = {column: i for i, column in enumerate(columns)}
+        # smoothed idf as in scikit-learn
+        idf = array("f", (math.log((1 + len(rows)) / (1 + document_frequency[column])) + 1 for column in columns))
+
+        entries: List[Tuple[int, int, float]] = []
+        for row, counts in enumerate(row_counts):
+            weights = [(position[column], (1 + math.log(tf)) * idf[position[column]]) for column, tf in counts.items()]
+            norm = math.sqrt(sum(weight * weight for _, weight in weights)) or 1.0
+            entries.extend((i, row, weight / norm) for i, weight in weights)
+        entries.sort()
+
+        indptr = array("q", [0]) * (len(columns) + 1)
+        for i, _, _ in entries:
+            indptr[i + 1] += 1
+        for i in range(len(columns)):
+            indptr[i + 1] += indptr[i]
+        indices = array("i", (row for _, row, _ in entries))
+        data = array("f", (weight for _, _, weight in entries))
+        return cls(rows, columns, indptr, indices, data, idf, n_features)
+
+    def query_vector(self, tokens: List[str]) -> Dict[int, float]:
+        """
+        L2-normalized sparse TF-IDF vector of a query.
+
+        Returns:
+            Weight per stored column position; terms absent from the bank only
+            count towards the norm
+        """
+        counts = Counter(feature(term, self.n_features) for term in terms(tokens))
+        weights: Dict[Optional[int], float] = {}
+        unseen = 0.0
+        for column, tf in counts.items():
+            position = self._position(column)
+            if position is None:
+                unseen += ((1 + math.log(tf)) * self.unseen_idf) ** 2
+            else:
+                weights[position] = (1 + math.log(tf)) * self.idf[position]
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()) + unseen) or 1.0
+        return {position: weight / norm for position, weight in weights.items()}
+
+    def scores(self, tokens: List[str]) -> Dict[int, float]:
+        """Cosine similarity of the query with every row that shares a term (one sparse matrix-vector product)."""
+        scores: Dict[int, float] = {}
+        for position, query_weight in self.query_vector(tokens).items():
+            start, end = self.indptr[position], self.indptr[position + 1]
+            for row, weight in zip(self.indices[start:end], self.data[start:end]):
+                scores[row] = scores.get(row, 0.0) + query_weight * weight
+        return scores
+
+    def score_jd(self, jd_summary: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+        """
+        Relevance of the bank items to a JD.
+
+        Args:
+            jd_summary: Parsed JD summary (skills, must_haves, responsibilities)
+
+        Returns:
+            Score per item id, per section (items without any shared term are omitted)
+        """
+        relevance: Dict[str, Dict[str, float]] = {}
+        for row, score in sorted(self.scores(jd_query(jd_summary)).items()):
+            section, item_id = self.rows[row]
+            relevance.setdefault(section, {})[item_id] = round(score, 4)
+        return relevance
+
+    def save(self, path: Path) -> Dict[str, Any]:
+        """Write the arrays to path (raw, little-endian) and return their layout."""
+        arrays = (self.columns, self.indptr, self.indices, self.data, self.idf)
+        with open(path, "wb") as f:
+            for values in arrays:
+                if sys.byteorder != "little":
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                values.tofile(f)
+        return {
+            "rows": self.rows,
+            "n_features": self.n_features,
+            "lengths": [len(values) for values in arrays],
+        }
+
+    @classmethod
+    def load(cls, path: Path, layout: Dict[str, Any]) -> "TfidfIndex":
+        """Read arrays written by save()."""
+        arrays = []
+        with open(path, "rb") as f:
+            for typecode, length in zip("iqiff", layout["lengths"]):
+                values = array(typecode)
+                values.fromfile(f, length)
+                if sys.byteorder != "little":
+                    values.byteswap()
+                arrays.append(values)
+        return cls([tuple(row) for row in layout["rows"]], *arrays, n_features=layout["n_features"])
+
+
+def _file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _manifest(sources: Dict[str, str], previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """mtime, size and sha256 per source file; hashes of files whose mtime and size are unchanged are reused."""
+    previous = previous or {}
+    manifest = {}
+    for section, path in sources.items():
+        stat = os.stat(path)
+        entry = {"path": str(path), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        old = previous.get(section) or {}
+        if old.get("path") == entry["path"] and old.get("mtime_ns") == entry["mtime_ns"] and old.get("size") == entry["size"]:
+            entry["sha256"] = old["sha256"]
+        else:
+            entry["sha256"] = _file_hash(path)
+        manifest[section] = entry
+    return manifest
+
+
+def _build(sources: Dict[str, str]) -> TfidfIndex:
+    sections = {}
+    for section, source in sources.items():
+        with open(source, "r") as f:
+            items = yaml.load(f, Loader=_YAML_LOADER) or []
+        sections[section] = [item for item in items if isinstance(item, dict)]
+    index = TfidfIndex.build(sections)
+    logger.info(f"Built TF-IDF index over {len(index.rows)} bank items ({len(index.data)} non-zero weights)")
+    return index
+
+
+def load_or_build(sources: Dict[str, str], index_path: Optional[str]) -> TfidfIndex:
+    """
+    Load the persisted index, rebuilding it if a source file changed.
+
+    A file whose mtime changed but whose content hash did not (e.g. after a
+    checkout) does not trigger a rebuild; only the manifest is refreshed.
+
+    Args:
+        sources: Bank YAML file per section key
+        index_path: Path of the persisted index JSON; None builds the index in memory only
+
+    Returns:
+        TfidfIndex
+    """
+    if index_path is None:
+        return _build(sources)
+    path = Path(index_path)
+    stored = None
+    if path.exists():
+        try:
+            with open(path, "r") as f:
+                stored = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            stored = None
+        if stored is not None and stored.get("version") != INDEX_VERSION:
+            stored = None
+
+    previous = (stored or {}).get("manifest")
+    manifest = _manifest(sources, previous)
+    if stored is not None and previous is not None:
+        same_content = {section: entry["sha256"] for section, entry in manifest.items()} == {
+            section: entry["sha256"] for section, entry in previous.items()
+        }
+        if same_content:
+            try:
+                index = TfidfIndex.load(_matrix_path(path), stored["layout"])
+            except (OSError, EOFError, KeyError):
+                index = None
+            if index is not None:
+                if manifest != previous:
+                    _write_manifest(path, manifest, stored["layout"])
+                return index
+
+    index = _build(sources)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    matrix_tmp = _matrix_path(path).with_suffix(".tmp")
+    layout = index.save(matrix_tmp)
+    os.replace(matrix_tmp, _matrix_path(path))
+    _write_manifest(path, manifest, layout)
+    return index
+
+
+def _matrix_path(path: Path) -> Path:
+    """Binary matrix file stored next to the manifest JSON."""
+    return path.with_suffix(".bin")
+
+
+def _write_manifest(path: Path, manifest: Dict[str, Any], layout: Dict[str, Any]) -> None:
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"version": INDEX_VERSION, "manifest": manifest, "layout": layout}, f)
+    os.replace(tmp_path, path)
+
+
+def get_tfidf_index(config: Dict[str, Any]) -> TfidfIndex:
+    """
+    Return the process-wide TF-IDF index of the configured bank.
+
+    The index is rebuilt when a bank file changes. It is persisted at
+    ranker.tfidf_index if that is set and kept in memory only otherwise.
+
+    Args:
+        config: Configuration (uses the work_experience, skills and ranker sections)
+
+    Returns:
+        TfidfIndex
+    """
+    index_path = (config.get("ranker") or {}).get("tfidf_index") or None
+    sources = {section: path for section, path in bank_sources(config, ranked=True).items() if os.path.isfile(path)}
+    signature = tuple(
+        (section, path, os.stat(path).st_mtime_ns, os.stat(path).st_size) for section, path in sorted(sources.items())
+    )
+    with _INDEXES_LOCK:
+        key = (index_path, tuple(sorted(sources.items())))
+        cached = _INDEXES.get(key)
+        if cached is None or cached[0] != signature:
+            cached = (signature, load_or_build(sources, index_path))
+            _INDEXES[key] = cached
+    return cached[1]
+
+
+def relevance_scores(state: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """
+    TF-IDF relevance of every bank item to the state's JD, computed once per state.
+
+    The scores are kept in state["meta"]["relevance"] for the rankers and the audit.
+
+    Args:
+        state: Pipeline state with jd_summary
+        config: Configuration
+
+    Returns:
+        Score per item id, per section
+    """
+    meta = state.setdefault("meta", {})
+    if "relevance" not in meta:
+        meta["relevance"] = get_tfidf_index(config).score_jd(state["jd_summary"])
+    return meta["relevance"]
@@ -1,16 +1,13 @@
-from typing import List
-import yaml
+from typing import List, Tuple
 from domain.state import State, SelectedItem
-from adapters.llm_openai import OpenAIClient
+from domain.schemas import WorkSelection
+from utils.shortlist import shortlist_section
+from utils.prompt_builder import build_user_prompt, static_block, jd_block
+from adapters.llm_openai import get_client, get_async_client
+from adapters.storage_yaml import get_bank_store
+from infra.metering import get_meter
 
-def rank_and_select_work_experience(state: State, config: dict, work_name: str) -> List[SelectedItem]:
-
-    model_config = config.get("model")
-    
-    client = OpenAIClient(
-        model_name=model_config.get("name", "gpt-4o-mini"),
-        temperature=model_config.get("temperature", 0.1),
-    )
+def build_work_experience_prompts(state: State, config: dict, work_name: str) -> Tuple[str, str]:
 
     caps = config.get("caps")
     tailoring_type = config.get("tailoring_type")
@@ -21,27 +18,20 @@ def rank_and_select_work_experience(state: State, config: dict, work_name: str)
     else:
         add_prompt = ""
 
-    with open(config.get("work_experience")[work_name], "r") as f:
-        work_experience_contents = yaml.load(f, Loader=yaml.SafeLoader)
+    work_experience_contents = get_bank_store(config).dicts(work_name)
+    # only the BM25 top-k bullets reach the LLM; the first one describes the company and is always kept
+    work_experience_contents = shortlist_section(
+        state, config, work_name, work_experience_contents, "experience", pinned=1
+    )
 
     system_prompt = """You are a resume selector. Rank and SELECT the best items per section for this JD. 
 Prefer concrete metrics. Do NOT invent facts. Return strict JSON."""
 
-    jd_summary = state["jd_summary"]
-    jd_text = f"""Company: {jd_summary['company']}
-                Role: {jd_summary['role']}
-                Skills: {', '.join(jd_summary['skills'])}
-                Responsibilities: {', '.join(jd_summary['responsibilities'])}
-                Must Haves: {', '.join(jd_summary['must_haves'])}
-                Nice to Haves: {', '.join(jd_summary['nice_to_haves'])}"""
-
-    user_prompt = f"""You are writing a resume for a given job description. Given the following job description summary and fact bank, select the best items per section.
-
-                Job Description Summary:
-                {jd_text}
-
-                Work Experience bullet points:
-                {work_experience_contents}
+    # bank block first, the variable JD block last (provider prefix caching);
+    # the bank block is only identical across JDs while caps.shortlist is off
+    user_prompt = build_user_prompt(
+        [static_block("Work Experience bullet points", work_experience_contents)],
+        f"""You are writing a resume for a given job description. Given the work experience bullet points above and the job description summary below, select the best items per section.
 
                 Please rank and rewrite (shorten, tailor, etc.) the work experience contents based on the job description summary and the work experience bullet points.
                 Note that the first bullet point must describe the company.
@@ -58,10 +48,37 @@ Prefer concrete metrics. Do NOT invent facts. Return strict JSON."""
                 }}
 
                 Select only from the provided bank items. Do NOT exceed the caps. 
-                Return only valid JSON, no other text."""
+                Return only valid JSON, no other text.""",
+        [jd_block(state["jd_summary"])],
+    )
+    return system_prompt, user_prompt
+
+
+def rank_and_select_work_experience(state: State, config: dict, work_name: str) -> List[SelectedItem]:
+
+    model_config = config.get("model")
+    
+    client = get_client(model_config, config)
+    meter = get_meter(state, config, "ranker", work_name)
+
+    system_prompt, user_prompt = build_work_experience_prompts(state, config, work_name)
+    result = client.chat_completion_json(system_prompt, user_prompt, meter=meter, schema=WorkSelection)
+    
+    # Validate and structure the result
+    selected = result.get("selected")
+    return selected
+
+
+async def arank_and_select_work_experience(state: State, config: dict, work_name: str) -> List[SelectedItem]:
+
+    model_config = config.get("model")
     
-    result = client.chat_completion_json(system_prompt, user_prompt)
+    client = get_async_client(model_config, config)
+    meter = get_meter(state, config, "ranker", work_name)
+
+    system_prompt, user_prompt = build_work_experience_prompts(state, config, work_name)
+    result = await client.chat_completion_json(system_prompt, user_prompt, meter=meter, schema=WorkSelection)
     
     # Validate and structure the result
     selected = result.get("selected")
-    return selected
\ No newline at end of file
+    return selected
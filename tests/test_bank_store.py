@@ -0,0 +1,69 @@
+"""Compact bank records and the bank store indexes."""
+import os
+
+import yaml
+
+from adapters.storage_yaml import BankRecord, BankStore, bank_sources, get_bank_store
+
+ITEMS = [
+    {"id": 1, "text": "Acme AG, Zurich", "priority": 3},
+    {"text": "Built a \\textbf{RAG} service", "id": "exp_2", "tags": ["python", "llm"], "metric": "-40% latency"},
+    {"id": "exp_3", "text": "Led a team of 4", "tags": ["leadership"], "priority": 1.5, "notes": None},
+]
+
+
+def write_bank(tmp_path, name, items):
+    path = tmp_path / name
+    path.write_text(yaml.safe_dump(items, sort_keys=False, allow_unicode=True))
+    return str(path)
+
+
+def test_to_dict_round_trips_every_item():
+    for item in ITEMS:
+        restored = BankRecord(item, "work1").to_dict()
+        assert restored == item
+        # key order is part of the prompt bytes
+        assert list(restored) == list(item)
+
+
+def test_to_dict_returns_a_fresh_dict():
+    record = BankRecord(ITEMS[1], "work1")
+    record.to_dict()["tags"].append("changed")
+    assert record.to_dict() == ITEMS[1]
+
+
+def test_record_fields():
+    record = BankRecord(ITEMS[0], "work1")
+    assert (record.id, record.section, record.tags, record.priority) == ("1", "work1", (), 3.0)
+
+
+def test_store_indexes_by_id_tag_and_path(tmp_path):
+    path = write_bank(tmp_path, "work1.yaml", ITEMS)
+    store = BankStore({"work1": path, "work2": str(tmp_path / "missing.yaml")})
+    assert store.has("work1") and not store.has("work2")
+    assert store.dicts("work1") == ITEMS
+    assert store.get("work1", 1).text == "Acme AG, Zurich"
+    assert store.get("work1", "nope") is None
+    assert [record.id for record in store.with_tag("llm")] == ["exp_2"]
+    assert store.by_path[path] == "work1"
+    assert len(store.file_hash("work1")) == 64 and store.file_hash("work2") == ""
+
+
+def test_get_bank_store_reloads_changed_files(tmp_path):
+    path = write_bank(tmp_path, "skills.yaml", [{"categories": "Languages", "text": "Python"}])
+    config = {"skills": path}
+    store = get_bank_store(config)
+    assert get_bank_store(config) is store
+
+    write_bank(tmp_path, "skills.yaml", [{"categories": "Languages", "text": "Python, Go"}])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    reloaded = get_bank_store(config)
+    assert reloaded is not store
+    assert reloaded.dicts("skills") == [{"categories": "Languages", "text": "Python, Go"}]
+
+
+def test_bank_sources_of_the_ranked_sections_leave_out_education():
+    config = {"work_experience": {"work": "work.yaml"}, "edu_experience": {"edu": "edu.yaml"}, "skills": "skills.yaml"}
+    assert bank_sources(config) == {"work": "work.yaml", "edu": "edu.yaml", "skills": "skills.yaml"}
+    assert bank_sources(config, ranked=True) == {"work": "work.yaml", "skills": "skills.yaml"}
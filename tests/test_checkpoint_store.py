@@ -0,0 +1,121 @@
+"""SQLite checkpoints: saving graph runs, listing incomplete ones and resuming them."""
+import operator
+from typing import Annotated, List, TypedDict
+
+import pytest
+from langgraph.graph import END, StateGraph
+
+from adapters.checkpoint_store import SQLiteCheckpointSaver, get_checkpointer
+from app.services import run_options, tracked_run
+
+
+class RunState(TypedDict):
+    steps: Annotated[List[str], operator.add]
+
+
+def build_graph(saver, calls, fail):
+    """parse -> (rank, write) in parallel -> export; `fail` holds the node names that raise."""
+    def node(name):
+        def run(state):
+            calls.append(name)
+            if name in fail:
+                raise RuntimeError(f"{name} failed")
+            return {"steps": [name]}
+        return run
+
+    graph = StateGraph(RunState)
+    for name in ("parse", "rank", "write", "export"):
+        graph.add_node(name, node(name))
+    graph.set_entry_point("parse")
+    graph.add_edge("parse", "rank")
+    graph.add_edge("parse", "write")
+    graph.add_edge(["rank", "write"], "export")
+    graph.add_edge("export", END)
+    return graph.compile(checkpointer=saver, name="test")
+
+
+def invoke(graph, state, run_id):
+    with tracked_run(graph, run_id):
+        return graph.invoke(state, **run_options(graph, run_id))
+
+
+@pytest.fixture
+def saver(tmp_path):
+    return SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"))
+
+
+def count(saver, table):
+    return saver._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_completed_run_is_forgotten(saver):
+    calls = []
+    final = invoke(build_graph(saver, calls, fail=()), {"steps": []}, "run-1")
+    assert sorted(final["steps"]) == ["export", "parse", "rank", "write"]
+    assert saver.get_run("run-1") is None
+    assert saver.incomplete_runs() == []
+    assert count(saver, "checkpoints") == count(saver, "blobs") == 0
+
+
+def test_completed_run_is_kept_with_keep_completed(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"), keep_completed=True)
+    invoke(build_graph(saver, [], fail=()), {"steps": []}, "run-1")
+    assert saver.get_run("run-1")["status"] == "done"
+    assert saver.incomplete_runs() == []
+    assert count(saver, "checkpoints") > 0
+
+
+def test_failed_run_is_listed_with_its_completed_nodes(saver):
+    with pytest.raises(RuntimeError, match="write failed"):
+        invoke(build_graph(saver, [], fail={"write"}), {"steps": []}, "run-1")
+
+    run = saver.get_run("run-1")
+    assert (run["graph"], run["status"]) == ("test", "failed")
+    assert "write failed" in run["error"]
+    [listed] = saver.incomplete_runs()
+    assert listed["run_id"] == "run-1"
+    # rank finished in the step that failed
+    assert sorted(listed["completed"]) == ["parse", "rank"]
+
+
+def test_resume_runs_only_the_nodes_left(saver):
+    calls = []
+    with pytest.raises(RuntimeError):
+        invoke(build_graph(saver, calls, fail={"write"}), {"steps": []}, "run-1")
+
+    calls.clear()
+    final = invoke(build_graph(saver, calls, fail=()), None, "run-1")
+    assert sorted(calls) == ["export", "write"]
+    assert sorted(final["steps"]) == ["export", "parse", "rank", "write"]
+    assert saver.get_run("run-1") is None
+
+
+def test_checkpoints_survive_a_new_process(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    with pytest.raises(RuntimeError):
+        invoke(build_graph(SQLiteCheckpointSaver(path), [], fail={"export"}), {"steps": []}, "run-1")
+
+    reopened = SQLiteCheckpointSaver(path)
+    assert [run["run_id"] for run in reopened.incomplete_runs()] == ["run-1"]
+    calls = []
+    invoke(build_graph(reopened, calls, fail=()), None, "run-1")
+    assert calls == ["export"]
+
+
+def test_deleting_a_thread_collects_unreferenced_blobs(saver):
+    for run_id in ("run-1", "run-2"):
+        with pytest.raises(RuntimeError):
+            invoke(build_graph(saver, [], fail={"export"}), {"steps": [run_id]}, run_id)
+    saver.delete_thread("run-1")
+    assert saver.get_tuple({"configurable": {"thread_id": "run-2"}}) is not None
+    referenced = count(saver, "blobs")
+    saver.delete_thread("run-2")
+    assert 0 == count(saver, "blobs") < referenced
+
+
+def test_get_checkpointer_follows_the_config(tmp_path):
+    assert get_checkpointer({}) is None
+    config = {"checkpoint": {"enabled": True, "path": str(tmp_path / "c.sqlite"), "keep_completed": True}}
+    saver = get_checkpointer(config)
+    assert saver is get_checkpointer(config)
+    assert saver.keep_completed is True
@@ -0,0 +1,116 @@
+"""JD cleaning: markup, job board chrome, boilerplate sections and learned boilerplate."""
+import random
+
+from agents import jd_cleaner
+from utils.jd_boilerplate import clean_lines, join_lines, normalize_text
+
+SHARED = [
+    "We are an equal partner to our customers and value long lasting relationships with them.",
+    "Our headquarters are located in a beautiful building right next to the main station.",
+    "All our teams work in a hybrid setup with two office days per week and flexible hours.",
+    "Questions about this position can be sent to the recruiting team through the portal.",
+]
+
+
+def body(seed, lines=6):
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(3000)]
+    return [" ".join(rng.choices(vocabulary, k=12)) + "." for _ in range(lines)]
+
+
+def state(jd_raw):
+    return {"jd_raw": jd_raw, "jd_clean": None, "meta": {}}
+
+
+def learn_config(tmp_path, max_share=0.25):
+    return {"jd_cleaner": {"learn": {
+        "enabled": True, "path": str(tmp_path / "boilerplate.sqlite"), "min_postings": 3, "min_words": 8,
+        "max_share": max_share,
+    }}}
+
+
+def test_normalize_text_reduces_html_to_visible_lines():
+    html = (
+        "<html><head><style>p {color: red}</style></head><body>"
+        "<h2>Your tasks</h2><ul><li>Build&nbsp;agents</li><li>Ship   features</li></ul>"
+        "<script>track()</script><p>Caf&eacute;​ included</p></body></html>"
+    )
+    assert normalize_text(html) == "Your tasks\nBuild agents\nShip features\nCafé included"
+
+
+def test_clean_lines_drops_chrome_boilerplate_and_repeats():
+    text = "\n".join([
+        "Easy Apply", "Senior Data Engineer", "We accept cookies to improve your experience.",
+        "Build pipelines in Python.", "Build pipelines in Python.", "Contact: Ms. Anna Meier",
+        "Follow us on LinkedIn", "1,234 followers",
+    ])
+    kept, removed = clean_lines(text, extra_patterns=[r"^follow us"])
+    assert kept == ["Senior Data Engineer", "Build pipelines in Python.", "Contact: Ms. Anna Meier"]
+    assert [reason for reason, _ in removed] == ["chrome", "boilerplate", "duplicate", "boilerplate", "chrome"]
+
+
+def test_drop_heading_block_ends_at_the_next_heading():
+    text = "What we offer\nFree lunch\nGym membership\nTech stack:\nPython, AWS\nRequirements\nSQL"
+    kept, removed = clean_lines(text)
+    assert kept == ["Tech stack:", "Python, AWS", "Requirements", "SQL"]
+    assert [line for _, line in removed] == ["What we offer", "Free lunch", "Gym membership"]
+
+
+def test_drop_heading_block_ends_at_a_paragraph_break():
+    text = "Benefits:\n\n- 30 days vacation\n- Gym\n\nYou will own the data platform."
+    kept, _ = clean_lines(text)
+    assert join_lines(kept) == "You will own the data platform."
+
+
+def test_contact_lines_survive_a_dropped_section():
+    kept, _ = clean_lines("Privacy policy\nSend your CV to Herr Dr. Max Muster\nWe store your data.")
+    assert kept == ["Send your CV to Herr Dr. Max Muster"]
+
+
+def test_cleaner_keeps_jd_raw_and_records_what_it_removed():
+    jd_raw = "Save Data Engineer at Acme AG\nEasy Apply\nData Engineer\nBuild pipelines.\nWhy join us\nGreat team"
+    cleaned = jd_cleaner.run(state(jd_raw), {})
+    assert cleaned["jd_raw"] == jd_raw
+    assert cleaned["jd_clean"] == "Save Data Engineer at Acme AG\nData Engineer\nBuild pipelines."
+    stats = cleaned["meta"]["jd_clean"]
+    assert stats["removed"] == {"chrome": 1, "section": 2}
+    assert stats["removed_chars"] == {"chrome": len("Easy Apply"), "section": len("Why join us") + len("Great team")}
+    assert stats["chars_before"] == len(jd_raw) and stats["chars_after"] == len(cleaned["jd_clean"])
+
+
+def test_disabled_cleaner_passes_the_jd_through():
+    cleaned = jd_cleaner.run(state("Easy Apply\nData Engineer"), {"jd_cleaner": {"enabled": False}})
+    assert cleaned["jd_clean"] == "Easy Apply\nData Engineer"
+    assert "jd_clean" not in cleaned["meta"]
+
+
+def test_lines_recurring_across_unrelated_postings_are_learned(tmp_path):
+    config = learn_config(tmp_path)
+    for seed in range(3):
+        jd_cleaner.run(state("\n".join(body(seed) + SHARED[:1])), config)
+    cleaned = jd_cleaner.run(state("\n".join(body(10) + SHARED[:1])), config)
+    assert SHARED[0] not in cleaned["jd_clean"]
+    assert cleaned["meta"]["jd_clean"]["removed"] == {"learned": 1}
+
+
+def test_reposts_do_not_teach_their_own_content(tmp_path):
+    config = learn_config(tmp_path)
+    posting = "\n".join(body(1) + SHARED[:1])
+    for _ in range(3):
+        jd_cleaner.run(state(posting), config)
+    assert jd_cleaner.run(state(posting), config)["jd_clean"] == posting
+
+
+def test_max_share_guard_keeps_learned_lines_of_a_mostly_known_posting(tmp_path):
+    config = learn_config(tmp_path, max_share=0.25)
+    for seed in range(3):
+        jd_cleaner.run(state("\n".join(body(seed) + SHARED)), config)
+
+    # a few learned lines in a long posting are dropped ...
+    posting = "\n".join(body(20, lines=12) + SHARED[:1])
+    assert SHARED[0] not in jd_cleaner.run(state(posting), config)["jd_clean"]
+    # ... but a posting that is mostly learned text keeps them
+    repost = "\n".join(body(21, lines=1) + SHARED)
+    cleaned = jd_cleaner.run(state(repost), config)
+    assert cleaned["jd_clean"] == repost
+    assert "learned" not in cleaned["meta"]["jd_clean"]["removed"]
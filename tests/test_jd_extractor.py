@@ -0,0 +1,50 @@
+"""Rule-based extraction of the JD metadata (address, zip, city, hr, company)."""
+import pytest
+
+from utils.jd_extractor import extract_hr, extract_location, extract_metadata
+
+
+def test_postal_address_gives_street_zip_and_canonical_city():
+    assert extract_location("Example Systems AG\nBahnhofstrasse 10\n8001 Zürich") == {
+        "address": "Bahnhofstrasse 10", "zip": "8001", "city": "Zurich",
+    }
+
+
+@pytest.mark.parametrize("text, city", [
+    ("Bahnhofstrasse 1, 8001 Zürich. Contact: Ms. Jane Doe", "Zurich"),
+    ("Bahnhofstrasse 1\n8001 Zurich Switzerland", "Zurich"),
+    ("Main Street 4, 3600 Thun.", "Thun"),
+    ("Hauptstrasse 3, 5400 Baden-Dättwil, Aargau", "Baden-Dättwil"),
+])
+def test_city_stops_at_punctuation_and_the_next_word(text, city):
+    assert extract_location(text)["city"] == city
+
+
+@pytest.mark.parametrize("text, city", [
+    ("Rosenbergstrasse 2, 9000 St. Gallen", "St. Gallen"),
+    ("Kaiserstrasse 5, D-60311 Frankfurt am Main", "Frankfurt"),
+])
+def test_multi_word_cities_come_from_the_city_table(text, city):
+    assert extract_location(text)["city"] == city
+
+
+def test_known_city_without_a_zip_leaves_the_zip_unset():
+    assert extract_location("This role is based in our Genf office.") == {"city": "Geneva"}
+    assert extract_location("Office: CH-6300 Zug") == {"city": "Zug", "zip": "6300"}
+
+
+@pytest.mark.parametrize("text, hr", [
+    ("Your contact: Ms. Jane Doe, Talent Acquisition", "Ms. Doe"),
+    ("Fragen beantwortet Frau Dr. Anna Meier gerne.", "Ms. Meier"),
+    ("Please write to Herr Prof. Muster.", "Mr. Muster"),
+])
+def test_hr_salutation_uses_title_and_last_name(text, hr):
+    assert extract_hr(text) == hr
+
+
+def test_metadata_combines_the_fields_found():
+    text = "Save ML Engineer at Example Systems AG\nBahnhofstrasse 1, 8001 Zürich. Contact: Mrs. Jane Doe"
+    assert extract_metadata(text) == {
+        "address": "Bahnhofstrasse 1", "zip": "8001", "city": "Zurich",
+        "company": "Example Systems AG", "hr": "Ms. Doe",
+    }
@@ -0,0 +1,87 @@
+"""SimHash fingerprints and the block index of near-duplicate JDs."""
+import random
+
+import pytest
+
+from adapters.jd_fingerprints import BITS, FingerprintStore, _blocks, near_duplicate_distance, simhash
+
+
+def posting(seed, words=400):
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(2000)]
+    return " ".join(rng.choices(vocabulary, k=words))
+
+
+def flip(fingerprint, bits):
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def test_simhash_ignores_case_whitespace_and_tracking_links():
+    text = posting(1)
+    assert simhash(text) == simhash(text)
+    assert simhash(text) == simhash("  " + text.upper().replace(" ", "\n "))
+    assert simhash(text + " https://jobs.example.com/123?utm_source=a") == simhash(text + " www.example.org/x")
+
+
+def test_simhash_distance_separates_edits_from_other_postings():
+    text = posting(2)
+    edited = text.replace(text.split()[200], "changed", 1)
+    assert (simhash(text) ^ simhash(edited)).bit_count() <= 8
+    assert (simhash(text) ^ simhash(posting(3))).bit_count() >= 16
+
+
+def test_blocks_partition_the_fingerprint():
+    fingerprint = random.Random(4).getrandbits(BITS)
+    for n_blocks in (1, 3, 4, 7):
+        blocks = _blocks(fingerprint, n_blocks)
+        bounds = [round(BITS * i / n_blocks) for i in range(n_blocks + 1)]
+        assert [number for number, _ in blocks] == list(range(n_blocks))
+        assert sum(value << bounds[number] for number, value in blocks) == fingerprint
+
+
+def test_near_duplicate_distance_from_min_similarity():
+    assert near_duplicate_distance({"jd_dedup": {"min_similarity": 0.95}}) == 3
+    assert near_duplicate_distance({}) == 3
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FingerprintStore(str(tmp_path / "fingerprints.sqlite"), max_distance=3)
+
+
+def test_lookup_finds_fingerprints_within_max_distance(store):
+    fingerprint = random.Random(5).getrandbits(BITS)
+    store.put(fingerprint, "jd", "out/a", {"role": "Engineer"})
+    # one flipped bit in every block but one: only the untouched block can match
+    assert store.nearest(flip(fingerprint, [0, 20, 40])) == (1, 3)
+    assert store.nearest(flip(fingerprint, [0, 20, 40, 60])) is None
+    assert store.record(1)["summary"] == {"role": "Engineer"}
+
+
+def test_lookup_agrees_with_a_full_scan(store):
+    rng = random.Random(6)
+    stored = [rng.getrandbits(BITS) for _ in range(200)]
+    for fingerprint in stored:
+        store.put(fingerprint, "jd", "out", {})
+    for _ in range(300):
+        query = flip(rng.choice(stored), rng.sample(range(BITS), rng.randint(0, 5)))
+        distances = [(fingerprint ^ query).bit_count() for fingerprint in stored]
+        expected = min(distances)
+        match = store.nearest(query)
+        if expected <= 3:
+            assert match is not None and match[1] == expected
+        else:
+            assert match is None
+
+
+def test_store_reloads_its_index_and_honours_refresh(tmp_path):
+    path = str(tmp_path / "fingerprints.sqlite")
+    fingerprint = simhash(posting(7))
+    FingerprintStore(path).put(fingerprint, "jd", "out/a", {"company": "Acme"})
+
+    reopened = FingerprintStore(path)
+    assert len(reopened) == 1
+    assert reopened.nearest(fingerprint) == (1, 0)
+    assert FingerprintStore(path, refresh=True).nearest(fingerprint) is None
@@ -0,0 +1,35 @@
+"""Fields the JD parser asks from the LLM and the defaults of the ones it does not get."""
+from adapters.structured_output import parse_reply
+from agents import jd_parser
+
+CONFIG = {"jd_parser": {"pre_extract": True, "llm_fallback": ["company", "hr"]}}
+SEMANTIC = {"role": "ML Engineer", "skills": [], "responsibilities": [], "must_haves": [], "nice_to_haves": []}
+
+
+def state(jd_clean):
+    return {"jd_clean": jd_clean, "meta": {}}
+
+
+def test_postal_address_leaves_only_the_fallback_fields_to_the_llm():
+    jd = state("Example Systems AG, Bahnhofstrasse 1, 8001 Zürich. Contact: Ms. Jane Doe")
+    assert jd_parser.llm_fields(jd, CONFIG) == jd_parser.SEMANTIC_FIELDS
+
+
+def test_city_without_zip_asks_the_llm_for_zip_and_address():
+    jd = state("Our team in Zurich builds ML systems.")
+    assert jd_parser.llm_fields(jd, CONFIG)[-2:] == ("address", "zip")
+    assert "in Zurich if available" in jd_parser.build_prompts(jd, CONFIG)[1]
+
+
+def test_zip_and_address_the_llm_does_not_know_stay_empty_next_to_a_found_city():
+    jd = state("Our team in Zurich builds ML systems.")
+    reply = parse_reply('{"company": "Example", "hr": "Hiring Manager", "role": "ML Engineer", "skills": [], '
+                        '"responsibilities": [], "must_haves": [], "nice_to_haves": []}', jd_parser.reply_schema(jd, CONFIG))
+    summary = jd_parser.apply_result(jd, reply)["jd_summary"]
+    assert (summary["address"], summary["zip"], summary["city"]) == ("", "", "Zurich")
+
+
+def test_without_a_location_the_placeholders_are_kept():
+    jd = state("We build ML systems.")
+    summary = jd_parser.apply_result(jd, {"company": "Example", **SEMANTIC})["jd_summary"]
+    assert (summary["address"], summary["zip"], summary["city"]) == ("xxxxxxx x", "1000", "Zurich")
@@ -0,0 +1,124 @@
+"""Token buckets, rate limiters and retry backoff of the LLM request scheduler."""
+import types
+
+import httpx
+import openai
+import pytest
+
+from adapters import llm_scheduler
+from adapters.llm_scheduler import RateLimiter, ScheduledBackend, TokenBucket, consume_call_stats
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_scheduler.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "_LIMITERS", {})
+
+
+def api_error(error_class, status_code, headers=None):
+    response = httpx.Response(status_code, headers=headers or {}, request=httpx.Request("POST", "https://api.test"))
+    return error_class("failed", response=response, body=None)
+
+
+def test_bucket_serves_its_capacity_without_waiting(clock):
+    bucket = TokenBucket(60)
+    assert [bucket.reserve(1) for _ in range(60)] == [0.0] * 60
+
+
+def test_bucket_in_debt_waits_for_the_refill(clock):
+    bucket = TokenBucket(60)  # one unit per second
+    bucket.reserve(60)
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)
+    clock.now += 2
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+
+def test_bucket_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(60)
+    clock.now += 3600
+    bucket.reserve(0)
+    assert bucket.tokens == 60
+
+
+def test_oversized_reservation_takes_at_most_the_capacity(clock):
+    bucket = TokenBucket(100)
+    assert bucket.reserve(10_000) == 0.0
+    assert bucket.tokens == 0
+
+
+def test_settle_replaces_the_estimate_with_the_actual_usage(clock):
+    limiter = RateLimiter(tpm=1000)
+    limiter.reserve(600)
+    limiter.settle(600, types.SimpleNamespace(total_tokens=100))
+    assert limiter.tokens.tokens == pytest.approx(900)
+
+
+def test_limiter_waits_for_the_tighter_bucket_and_counts_it(clock):
+    limiter = RateLimiter(rpm=600, tpm=60)
+    assert limiter.reserve(60) == 0.0
+    assert limiter.reserve(30) == pytest.approx(30.0)
+    assert (limiter.waits, limiter.max_wait) == (1, pytest.approx(30.0))
+
+
+def test_backoff_honours_retry_after_headers():
+    backend = ScheduledBackend(None, {})
+    assert backend._backoff(api_error(openai.RateLimitError, 429, {"retry-after-ms": "250"}), 0) == 0.25
+    assert backend._backoff(api_error(openai.RateLimitError, 429, {"retry-after": "3"}), 0) == 3.0
+
+
+def test_backoff_is_jittered_exponential_and_capped():
+    backend = ScheduledBackend(None, {"backoff_base_s": 1.0, "backoff_max_s": 5.0})
+    error = api_error(openai.InternalServerError, 503)
+    for attempt, limit in [(0, 1.0), (2, 4.0), (4, 5.0)]:
+        delays = [backend._backoff(error, attempt) for _ in range(50)]
+        assert all(0 <= delay <= limit for delay in delays)
+
+
+def test_client_errors_and_exhausted_retries_are_not_retried():
+    backend = ScheduledBackend(None, {"max_retries": 2})
+    assert backend._backoff(api_error(openai.BadRequestError, 400), 0) is None
+    assert backend._backoff(ValueError("not an API error"), 0) is None
+    assert backend._backoff(api_error(openai.RateLimitError, 429), 2) is None
+
+
+def test_create_retries_rate_limited_requests():
+    class Flaky:
+        calls = 0
+
+        def create(self, **kwargs):
+            self.calls += 1
+            if self.calls < 3:
+                raise api_error(openai.RateLimitError, 429, {"retry-after-ms": "1"})
+            return types.SimpleNamespace(usage=types.SimpleNamespace(total_tokens=10))
+
+    inner = Flaky()
+    backend = ScheduledBackend(inner, {})
+    backend.create(model="test-model", messages=[{"role": "user", "content": "hi"}])
+    assert inner.calls == 3
+    assert consume_call_stats()["retries"] == 2
+    assert llm_scheduler.scheduler_stats()["test-model"]["retries"] == 2
+
+
+def test_limiters_are_keyed_on_the_configured_limits():
+    slow = llm_scheduler.get_rate_limiter("test-model", {"rate_limits": {"test-model": {"rpm": 10}}})
+    fast = llm_scheduler.get_rate_limiter("test-model", {"rate_limits": {"test-model": {"rpm": 1000}}})
+    assert slow is not fast
+    assert slow is llm_scheduler.get_rate_limiter("test-model", {"rate_limits": {"test-model": {"rpm": 10}}})
+    slow.count_retry()
+    fast.count_retry()
+    assert llm_scheduler.scheduler_stats()["test-model"]["retries"] == 2
@@ -0,0 +1,96 @@
+"""Graph nodes around the agents: what they record into state["meta"] and how parallel branches merge it."""
+import asyncio
+import types
+from typing import Annotated, Any, Dict, Optional, TypedDict
+
+import pytest
+from langgraph.graph import END, StateGraph
+
+from adapters.checkpoint_store import SQLiteCheckpointSaver
+from app.services import agent_node, branch_node, meta_delta, run_options, tracked_run
+from domain.state import merge_meta
+
+
+class RunState(TypedDict):
+    jd_summary: Optional[Dict[str, Any]]
+    ranked: Optional[Dict[str, Any]]
+    cover_letter_content: Optional[Dict[str, Any]]
+    meta: Annotated[Dict[str, Any], merge_meta]
+
+
+def agent(name, key, fail=()):
+    """Agent assigning state[key] and recording a call, a memo entry and its timing into meta."""
+    def run(state, config):
+        if name in fail:
+            state["meta"].setdefault("errors", []).append(f"{name}: failed")
+            raise RuntimeError(f"{name} failed")
+        meta = state["meta"]
+        meta.setdefault("llm_calls", []).append({"agent": name})
+        meta.setdefault("memo", {})[name] = {"status": "computed"}
+        meta[f"{name}_timing"] = {"wall_s": 1.0}
+        state[key] = {"by": name}
+        return state
+
+    async def arun(state, config):
+        return run(state, config)
+
+    return types.SimpleNamespace(run=run, arun=arun)
+
+
+def build_graph(saver=None, fail=()):
+    """parse -> (rank, write) in parallel, as the combined graph runs the CV and cover letter branches."""
+    graph = StateGraph(RunState)
+    graph.add_node("parse", agent_node(agent("parse", "jd_summary", fail), {}))
+    graph.add_node("rank", branch_node(agent("rank", "ranked", fail), {}))
+    graph.add_node("write", branch_node(agent("write", "cover_letter_content", fail), {}))
+    graph.set_entry_point("parse")
+    graph.add_edge("parse", "rank")
+    graph.add_edge("parse", "write")
+    graph.add_edge("rank", END)
+    graph.add_edge("write", END)
+    return graph.compile(checkpointer=saver, name="test")
+
+
+def initial_state():
+    return {"jd_summary": None, "ranked": None, "cover_letter_content": None, "meta": {"retry_count": 0, "errors": []}}
+
+
+def test_merge_meta_extends_lists_updates_dicts_and_replaces_values():
+    left = {"llm_calls": [1], "memo": {"a": 1}, "retry_count": 0}
+    merged = merge_meta(left, {"llm_calls": [2], "memo": {"b": 2}, "retry_count": 1, "relevance": {}})
+    assert merged == {"llm_calls": [1, 2], "memo": {"a": 1, "b": 2}, "retry_count": 1, "relevance": {}}
+    assert left == {"llm_calls": [1], "memo": {"a": 1}, "retry_count": 0}
+
+
+def test_meta_delta_holds_only_what_was_recorded():
+    before = {"llm_calls": [1], "memo": {"a": 1}, "retry_count": 0, "errors": []}
+    after = {"llm_calls": [1, 2], "memo": {"a": 1, "b": 2}, "retry_count": 0, "errors": [], "timing": 3}
+    assert meta_delta(before, after) == {"llm_calls": [2], "memo": {"b": 2}, "timing": 3}
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_records_of_parallel_branches_are_all_kept(use_async):
+    graph = build_graph()
+    if use_async:
+        final = asyncio.run(graph.ainvoke(initial_state()))
+    else:
+        final = graph.invoke(initial_state())
+    meta = final["meta"]
+    assert sorted(call["agent"] for call in meta["llm_calls"]) == ["parse", "rank", "write"]
+    assert sorted(meta["memo"]) == ["parse", "rank", "write"]
+    assert {"parse_timing", "rank_timing", "write_timing"} <= set(meta)
+    assert (final["ranked"], final["cover_letter_content"]) == ({"by": "rank"}, {"by": "write"})
+
+
+def test_resumed_run_keeps_the_records_of_the_branch_that_finished(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"))
+    graph = build_graph(saver, fail={"write"})
+    with pytest.raises(RuntimeError), tracked_run(graph, "run-1"):
+        graph.invoke(initial_state(), **run_options(graph, "run-1"))
+
+    graph = build_graph(saver)
+    final = graph.invoke(None, **run_options(graph, "run-1"))
+    assert [call["agent"] for call in final["meta"]["llm_calls"]][:2] == ["parse", "rank"]
+    assert sorted(final["meta"]["memo"]) == ["parse", "rank", "write"]
+    # the failed attempt's records were never written
+    assert final["meta"]["errors"] == []
@@ -0,0 +1,34 @@
+"""Import-time budgets of the CLI and the pipelines (what run.py --profile-startup checks).
+
+The forbidden-module checks always run; the wall-clock budgets depend on the
+machine and only run with STARTUP_BUDGET=1.
+"""
+import os
+from pathlib import Path
+
+import pytest
+
+from infra.config import load_config
+from infra.startup import TARGETS, forbidden_imports, measure
+
+CONFIG = load_config(str(Path(__file__).resolve().parents[1] / "config.yaml"))
+
+
+@pytest.fixture(scope="module", params=list(TARGETS))
+def profile(request):
+    runs = max((CONFIG.get("startup") or {}).get("runs", 3), 1)
+    # fastest of a few fresh interpreters, as --profile-startup does
+    return request.param, min((measure(request.param) for _ in range(runs)), key=lambda p: p["total_ms"])
+
+
+def test_target_loads_no_forbidden_modules(profile):
+    target, result = profile
+    assert forbidden_imports(target, result["modules"]) == []
+
+
+@pytest.mark.skipif(os.environ.get("STARTUP_BUDGET") != "1", reason="timing check, set STARTUP_BUDGET=1 to run it")
+def test_target_is_within_its_budget(profile):
+    target, result = profile
+    budget = CONFIG["startup"]["budget_ms"][target]
+    assert result["total_ms"] <= budget, f"{target} imports take {result['total_ms']:.0f} ms > {budget} ms"
+
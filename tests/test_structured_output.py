@@ -0,0 +1,63 @@
+"""Local JSON repair and schema validation of LLM replies."""
+import json
+
+import pytest
+
+from adapters.structured_output import SchemaValidationError, parse_reply, repair_json, response_format
+from domain.schemas import WorkSelection, jd_reply_schema
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('```json\n{"a": {"x": [1]}}\n```', {"a": {"x": [1]}}),
+    ('Here you go: {"a": 1} Hope this helps!', {"a": 1}),
+    ('{"a": 1, "b": "hel', {"a": 1, "b": "hel"}),
+    ('{"a": [1, 2', {"a": [1]}),
+    ('{"a": 1, "b": ', {"a": 1}),
+    ('{"a": 1, "b', {"a": 1}),
+    ('{"a": "say \\"hi', {"a": 'say "hi'}),
+    ('{"sel": [{"id": "1", "text": "ab', {"sel": [{"id": "1", "text": "ab"}]}),
+])
+def test_repair_json_closes_truncated_replies(text, expected):
+    assert json.loads(repair_json(text)) == expected
+
+
+def test_repair_json_leaves_text_without_an_object():
+    assert repair_json("no json here") == "no json here"
+
+
+def test_parse_reply_applies_key_aliases():
+    reply = parse_reply('{"items": [{"item_id": "w1", "bullet": "Built X"}]}', WorkSelection)
+    assert reply == {"selected": [{"id": "w1", "text": "Built X"}]}
+
+
+def test_parse_reply_drops_the_incomplete_last_item_of_a_truncated_reply():
+    content = '{"selected": [{"id": "w1", "text": "Built X"}, {"id": "w2", "te'
+    assert parse_reply(content, WorkSelection) == {"selected": [{"id": "w1", "text": "Built X"}]}
+
+
+def test_parse_reply_rejects_replies_that_do_not_match_the_schema():
+    with pytest.raises(SchemaValidationError, match="selected"):
+        parse_reply('{"selected": []}', WorkSelection)
+    with pytest.raises(SchemaValidationError, match="not valid JSON"):
+        parse_reply("I cannot help with that.", WorkSelection)
+
+
+def test_parse_reply_keeps_a_complete_invalid_reply_invalid():
+    # only replies that needed repair may lose items
+    with pytest.raises(SchemaValidationError):
+        parse_reply('{"selected": [{"id": "w1", "text": "Built X"}, {"id": "w2"}]}', WorkSelection)
+
+
+def test_partial_jd_schema_only_asks_for_the_given_fields():
+    schema = jd_reply_schema(("role", "skills"))
+    properties = response_format(schema)["json_schema"]["schema"]["properties"]
+    assert set(properties) == {"role", "skills"}
+    assert parse_reply('{"title": "Engineer", "skills": ["Python"]}', schema) == {"role": "Engineer", "skills": ["Python"]}
+
+
+def test_response_format_is_strict():
+    schema = response_format(WorkSelection)["json_schema"]
+    item = schema["schema"]["$defs"]["WorkItem"]
+    assert schema["strict"] is True
+    assert item["additionalProperties"] is False and item["required"] == ["id", "text"]
+    assert "minItems" not in json.dumps(schema)